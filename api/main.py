@@ -7,6 +7,9 @@ from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from qdrant_client import QdrantClient
 
+from rag.embedders import get_embedder
+from rag.storage_profiles import collection_search_params
+
 load_dotenv()
 
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
@@ -28,11 +31,13 @@ def ask(q: str):
     if not q.strip():
         raise HTTPException(status_code=400, detail="Query is empty.")
 
-    emb = ollama.embeddings(model=GEN_MODEL, prompt=q)["embedding"]
+    # Query vectors must come from the model that embedded the documents, not GEN_MODEL
+    emb = get_embedder().embed_query(q)
 
     hits = qdrant.search(
         collection_name=COLLECTION,
         query_vector=emb,
+        search_params=collection_search_params(qdrant, COLLECTION),
         limit=5,
     )
 
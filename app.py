@@ -10,33 +10,14 @@ import traceback
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 import pandas as pd
 import gradio as gr
-import xmltodict
 
-
-DEFAULT_BASE_URL = "https://openapi.onbid.co.kr/openapi/services"
-
-
-def _as_list(x: Any) -> List[Any]:
-    if x is None:
-        return []
-    if isinstance(x, list):
-        return x
-    return [x]
+from services.onbid_transport import get_transport
+from services.onbid_xml import OnbidXmlStream
 
 
-def _deep_get(d: Any, path: List[str], default=None):
-    cur = d
-    for p in path:
-        if cur is None:
-            return default
-        if isinstance(cur, dict):
-            cur = cur.get(p)
-        else:
-            return default
-    return cur if cur is not None else default
+DEFAULT_BASE_URL = "https://openapi.onbid.co.kr/openapi/services"
 
 
 def flatten_dict(d: Dict[str, Any], parent_key: str = "", sep: str = ".") -> Dict[str, Any]:
@@ -53,30 +34,18 @@ def flatten_dict(d: Dict[str, Any], parent_key: str = "", sep: str = ".") -> Dic
 
 
 def parse_onbid_xml_to_df(xml_text: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    obj = xmltodict.parse(xml_text)
-    header = _deep_get(obj, ["response", "header"], {}) or {}
-    body = _deep_get(obj, ["response", "body"], {}) or {}
-
-    items = _deep_get(body, ["items"], None)
-
-    rows: List[Dict[str, Any]] = []
-    if isinstance(items, dict) and "item" in items:
-        for it in _as_list(items.get("item")):
-            rows.append(flatten_dict(it) if isinstance(it, dict) else {"value": it})
-    elif isinstance(items, list):
-        for it in items:
-            rows.append(flatten_dict(it) if isinstance(it, dict) else {"value": it})
-    elif isinstance(body, dict) and "item" in body:
-        for it in _as_list(body.get("item")):
-            rows.append(flatten_dict(it) if isinstance(it, dict) else {"value": it})
+    stream = OnbidXmlStream(xml_text, item_tags=("item",))
+    header = stream.read_header()
+
+    rows: List[Dict[str, Any]] = [flatten_dict(it) for it in stream]
 
     df = pd.DataFrame(rows)
     meta = {
         "resultCode": header.get("resultCode"),
         "resultMsg": header.get("resultMsg"),
-        "pageNo": body.get("pageNo"),
-        "numOfRows": body.get("numOfRows"),
-        "totalCount": body.get("totalCount") or body.get("TotalCount"),
+        "pageNo": stream.meta.get("pageNo"),
+        "numOfRows": stream.meta.get("numOfRows"),
+        "totalCount": stream.meta.get("totalCount") or stream.meta.get("TotalCount"),
     }
     return df, meta
 
@@ -115,7 +84,7 @@ def call_onbid(
 
     t0 = time.time()
     try:
-        r = requests.get(url, params=params, headers=headers, timeout=timeout_sec)
+        r = get_transport().get(url, params=params, headers=headers, timeout=timeout_sec, operation=operation)
         elapsed = time.time() - t0
         xml = r.text
 
@@ -3,11 +3,20 @@
 from datetime import datetime
 import logging
 import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
 
-import requests
 from dotenv import load_dotenv
 from pymongo import MongoClient
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.mongo_writer import BulkUpsertWriter
+from services.onbid_transport import get_transport
+
 load_dotenv()
 
 API_KEY = os.getenv("KAMCO_API_KEY")
@@ -17,6 +26,8 @@ BASE_URL = os.getenv(
 )
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 PAGE_SIZE = int(os.getenv("KAMCO_PAGE_SIZE", "100"))
+# Pages fetched ahead of the writer before fetching pauses
+PREFETCH_PAGES = max(1, int(os.getenv("KAMCO_PREFETCH_PAGES", "4")))
 
 mongo = MongoClient(MONGO_URI)
 db = mongo.kamco
@@ -24,7 +35,7 @@ raw_col = db.raw_items
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger(__name__)
-session = requests.Session()
+transport = get_transport()
 
 
 def fetch_kamco(page: int = 1, per_page: int = PAGE_SIZE) -> dict:
@@ -38,30 +49,102 @@ def fetch_kamco(page: int = 1, per_page: int = PAGE_SIZE) -> dict:
         "perPage": per_page,
         "returnType": "JSON",
     }
-    r = session.get(BASE_URL, params=params, timeout=30)
+    r = transport.get(BASE_URL, params=params, operation="getApplyhomeInfoDetail")
     r.raise_for_status()
     return r.json()
 
 
-def run() -> None:
+class _FetchError:
+    """Queue marker carrying an exception raised by the fetch thread."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_DONE = object()
+
+
+def _put(pages: "queue.Queue", stop: threading.Event, entry) -> None:
+    """Blocking put that gives up once the writer has stopped."""
+    while not stop.is_set():
+        try:
+            pages.put(entry, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+
+def _produce(pages: "queue.Queue", stop: threading.Event, stats: dict) -> None:
+    """Fetch pages in order and hand them to the writer through a bounded queue."""
     page = 1
-    while True:
-        data = fetch_kamco(page=page, per_page=PAGE_SIZE)
-        items = data.get("data") or []
-        if not items:
-            log.info("No more items at page %s; stopping.", page)
-            break
-
-        for item in items:
-            doc_id = item.get("pblancNo") or f"{page}-{item.get('cltrNo', '')}"
-            raw_col.update_one(
-                {"_id": doc_id},
-                {"$set": {"raw": item, "fetched_at": datetime.utcnow()}},
-                upsert=True,
+    try:
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            data = fetch_kamco(page=page, per_page=PAGE_SIZE)
+            stats["fetch_seconds"] += time.perf_counter() - t0
+            items = data.get("data") or []
+            if not items:
+                log.info("No more items at page %s; stopping.", page)
+                break
+
+            # Blocks while the writer is PREFETCH_PAGES behind (backpressure)
+            t0 = time.perf_counter()
+            _put(pages, stop, (page, items))
+            stats["blocked_seconds"] += time.perf_counter() - t0
+            page += 1
+    except BaseException as e:
+        _put(pages, stop, _FetchError(e))
+        return
+    _put(pages, stop, _DONE)
+
+
+def run() -> None:
+    # fetched_at only moves when the raw item actually changed
+    writer = BulkUpsertWriter(raw_col, key_fields=("_id",), volatile_fields=("fetched_at",))
+    pages: "queue.Queue" = queue.Queue(maxsize=PREFETCH_PAGES)
+    stop = threading.Event()
+    stats = {"pages": 0, "items": 0, "fetch_seconds": 0.0, "write_seconds": 0.0, "blocked_seconds": 0.0}
+
+    started = time.perf_counter()
+    producer = threading.Thread(target=_produce, args=(pages, stop, stats), name="kamco-fetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            entry = pages.get()
+            if entry is _DONE:
+                break
+            if isinstance(entry, _FetchError):
+                raise entry.error
+
+            page, items = entry
+            fetched_at = datetime.utcnow()
+            t0 = time.perf_counter()
+            writer.add_many(
+                {"_id": item.get("pblancNo") or f"{page}-{item.get('cltrNo', '')}", "raw": item, "fetched_at": fetched_at}
+                for item in items
             )
+            # One bulk write per page while the next pages are being fetched
+            writer.flush()
+            stats["write_seconds"] += time.perf_counter() - t0
+            stats["pages"] += 1
+            stats["items"] += len(items)
+            log.info("Stored %s items from page %s (%s pages buffered)", len(items), page, pages.qsize())
+    finally:
+        stop.set()
+        producer.join()
+        write_stats = writer.close()
 
-        log.info("Stored %s items from page %s", len(items), page)
-        page += 1
+    elapsed = time.perf_counter() - started
+    log.info(
+        "Stored raw items: %s inserted, %s modified, %s unchanged, %s errors",
+        write_stats["inserted"], write_stats["modified"], write_stats["unchanged"], write_stats["errors"],
+    )
+    log.info(
+        "Throughput: %s items / %s pages in %.1fs (%.1f items/s); fetch %.1fs, write %.1fs, "
+        "fetch blocked on writer %.1fs",
+        stats["items"], stats["pages"], elapsed, stats["items"] / elapsed if elapsed else 0.0,
+        stats["fetch_seconds"], stats["write_seconds"], stats["blocked_seconds"],
+    )
 
 
 if __name__ == "__main__":
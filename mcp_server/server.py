@@ -14,6 +14,7 @@ import mcp.server.stdio
 
 # Import shared logic
 from rag.query import search_vector, generate_answer, smart_search
+from services.enrichment import SECTIONS, ThingEnricher
 
 load_dotenv()
 
@@ -28,9 +29,11 @@ logger = logging.getLogger(__name__)
 try:
     mongo_client = MongoClient(MONGO_URI)
     db = mongo_client.kamco
+    enricher = ThingEnricher(db)
 except Exception as e:
     logger.error(f"Failed to initialize MongoDB client: {e}")
     db = None
+    enricher = None
 
 # Create MCP server
 server = Server("kamco-mcp-server")
@@ -54,6 +57,30 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Maximum number of results (default: 5)",
                         "default": 5
+                    },
+                    "sido": {
+                        "type": "string",
+                        "description": "Province/metropolitan city, full name (e.g. '서울특별시', '경기도')"
+                    },
+                    "sigungu": {
+                        "type": "string",
+                        "description": "City/district (e.g. '강남구', '성남시 분당구')"
+                    },
+                    "min_price": {
+                        "type": "integer",
+                        "description": "Minimum of the minimum bid price in KRW"
+                    },
+                    "max_price": {
+                        "type": "integer",
+                        "description": "Maximum of the minimum bid price in KRW (e.g. 300000000)"
+                    },
+                    "closing_after": {
+                        "type": "string",
+                        "description": "Bidding closes at or after this ISO datetime"
+                    },
+                    "closing_before": {
+                        "type": "string",
+                        "description": "Bidding closes at or before this ISO datetime"
                     }
                 },
                 "required": ["query"]
@@ -68,6 +95,16 @@ async def list_tools() -> list[Tool]:
                     "item_id": {
                         "type": "string",
                         "description": "The unique identifier of the auction item"
+                    },
+                    "enrich": {
+                        "type": "boolean",
+                        "description": "Also fetch appraisal / rental / registry / bid history details (cached)",
+                        "default": False
+                    },
+                    "sections": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(SECTIONS)},
+                        "description": "Enrichment sections (default: estimation, rental, registered, bid_history)"
                     }
                 },
                 "required": ["item_id"]
@@ -117,6 +154,11 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Number of pages to collect (default: 1)",
                         "default": 1
+                    },
+                    "full_sweep": {
+                        "type": "boolean",
+                        "description": "Collect every page reported by totalCount (ignores 'pages')",
+                        "default": False
                     }
                 },
                 "required": []
@@ -181,8 +223,11 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         query = arguments.get("query", "")
         limit = arguments.get("limit", 5)
         
+        filter_keys = ("sido", "sigungu", "min_price", "max_price", "closing_after", "closing_before")
+        filters = {key: arguments[key] for key in filter_keys if arguments.get(key) is not None}
+        
         # Use smart_search
-        results = smart_search(query, limit)
+        results = smart_search(query, limit, filters or None)
         if not results:
             return [TextContent(type="text", text="검색 결과가 없습니다.")]
         
@@ -196,7 +241,12 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         item = get_item_by_id(item_id)
         if not item:
             return [TextContent(type="text", text=f"ID '{item_id}'를 찾을 수 없습니다.")]
-        return [TextContent(type="text", text=json.dumps(item, ensure_ascii=False, indent=2))]
+        if arguments.get("enrich") and enricher is not None:
+            try:
+                item["enrichment"] = enricher.enrich(item, arguments.get("sections"))
+            except Exception as e:
+                logger.error(f"Enrichment error: {e}")
+        return [TextContent(type="text", text=json.dumps(item, ensure_ascii=False, indent=2, default=str))]
     
     elif name == "get_recent_kamco":
         limit = arguments.get("limit", 10)
@@ -222,14 +272,15 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     
     elif name == "collect_kamco_data":
         pages = arguments.get("pages", 1)
+        full_sweep = arguments.get("full_sweep", False)
         try:
             from services.kamco_collector_service import KamcoCollectorService
             collector = KamcoCollectorService()
-            stats_summary = {"total_saved": 0}
-            for p in range(1, pages + 1):
-                 r = collector.run(page_no=p, num_of_rows=10, save_to_db=True)
-                 stats_summary["total_saved"] += r.get("saved_items", 0)
-            return [TextContent(type="text", text=f"수집 완료. 저장된 항목: {stats_summary['total_saved']}건")]
+            if full_sweep:
+                r = collector.run_full_sweep(num_of_rows=100, save_to_db=True)
+            else:
+                r = collector.run_full_sweep(num_of_rows=10, save_to_db=True, max_pages=pages)
+            return [TextContent(type="text", text=f"수집 완료. 저장된 항목: {r.get('saved_items', 0)}건 (페이지 {r.get('fetched_pages', 0)}/{r.get('total_pages', 0)})")]
         except Exception as e:
             return [TextContent(type="text", text=f"수집 오류: {e}")]
     
@@ -239,7 +290,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             from rag.embed import embed
             n = normalize()
             e = embed()
-            return [TextContent(type="text", text=f"처리 완료. 정규화: {n}, 임베딩 완료.")]
+            return [TextContent(type="text", text=f"처리 완료. 정규화: 신규 {n['inserted']}, 갱신 {n['updated']}, 변경 없음 {n['skipped']}. 임베딩 완료.")]
         except Exception as e:
             return [TextContent(type="text", text=f"처리 오류: {e}")]
 
@@ -1,19 +1,97 @@
-"""Normalize raw KAMCO items into text suitable for embedding."""
+"""Normalize KAMCO items into text suitable for embedding.
 
+Two sources feed normalized_items:
+- raw_items: legacy documents written by collector/kamco_fetcher.py
+- collected_items: documents written by KamcoCollectorService
+  (announce_list_item, basic_info, schedule_info)
+
+By default only documents written at or after the per-source watermark
+are read (fetched_at / collected_at only move when the document changed),
+with a projection limited to the fields the text is built from. Documents
+whose text hash matches the stored one are skipped; the rest are upserted
+with batched bulk_write calls.
+"""
+
+import argparse
 import hashlib
+import multiprocessing
 import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, UpdateOne
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+BATCH_SIZE = 500
 
 mongo = MongoClient(MONGO_URI)
 db = mongo.kamco
 raw_col = db.raw_items
+collected_col = db.collected_items
 norm_col = db.normalized_items
+watermark_col = db.normalize_watermarks
+
+# label -> candidate field names (onbid names first, legacy camelCase last)
+ANNOUNCE_FIELDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("공고명", ("PLNM_NM", "pblancNm")),
+    ("물건명", ("PBCT_CLM_NM", "CLTR_NM")),
+    ("재산구분", ("PRPT_DVSN_NM",)),
+    ("분류", ("CTGR_FULL_NM", "CTGR_NM", "PLNM_TYPE_NM")),
+    ("소재지", ("LCTN_ADDR", "LDNM_ADRS", "lctnAddr")),
+    ("기관명", ("ORG_NM",)),
+    ("입찰방식", ("BID_MTD_NM",)),
+    ("처분방식", ("DPSL_MTD_NM",)),
+    ("감정가", ("APZ_AMT",)),
+    ("최저입찰가", ("MIN_BID_PRC", "LWSBID_PRC", "lwsbidPrc")),
+    ("공고일", ("PLNM_DT",)),
+    ("담당부서", ("RSBY_DEPT",)),
+)
+PERIOD_FIELDS = (
+    ("PBCT_BEGN_DTM", "BID_BGNG_DT", "PBANC_BGNG_YMD", "pbancBgngYmd"),
+    ("PBCT_CLS_DTM", "BID_END_DT", "PBANC_END_YMD", "pbancEndYmd"),
+)
+SCHEDULE_FIELDS = ("PBCT_DGR", "BID_DVSN_NM", "PBCT_BEGN_DTM", "PBCT_CLS_DTM", "PBCT_EXCT_DTM")
+
+# typed field -> candidate source field names
+PRICE_FIELDS = {
+    "min_bid_price": ("MIN_BID_PRC", "LWSBID_PRC", "lwsbidPrc"),
+    "appraisal_price": ("APZ_AMT",),
+}
+ADDRESS_FIELDS = ("LCTN_ADDR", "LDNM_ADRS", "lctnAddr")
+
+# Leading address token -> 시도 (full names, short forms and pre-2023/2024 names)
+SIDO_NAMES = {
+    "서울": "서울특별시", "서울시": "서울특별시", "서울특별시": "서울특별시",
+    "부산": "부산광역시", "부산시": "부산광역시", "부산광역시": "부산광역시",
+    "대구": "대구광역시", "대구시": "대구광역시", "대구광역시": "대구광역시",
+    "인천": "인천광역시", "인천시": "인천광역시", "인천광역시": "인천광역시",
+    "광주": "광주광역시", "광주시": "광주광역시", "광주광역시": "광주광역시",
+    "대전": "대전광역시", "대전시": "대전광역시", "대전광역시": "대전광역시",
+    "울산": "울산광역시", "울산시": "울산광역시", "울산광역시": "울산광역시",
+    "세종": "세종특별자치시", "세종시": "세종특별자치시", "세종특별자치시": "세종특별자치시",
+    "경기": "경기도", "경기도": "경기도",
+    "강원": "강원특별자치도", "강원도": "강원특별자치도", "강원특별자치도": "강원특별자치도",
+    "충북": "충청북도", "충청북도": "충청북도",
+    "충남": "충청남도", "충청남도": "충청남도",
+    "전북": "전북특별자치도", "전라북도": "전북특별자치도", "전북특별자치도": "전북특별자치도",
+    "전남": "전라남도", "전라남도": "전라남도",
+    "경북": "경상북도", "경상북도": "경상북도",
+    "경남": "경상남도", "경상남도": "경상남도",
+    "제주": "제주특별자치도", "제주도": "제주특별자치도", "제주특별자치도": "제주특별자치도",
+}
+
+# normalized_items indexes for database-side filtering
+FIELD_INDEXES = (
+    ("fields_min_bid_price", [("fields.min_bid_price", ASCENDING)]),
+    ("fields_bid_end_at", [("fields.bid_end_at", ASCENDING)]),
+    ("fields_region_price", [("fields.sido", ASCENDING), ("fields.sigungu", ASCENDING), ("fields.min_bid_price", ASCENDING)]),
+)
 
 
 def _build_text(item: dict) -> str:
@@ -25,21 +103,380 @@ def _build_text(item: dict) -> str:
     """.strip()
 
 
-def normalize() -> None:
-    for doc in raw_col.find():
-        item = doc.get("raw", {})
-        text = _build_text(item)
-        norm_col.update_one(
-            {"_id": doc["_id"]},
-            {
-                "$set": {
-                    "text": text,
-                    "hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
-                }
-            },
-            upsert=True,
+def _pick(sources: Iterable[dict], names: Iterable[str]):
+    for name in names:
+        for source in sources:
+            value = source.get(name)
+            if value not in (None, ""):
+                return value
+    return None
+
+
+def _build_text_from_collected(doc: dict) -> str:
+    """Embedding text for a collected_items document (basic_info wins over the list item)"""
+    sources = [s for s in (doc.get("basic_info"), doc.get("announce_list_item"), doc) if isinstance(s, dict)]
+    lines = []
+    for label, names in ANNOUNCE_FIELDS:
+        value = _pick(sources, names)
+        if value is not None:
+            lines.append(f"{label}: {value}")
+    begin, end = (_pick(sources, names) for names in PERIOD_FIELDS)
+    if begin or end:
+        lines.append(f"입찰기간: {begin or ''} ~ {end or ''}")
+    for schedule in doc.get("schedule_info") or []:
+        lines.append(
+            f"{schedule.get('PBCT_DGR') or '-'}차 {schedule.get('BID_DVSN_NM') or ''} "
+            f"입찰 {schedule.get('PBCT_BEGN_DTM') or ''} ~ {schedule.get('PBCT_CLS_DTM') or ''}, "
+            f"개찰 {schedule.get('PBCT_EXCT_DTM') or '-'}"
+        )
+    lines.append(f"공고번호: {_pick(sources, ('PLNM_NO',))} / 공매번호: {_pick(sources, ('PBCT_NO',))}")
+    return "\n".join(lines)
+
+
+def parse_price(value) -> Optional[int]:
+    """'350,000,000' / '350000000원' / 350000000.0 -> 350000000"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r"[^0-9.]", "", str(value)).split(".")[0]
+    return int(digits) if digits else None
+
+
+def parse_datetime(value) -> Optional[datetime]:
+    """YYYYMMDD, YYYYMMDDHHMM or YYYYMMDDHHMMSS, with or without separators"""
+    if isinstance(value, datetime):
+        return value
+    if value is None:
+        return None
+    digits = re.sub(r"[^0-9]", "", str(value))
+    formats = {8: "%Y%m%d", 12: "%Y%m%d%H%M", 14: "%Y%m%d%H%M%S"}
+    if len(digits) not in formats:
+        return None
+    try:
+        return datetime.strptime(digits, formats[len(digits)])
+    except ValueError:
+        return None
+
+
+def split_address(address: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """'서울시 강남구 역삼동' -> ('서울특별시', '강남구'); '경기 성남시 분당구' -> ('경기도', '성남시 분당구')"""
+    tokens = str(address or "").split()
+    if not tokens or tokens[0] not in SIDO_NAMES:
+        return None, None
+    sido = SIDO_NAMES[tokens[0]]
+    if sido == "세종특별자치시" or len(tokens) < 2 or not tokens[1].endswith(("시", "군", "구")):
+        return sido, None
+    sigungu = tokens[1]
+    if sigungu.endswith("시") and len(tokens) > 2 and tokens[2].endswith("구"):
+        sigungu = f"{sigungu} {tokens[2]}"
+    return sido, sigungu
+
+
+def _extract_fields(sources: List[dict], schedules: Iterable[dict] = ()) -> Dict:
+    """Typed fields for database-side filtering (missing values are omitted)"""
+    fields: Dict = {}
+    for name, candidates in PRICE_FIELDS.items():
+        price = parse_price(_pick(sources, candidates))
+        if price is not None:
+            fields[name] = price
+
+    schedules = list(schedules)
+    begin, end = (parse_datetime(_pick(sources, names)) for names in PERIOD_FIELDS)
+    begins = [d for d in (parse_datetime(s.get("PBCT_BEGN_DTM")) for s in schedules) if d]
+    ends = [d for d in (parse_datetime(s.get("PBCT_CLS_DTM")) for s in schedules) if d]
+    begin = begin or min(begins, default=None)
+    end = end or max(ends, default=None)
+    if begin:
+        fields["bid_begin_at"] = begin
+    if end:
+        fields["bid_end_at"] = end
+
+    address = _pick(sources, ADDRESS_FIELDS)
+    if address:
+        fields["address"] = str(address)
+        sido, sigungu = split_address(address)
+        if sido:
+            fields["sido"] = sido
+        if sigungu:
+            fields["sigungu"] = sigungu
+    return fields
+
+
+def ensure_indexes(target=None) -> None:
+    target = norm_col if target is None else target
+    for name, keys in FIELD_INDEXES:
+        target.create_index(keys, name=name)
+
+
+def _collected_projection() -> Dict[str, int]:
+    """Only the fields _build_text_from_collected reads"""
+    fields = {name for _, names in ANNOUNCE_FIELDS for name in names}
+    fields.update(name for names in PERIOD_FIELDS for name in names)
+    fields.update(name for names in PRICE_FIELDS.values() for name in names)
+    projection = {"PLNM_NO": 1, "PBCT_NO": 1, "collected_at": 1}
+    for section in ("basic_info", "announce_list_item"):
+        projection.update({f"{section}.{name}": 1 for name in fields})
+    projection.update({f"schedule_info.{name}": 1 for name in SCHEDULE_FIELDS})
+    return projection
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write_batch(batch: List[Tuple[object, str, dict]], stats: Dict[str, int], target=None) -> None:
+    """Upsert (id, text, extra fields) entries, skipping unchanged text hashes and typed fields."""
+    target = norm_col if target is None else target
+    stored = {
+        doc["_id"]: (doc.get("hash"), doc.get("fields"))
+        for doc in target.find({"_id": {"$in": [doc_id for doc_id, _, _ in batch]}}, {"hash": 1, "fields": 1})
+    }
+    now = datetime.utcnow()
+    ops = []
+    for doc_id, text, extra in batch:
+        text_hash = _text_hash(text)
+        if stored.get(doc_id) == (text_hash, extra.get("fields")):
+            stats["skipped"] += 1
+            continue
+        stats["updated" if doc_id in stored else "inserted"] += 1
+        ops.append(
+            UpdateOne(
+                {"_id": doc_id},
+                {"$set": {"text": text, "hash": text_hash, "normalized_at": now, **extra}},
+                upsert=True,
+            )
         )
+    if ops:
+        target.bulk_write(ops, ordered=False)
+
+
+def _raw_entry(doc: dict) -> Tuple[object, str, dict]:
+    item = doc.get("raw", {})
+    return doc["_id"], _build_text(item), {"source": "raw_items", "fields": _extract_fields([item])}
+
+
+def _collected_entry(doc: dict) -> Tuple[object, str, dict]:
+    sources = [s for s in (doc.get("basic_info"), doc.get("announce_list_item"), doc) if isinstance(s, dict)]
+    return (
+        doc["_id"],
+        _build_text_from_collected(doc),
+        {
+            "source": "collected_items",
+            "metadata": {"PLNM_NO": doc.get("PLNM_NO"), "PBCT_NO": doc.get("PBCT_NO")},
+            "fields": _extract_fields(sources, doc.get("schedule_info") or []),
+        },
+    )
+
+
+# source -> (collection name, change time field, projection, entry builder)
+SOURCES: Dict[str, Tuple[str, str, Callable[[], Dict[str, int]], Callable[[dict], Tuple[object, str, dict]]]] = {
+    "raw": ("raw_items", "fetched_at", lambda: {"raw": 1, "fetched_at": 1}, _raw_entry),
+    "collected": ("collected_items", "collected_at", _collected_projection, _collected_entry),
+}
+
+
+def _empty_stats() -> Dict[str, int]:
+    return {"scanned": 0, "inserted": 0, "updated": 0, "skipped": 0}
+
+
+def _advance_watermark(name: str, time_field: str, latest: datetime, stats: Dict[str, int]) -> None:
+    # $max: a slower concurrent run never moves the watermark backwards
+    watermark_col.update_one(
+        {"_id": name},
+        {"$max": {time_field: latest}, "$set": {"updated_at": datetime.utcnow(), "stats": stats}},
+        upsert=True,
+    )
+
+
+def _normalize_source(source: str, incremental: bool, batch_size: int) -> Dict[str, int]:
+    name, time_field, projection, to_entry = SOURCES[source]
+    source_col = db[name]
+    stats = _empty_stats()
+    source_col.create_index([(time_field, ASCENDING)], name=time_field)
+    ensure_indexes()
+
+    doc = watermark_col.find_one({"_id": name}) if incremental else None
+    watermark: Optional[datetime] = doc.get(time_field) if doc else None
+    # $gte: items sharing the watermark timestamp are re-read, then skipped by hash
+    query = {time_field: {"$gte": watermark}} if watermark else {}
+    latest = watermark
+
+    batch: List[Tuple[object, str, dict]] = []
+    cursor = source_col.find(query, projection()).sort(time_field, ASCENDING).batch_size(batch_size)
+    for doc in cursor:
+        stats["scanned"] += 1
+        written_at = doc.get(time_field)
+        if written_at and (latest is None or written_at > latest):
+            latest = written_at
+        batch.append(to_entry(doc))
+        if len(batch) >= batch_size:
+            _write_batch(batch, stats)
+            batch = []
+    if batch:
+        _write_batch(batch, stats)
+
+    if latest is not None and latest != watermark:
+        _advance_watermark(name, time_field, latest, stats)
+    return stats
+
+
+def normalize_raw(incremental: bool = True, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """raw_items -> normalized_items"""
+    return _normalize_source("raw", incremental, batch_size)
+
+
+def normalize_collected(incremental: bool = True, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """collected_items -> normalized_items (same _id as the collected document)"""
+    return _normalize_source("collected", incremental, batch_size)
+
+
+def normalize(incremental: bool = True, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Normalize raw_items and collected_items into normalized_items.
+
+    Args:
+        incremental: only read documents written since each source's watermark
+            (False scans everything; unchanged documents are still skipped)
+        batch_size: documents per cursor batch and per bulk_write
+
+    Returns:
+        {"scanned", "inserted", "updated", "skipped"} summed over both sources
+    """
+    totals = _empty_stats()
+    for source in SOURCES:
+        for key, value in _normalize_source(source, incremental, batch_size).items():
+            totals[key] += value
+    return totals
+
+
+# ---- parallel backfill ----------------------------------------------------
+
+def _shard_bounds(source: str, shards: int) -> List[Tuple[object, object, bool]]:
+    """Split the source collection into roughly equal _id ranges: (min, max, max inclusive)"""
+    name = SOURCES[source][0]
+    buckets = list(db[name].aggregate([
+        {"$project": {"_id": 1}},
+        {"$bucketAuto": {"groupBy": "$_id", "buckets": shards}},
+    ], allowDiskUse=True))
+    # $bucketAuto maxima are exclusive except for the last bucket
+    return [
+        (bucket["_id"]["min"], bucket["_id"]["max"], index == len(buckets) - 1)
+        for index, bucket in enumerate(buckets)
+    ]
+
+
+def _normalize_shard(source: str, lower, upper, inclusive: bool, batch_size: int) -> Dict:
+    """Worker process: normalize one _id range with its own client"""
+    name, time_field, projection, to_entry = SOURCES[source]
+    client = MongoClient(MONGO_URI)
+    try:
+        shard_db = client.kamco
+        target = shard_db.normalized_items
+        stats = _empty_stats()
+        latest: Optional[datetime] = None
+        started = time.perf_counter()
+
+        query = {"_id": {"$gte": lower, ("$lte" if inclusive else "$lt"): upper}}
+        batch: List[Tuple[object, str, dict]] = []
+        for doc in shard_db[name].find(query, projection()).batch_size(batch_size):
+            stats["scanned"] += 1
+            written_at = doc.get(time_field)
+            if written_at and (latest is None or written_at > latest):
+                latest = written_at
+            batch.append(to_entry(doc))
+            if len(batch) >= batch_size:
+                _write_batch(batch, stats, target)
+                batch = []
+        if batch:
+            _write_batch(batch, stats, target)
+        return {"stats": stats, "latest": latest, "elapsed": time.perf_counter() - started}
+    finally:
+        client.close()
+
+
+def normalize_parallel(
+    source: str = "collected",
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Full backfill of one source, split into _id ranges processed by a process pool.
+
+    Each worker process opens its own MongoClient and bulk-writes its shard.
+    Progress is printed per shard as it finishes; the source watermark is
+    advanced afterwards so later incremental runs pick up from here.
+
+    Args:
+        source: "raw" or "collected"
+        workers: processes (default: CPU count)
+        shards: _id ranges (default: 4 per worker, so fast shards do not idle)
+        batch_size: documents per cursor batch and per bulk_write
+    """
+    name, time_field, _, _ = SOURCES[source]
+    workers = workers or os.cpu_count() or 1
+    shards = shards or workers * 4
+    db[name].create_index([(time_field, ASCENDING)], name=time_field)
+    ensure_indexes()
+
+    bounds = _shard_bounds(source, shards)
+    totals = _empty_stats()
+    if not bounds:
+        return totals
+
+    latest: Optional[datetime] = None
+    started = time.perf_counter()
+    # spawn: pymongo clients must not be inherited across fork
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(_normalize_shard, source, lower, upper, inclusive, batch_size): index
+            for index, (lower, upper, inclusive) in enumerate(bounds, 1)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            stats = result["stats"]
+            for key, value in stats.items():
+                totals[key] += value
+            if result["latest"] and (latest is None or result["latest"] > latest):
+                latest = result["latest"]
+            rate = stats["scanned"] / result["elapsed"] if result["elapsed"] else 0.0
+            print(
+                f"[{done}/{len(bounds)}] shard {futures[future]}: {stats['scanned']} scanned "
+                f"({stats['inserted']} inserted, {stats['updated']} updated, {stats['skipped']} skipped) "
+                f"in {result['elapsed']:.1f}s, {rate:.0f} docs/s"
+            )
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name}: {totals['scanned']} docs in {elapsed:.1f}s "
+        f"({totals['scanned'] / elapsed if elapsed else 0:.0f} docs/s, {workers} workers, {len(bounds)} shards)"
+    )
+    if latest is not None:
+        _advance_watermark(name, time_field, latest, totals)
+    return totals
 
 
 if __name__ == "__main__":
-    normalize()
+    parser = argparse.ArgumentParser(description="Normalize raw_items and collected_items into normalized_items")
+    parser.add_argument("--full", action="store_true", help="ignore the watermarks and scan every document")
+    parser.add_argument("--source", choices=("all", "raw", "collected"), default="all")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="full backfill with N processes over _id shards (0: single process)")
+    parser.add_argument("--shards", type=int, help="number of _id shards (default: 4 per worker)")
+    args = parser.parse_args()
+
+    if args.workers:
+        sources = list(SOURCES) if args.source == "all" else [args.source]
+        result = _empty_stats()
+        for source in sources:
+            for key, value in normalize_parallel(source, args.workers, args.shards, args.batch_size).items():
+                result[key] += value
+    else:
+        step = {"all": normalize, "raw": normalize_raw, "collected": normalize_collected}[args.source]
+        result = step(incremental=not args.full, batch_size=args.batch_size)
+    print(
+        f"Normalized: {result['scanned']} scanned, {result['inserted']} inserted, "
+        f"{result['updated']} updated, {result['skipped']} skipped"
+    )
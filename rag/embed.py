@@ -1,16 +1,32 @@
 """Embed normalized KAMCO documents and upsert them into Qdrant."""
 
+import argparse
 import hashlib
+import itertools
+import json
 import logging
 import os
+import queue
+import sys
+import threading
+import time
 import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import ollama
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from bson import ObjectId
+from pymongo import ASCENDING, MongoClient, UpdateOne
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rag.embedders import get_embedder
+from rag.embedding_cache import EmbeddingCache, text_hash
+from rag.storage_profiles import STORAGE_PROFILES, collection_kwargs, collection_search_params, get_profile
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -20,90 +36,645 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 COLLECTION = os.getenv("QDRANT_COLLECTION", "kamco")
-EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text:latest")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+# Points are removed this many days after bidding closes (negative: keep forever)
+EXPIRE_AFTER_DAYS = int(os.getenv("EMBED_EXPIRE_AFTER_DAYS", "7"))
+
+# Typed normalized_items fields mirrored into the payload, with their index types
+PAYLOAD_INDEXES = {
+    "min_bid_price": models.PayloadSchemaType.INTEGER,
+    "appraisal_price": models.PayloadSchemaType.INTEGER,
+    "bid_begin_at": models.PayloadSchemaType.DATETIME,
+    "bid_end_at": models.PayloadSchemaType.DATETIME,
+    "sido": models.PayloadSchemaType.KEYWORD,
+    "sigungu": models.PayloadSchemaType.KEYWORD,
+}
 
 qdrant = QdrantClient(QDRANT_HOST, port=QDRANT_PORT)
 mongo = MongoClient(MONGO_URI)
 docs = mongo.kamco.normalized_items
+embedding_cache_col = mongo.kamco.embedding_cache
+watermark_col = mongo.kamco.embed_watermarks
+# Configured backend (EMBED_BACKEND); its model_id keys the cache, versions and watermarks
+embedder = get_embedder()
+
+
+
+def _state_field(collection: str) -> str:
+    """Per-document embed state for one physical Qdrant collection: {"version", "at"}"""
+    return f"embedded.{collection}"
+
+
+# ---- collections and the COLLECTION alias ----------------------------------
+#
+# COLLECTION ("kamco") is an alias onto a versioned physical collection
+# (kamco_v20261017093000). Searches and incremental embeds go through the
+# alias; rebuild() fills a new version and switches the alias atomically.
+
+def resolve_collection() -> str:
+    """Physical collection behind the COLLECTION alias (COLLECTION itself if not aliased)"""
+    for alias in qdrant.get_aliases().aliases:
+        if alias.alias_name == COLLECTION:
+            return alias.collection_name
+    return COLLECTION
+
+
+def _versions() -> List[str]:
+    """Versioned physical collections, oldest first"""
+    prefix = f"{COLLECTION}_v"
+    return sorted(c.name for c in qdrant.get_collections().collections if c.name.startswith(prefix))
+
+
+def _create_version(profile: Optional[str] = None) -> str:
+    """Create an empty versioned collection sized for the embedder, laid out per storage profile"""
+    name = f"{COLLECTION}_v{datetime.utcnow():%Y%m%d%H%M%S}"
+    dim = embedder.dim
+    qdrant.create_collection(collection_name=name, **collection_kwargs(dim, profile))
+    ensure_payload_indexes(name)
+    logger.info(
+        f"Collection '{name}' created with {dim} dimensions for {embedder.model_id} "
+        f"(profile: {get_profile(profile)['name']})"
+    )
+    return name
+
+
+def _clear_state(collection: str) -> None:
+    watermark_col.delete_one({"_id": collection})
+    field = _state_field(collection)
+    docs.update_many({field: {"$exists": True}}, {"$unset": {field: ""}})
+
+
+def switch_alias(collection: str) -> None:
+    """Point the COLLECTION alias at `collection` in one atomic alias update"""
+    operations = []
+    current = resolve_collection()
+    if current != COLLECTION:
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=COLLECTION)))
+    elif qdrant.collection_exists(COLLECTION):
+        # Pre-alias installs have a physical collection with the alias name; it has to go first
+        logger.warning(f"Dropping legacy collection '{COLLECTION}' to free the alias name")
+        qdrant.delete_collection(COLLECTION)
+        _clear_state(COLLECTION)
+    operations.append(models.CreateAliasOperation(
+        create_alias=models.CreateAlias(collection_name=collection, alias_name=COLLECTION)
+    ))
+    qdrant.update_collection_aliases(change_aliases_operations=operations)
+    logger.info(f"Alias '{COLLECTION}' -> '{collection}' (was '{current}')")
+
+
+def gc_collections(keep: int = 1) -> List[str]:
+    """Delete old versions, keeping the live one plus `keep` previous ones for rollback"""
+    live = resolve_collection()
+    old = [name for name in _versions() if name != live]
+    dropped = old[:max(0, len(old) - keep)]
+    for name in dropped:
+        qdrant.delete_collection(name)
+        _clear_state(name)
+        logger.info(f"Deleted old collection '{name}'")
+    return dropped
+
+
+def setup_collection(profile: Optional[str] = None) -> None:
+    """
+    Make sure the COLLECTION alias points at a collection (safe to run repeatedly)
+
+    Creates and aliases an empty version on first use. Use rebuild() to
+    replace a live collection without downtime.
+    """
+    if resolve_collection() != COLLECTION or qdrant.collection_exists(COLLECTION):
+        return
+    switch_alias(_create_version(profile))
+
+
+def ensure_payload_indexes(collection: Optional[str] = None) -> None:
+    """Index the typed payload fields so filtered searches run inside Qdrant"""
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        try:
+            qdrant.create_payload_index(collection_name=collection or COLLECTION, field_name=field_name, field_schema=schema)
+        except Exception as e:
+            logger.warning(f"Payload index '{field_name}' not created: {e}")
+
+
+def _payload_fields(fields: dict) -> dict:
+    """Typed fields as payload values (datetimes as RFC 3339 strings)"""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in (fields or {}).items()
+        if key in PAYLOAD_INDEXES or key == "address"
+    }
+
 
+def _point_id(doc_id) -> str:
+    # Convert MongoDB ObjectId to UUID
+    # Use MD5 hash of ObjectId string to generate UUID
+    return str(uuid.UUID(hashlib.md5(str(doc_id).encode()).hexdigest()))
 
-def setup_collection() -> None:
-    """Create or recreate Qdrant collection"""
+
+def _build_point(doc: dict, vector: List[float]) -> models.PointStruct:
+    normalized_at = doc.get("normalized_at")
+    payload = {
+        "text": doc.get("text", ""),
+        "source": doc.get("source", "unknown"),
+        "normalized_at": normalized_at.isoformat() if isinstance(normalized_at, datetime) else normalized_at,
+        # Store original MongoDB ID in payload for reference
+        "mongodb_id": str(doc["_id"]),
+    }
+    # Add metadata if available
+    if "metadata" in doc:
+        payload["metadata"] = doc["metadata"]
+    payload.update(_payload_fields(doc.get("fields")))
+    return models.PointStruct(id=_point_id(doc["_id"]), vector=vector, payload=payload)
+
+
+def _embed_texts(texts: List[str]) -> List[List[float]]:
+    """One embedding call for a whole batch of texts"""
+    return embedder.embed(texts)
+
+
+def _embed_batch(
+    batch: List[dict], stats: Dict, cache: Optional[EmbeddingCache] = None
+) -> List[Tuple[models.PointStruct, dict]]:
+    """
+    Vectors for a batch: cached ones first, the rest in one embedding request
+
+    If the batch request fails, the misses are retried one by one so a
+    single bad input does not drop the whole batch.
+    """
+    hashes = [doc.get("hash") or text_hash(doc["text"]) for doc in batch]
+    vectors = cache.get_many(set(hashes)) if cache else {}
+    stats["cached"] += sum(1 for h in hashes if h in vectors)
+
+    misses = {h: doc["text"] for h, doc in zip(hashes, batch) if h not in vectors}
+    fresh: Dict[str, List[float]] = {}
+    if misses:
+        try:
+            fresh = dict(zip(misses, _embed_texts(list(misses.values()))))
+        except Exception as e:
+            logger.warning(f"Batch embedding failed ({len(misses)} texts), retrying one by one: {e}")
+            for h, text in misses.items():
+                try:
+                    fresh[h] = _embed_texts([text])[0]
+                except Exception as e:
+                    logger.error(f"Error embedding text {h[:12]}: {e}")
+        if cache and fresh:
+            cache.put_many(fresh)
+        vectors.update(fresh)
+
+    entries = []
+    for h, doc in zip(hashes, batch):
+        if h in vectors:
+            entries.append((_build_point(doc, vectors[h]), doc))
+        else:
+            _note_failed(stats, doc)
+    return entries
+
+
+def _doc_version(doc: dict) -> str:
+    """Changes whenever the vector or the payload of the document would change"""
+    raw = json.dumps(
+        [embedder.model_id, doc.get("hash") or text_hash(doc["text"]), doc.get("source"), doc.get("metadata"), doc.get("fields")],
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _note_failed(stats: Dict, doc: dict) -> None:
+    """Remember the earliest normalized_at that still needs embedding"""
+    stats["errors"] += 1
+    normalized_at = doc.get("normalized_at")
+    if normalized_at and (stats["failed_since"] is None or normalized_at < stats["failed_since"]):
+        stats["failed_since"] = normalized_at
+
+
+def _mark_embedded(entries: List[Tuple[models.PointStruct, dict]], collection: str) -> None:
+    now = datetime.utcnow()
+    field = _state_field(collection)
+    docs.bulk_write([
+        UpdateOne({"_id": doc["_id"]}, {"$set": {field: {"version": _doc_version(doc), "at": now}}})
+        for _, doc in entries
+    ], ordered=False)
+
+
+def _upsert(entries: List[Tuple[models.PointStruct, dict]], stats: Dict, collection: str) -> None:
+    t0 = time.perf_counter()
     try:
-        qdrant.recreate_collection(
-            collection_name=COLLECTION,
-            vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE),
-        )
-        logger.info(f"Collection '{COLLECTION}' created/recreated with 768 dimensions for nomic-embed-text")
+        qdrant.upsert(collection_name=collection, points=[point for point, _ in entries], wait=True)
+        _mark_embedded(entries, collection)
+        stats["upserted"] += len(entries)
     except Exception as e:
-        logger.error(f"Error creating collection: {e}")
+        logger.error(f"Qdrant upsert failed ({len(entries)} points): {e}")
+        for _, doc in entries:
+            _note_failed(stats, doc)
+    stats["upsert_seconds"] += time.perf_counter() - t0
+
+
+def _upsert_worker(
+    pending: "queue.Queue", stop: threading.Event, stats: Dict, upsert_batch_size: int, collection: str
+) -> None:
+    """Drain embedded points and upsert them in upsert_batch_size chunks"""
+    buffer: List[Tuple[models.PointStruct, dict]] = []
+    while True:
+        entries = pending.get()
+        if entries is None:
+            break
+        if stop.is_set():
+            continue
+        buffer.extend(entries)
+        while len(buffer) >= upsert_batch_size:
+            _upsert(buffer[:upsert_batch_size], stats, collection)
+            del buffer[:upsert_batch_size]
+    if buffer and not stop.is_set():
+        _upsert(buffer, stats, collection)
+
+
+def _embed_and_queue(
+    batch: List[dict], pending: "queue.Queue", stats: Dict, cache: Optional[EmbeddingCache]
+) -> None:
+    t0 = time.perf_counter()
+    entries = _embed_batch(batch, stats, cache)
+    stats["embed_seconds"] += time.perf_counter() - t0
+    stats["embedded"] += len(entries)
+    if entries:
+        pending.put(entries)
+    logger.info(f"Embedded {stats['embedded']} documents...")
+
+
+def _new_stats() -> Dict:
+    return {
+        "embedded": 0, "cached": 0, "upserted": 0, "errors": 0, "failed_since": None,
+        "embed_seconds": 0.0, "upsert_seconds": 0.0,
+    }
+
+
+def _merge_stats(stats: Dict, other: Dict) -> None:
+    """Add counters and timings of `other` into `stats`, keeping the earliest failed_since"""
+    for key, value in other.items():
+        if key == "failed_since":
+            if value is not None and (stats[key] is None or value < stats[key]):
+                stats[key] = value
+        else:
+            stats[key] += value
+
+
+def _index_documents(
+    documents: Iterable[dict],
+    stats: Dict,
+    embed_batch_size: int,
+    upsert_batch_size: int,
+    cache: Optional[EmbeddingCache],
+    collection: str,
+) -> None:
+    """
+    Embed documents embed_batch_size at a time while a background thread
+    upserts the previous batches in upsert_batch_size chunks
+
+    The upsert thread counts into its own stats dict, merged into `stats`
+    after join(), so neither thread mutates a shared dict.
+    """
+    # Bounded: embedding pauses when Qdrant falls a few batches behind
+    pending: "queue.Queue" = queue.Queue(maxsize=4)
+    stop = threading.Event()
+    upsert_stats = _new_stats()
+    upserter = threading.Thread(
+        target=_upsert_worker, args=(pending, stop, upsert_stats, upsert_batch_size, collection), name="qdrant-upsert", daemon=True
+    )
+    upserter.start()
+    try:
+        batch: List[dict] = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) >= embed_batch_size:
+                _embed_and_queue(batch, pending, stats, cache)
+                batch = []
+        if batch:
+            _embed_and_queue(batch, pending, stats, cache)
+    except BaseException:
+        stop.set()
         raise
+    finally:
+        pending.put(None)
+        upserter.join()
+        _merge_stats(stats, upsert_stats)
+
+
+def _expire_cutoff() -> Optional[datetime]:
+    # bid_end_at is onbid local time, so compare against local now
+    return datetime.now() - timedelta(days=EXPIRE_AFTER_DAYS) if EXPIRE_AFTER_DAYS >= 0 else None
+
+
+def _live_query() -> Dict:
+    """normalized_items that belong in the index (not expired)"""
+    cutoff = _expire_cutoff()
+    return {"fields.bid_end_at": {"$not": {"$lt": cutoff}}} if cutoff else {}
+
+
+def _chunks(values: List, size: int) -> Iterator[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def delete_points(doc_ids: Iterable, collection: Optional[str] = None) -> int:
+    """Delete the Qdrant points of the given normalized_items _ids"""
+    ids = list(doc_ids)
+    for chunk in _chunks(ids, 1000):
+        qdrant.delete(
+            collection_name=collection or COLLECTION,
+            points_selector=models.PointIdsList(points=[_point_id(doc_id) for doc_id in chunk]),
+            wait=True,
+        )
+    return len(ids)
+
 
+def remove_documents(doc_ids: Iterable) -> int:
+    """Drop documents from normalized_items and their points from Qdrant (e.g. after a delete)"""
+    ids = list(doc_ids)
+    if not ids:
+        return 0
+    docs.delete_many({"_id": {"$in": ids}})
+    return delete_points(ids)
 
-def embed() -> int:
+
+def remove_expired(collection: Optional[str] = None) -> int:
+    """Delete points whose bidding closed more than EMBED_EXPIRE_AFTER_DAYS ago"""
+    cutoff = _expire_cutoff()
+    if cutoff is None:
+        return 0
+    collection = collection or resolve_collection()
+    field = _state_field(collection)
+    ids = [
+        doc["_id"]
+        for doc in docs.find({"fields.bid_end_at": {"$lt": cutoff}, field: {"$exists": True}}, {"_id": 1})
+    ]
+    if ids:
+        delete_points(ids, collection)
+        docs.update_many({"_id": {"$in": ids}}, {"$unset": {field: ""}})
+        logger.info(f"Removed {len(ids)} expired points (closed before {cutoff:%Y-%m-%d %H:%M})")
+    return len(ids)
+
+
+def embed(
+    incremental: bool = True,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    upsert_batch_size: int = UPSERT_BATCH_SIZE,
+    use_cache: bool = True,
+    collection: Optional[str] = None,
+) -> int:
     """
     Embed normalized documents and store in Qdrant
+
+    Writes go to `collection`, by default the physical collection behind the
+    COLLECTION alias; watermark and per-document state are kept per physical
+    collection. Incremental runs only read documents normalized since the
+    watermark in embed_watermarks, and skip documents whose embedded version (model, text
+    hash, payload) is unchanged. Points of expired documents are deleted.
+    A full run happens on the first run into a collection or when
+    embedding model changed. Vectors are looked up in the (model_id, text hash)
+    cache first, so only new or changed texts reach the embedder.
+
     Returns: number of embedded documents
     """
-    count = 0
-    errors = 0
-    
-    logger.info(f"Starting embedding process with model: {EMBED_MODEL}")
-    
-    for doc in docs.find():
-        try:
-            # Generate embedding
-            text = doc.get("text", "")
-            if not text:
+    stats = _new_stats()
+    cache = EmbeddingCache(embedding_cache_col, embedder.model_id) if use_cache else None
+
+    collection = collection or resolve_collection()
+    field = _state_field(collection)
+    logger.info(f"Starting embedding process with model: {embedder.model_id} -> '{collection}'")
+    ensure_payload_indexes(collection)
+    docs.create_index([("normalized_at", ASCENDING)], name="normalized_at")
+    expired = remove_expired(collection)
+
+    state = watermark_col.find_one({"_id": collection}) if incremental else None
+    watermark = state.get("normalized_at") if state and state.get("model") == embedder.model_id else None
+    query = _live_query()
+    if watermark:
+        # $gte: documents sharing the watermark timestamp are re-read, then skipped by version
+        query["normalized_at"] = {"$gte": watermark}
+    else:
+        logger.info("Full embedding run (no watermark for this collection and model)")
+
+    counts = {"read": 0, "unchanged": 0, "latest": watermark}
+
+    def changed_documents() -> Iterator[dict]:
+        projection = {"text": 1, "hash": 1, "source": 1, "normalized_at": 1, "metadata": 1, "fields": 1, field: 1}
+        for doc in docs.find(query, projection).sort("normalized_at", ASCENDING).batch_size(max(embed_batch_size, 100)):
+            counts["read"] += 1
+            normalized_at = doc.get("normalized_at")
+            if normalized_at and (counts["latest"] is None or normalized_at > counts["latest"]):
+                counts["latest"] = normalized_at
+            if not doc.get("text"):
                 logger.warning(f"Skipping document {doc['_id']}: empty text")
                 continue
-                
-            emb = ollama.embeddings(model=EMBED_MODEL, prompt=text)["embedding"]
-            
-            # Prepare payload
-            payload = {
-                "text": text,
-                "source": doc.get("source", "unknown"),
-                "normalized_at": doc.get("normalized_at"),
-            }
-            
-            # Add metadata if available
-            if "metadata" in doc:
-                payload["metadata"] = doc["metadata"]
-            
-            # Convert MongoDB ObjectId to UUID
-            # Use MD5 hash of ObjectId string to generate UUID
-            doc_id_str = str(doc["_id"])
-            doc_uuid = str(uuid.UUID(hashlib.md5(doc_id_str.encode()).hexdigest()))
-            
-            # Store original MongoDB ID in payload for reference
-            payload["mongodb_id"] = doc_id_str
-            
-            # Upsert to Qdrant
-            qdrant.upsert(
-                collection_name=COLLECTION,
-                points=[
-                    {
-                        "id": doc_uuid,
-                        "vector": emb,
-                        "payload": payload,
-                    }
-                ],
-            )
-            count += 1
-            
-            if count % 10 == 0:
-                logger.info(f"Embedded {count} documents...")
-                
-        except Exception as e:
-            logger.error(f"Error embedding document {doc.get('_id')}: {e}")
-            errors += 1
-            continue
-    
-    logger.info(f"Embedding completed: {count} documents embedded, {errors} errors")
-    return count
+            state = (doc.get("embedded") or {}).get(collection) or {}
+            if state.get("version") == _doc_version(doc):
+                counts["unchanged"] += 1
+                continue
+            yield doc
+
+    started = time.perf_counter()
+    _index_documents(changed_documents(), stats, embed_batch_size, upsert_batch_size, cache, collection)
+    elapsed = time.perf_counter() - started
+
+    # Never move past a document that failed, so the next run retries it
+    latest = counts["latest"]
+    if stats["failed_since"] is not None and (latest is None or stats["failed_since"] < latest):
+        latest = stats["failed_since"]
+    if latest is not None and latest != watermark:
+        watermark_col.update_one(
+            {"_id": collection},
+            {"$set": {"normalized_at": latest, "model": embedder.model_id, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    logger.info(
+        f"Embedding completed: {stats['upserted']} documents embedded, {counts['unchanged']} unchanged, "
+        f"{expired} expired removed, {stats['errors']} errors "
+        f"in {elapsed:.1f}s ({stats['upserted'] / elapsed if elapsed else 0:.1f} docs/s overall)"
+    )
+    logger.info(
+        f"  embed:  {stats['embedded']} docs in {stats['embed_seconds']:.1f}s "
+        f"({stats['embedded'] / stats['embed_seconds'] if stats['embed_seconds'] else 0:.1f} docs/s, batch {embed_batch_size}, "
+        f"{stats['cached']} from cache)"
+    )
+    logger.info(
+        f"  upsert: {stats['upserted']} points in {stats['upsert_seconds']:.1f}s "
+        f"({stats['upserted'] / stats['upsert_seconds'] if stats['upsert_seconds'] else 0:.1f} docs/s, batch {upsert_batch_size})"
+    )
+    return stats["upserted"]
+
+
+def reconcile(page_size: int = 1000, embed_missing: bool = True, collection: Optional[str] = None) -> Dict[str, int]:
+    """
+    Diff normalized_items against Qdrant points, one page at a time
+
+    1. Scroll Qdrant: delete points whose document was removed or has expired
+    2. Scan live documents: points missing from Qdrant lose their embedded
+       state and are re-embedded (when embed_missing)
+    """
+    result = {"points": 0, "orphans_deleted": 0, "documents": 0, "missing": 0, "reembedded": 0}
+    collection = collection or resolve_collection()
+    live_query = _live_query()
+
+    offset = None
+    while True:
+        points, offset = qdrant.scroll(
+            collection_name=collection, limit=page_size, offset=offset,
+            with_payload=["mongodb_id"], with_vectors=False,
+        )
+        result["points"] += len(points)
+        mongo_ids = {point.id: (point.payload or {}).get("mongodb_id") for point in points}
+        candidates = []
+        for mongo_id in filter(None, mongo_ids.values()):
+            candidates.append(mongo_id)
+            if ObjectId.is_valid(mongo_id):
+                candidates.append(ObjectId(mongo_id))
+        live = {str(doc["_id"]) for doc in docs.find({"_id": {"$in": candidates}, **live_query}, {"_id": 1})}
+        orphans = [point_id for point_id, mongo_id in mongo_ids.items() if mongo_id not in live]
+        if orphans:
+            qdrant.delete(collection_name=collection, points_selector=models.PointIdsList(points=orphans), wait=True)
+            result["orphans_deleted"] += len(orphans)
+        if offset is None:
+            break
+
+    missing: List = []
+    cursor = docs.find(live_query, {"_id": 1}).batch_size(page_size)
+    page: List = []
+    for doc in itertools.chain(cursor, [None]):
+        if doc is not None:
+            page.append(doc["_id"])
+            if len(page) < page_size:
+                continue
+        if page:
+            result["documents"] += len(page)
+            present = {str(point.id) for point in qdrant.retrieve(
+                collection_name=collection, ids=[_point_id(doc_id) for doc_id in page],
+                with_payload=False, with_vectors=False,
+            )}
+            missing.extend(doc_id for doc_id in page if _point_id(doc_id) not in present)
+            page = []
+    result["missing"] = len(missing)
+
+    if missing:
+        docs.update_many({"_id": {"$in": missing}}, {"$unset": {_state_field(collection): ""}})
+    if missing and embed_missing:
+        stats = _new_stats()
+        cache = EmbeddingCache(embedding_cache_col, embedder.model_id)
+        projection = {"text": 1, "hash": 1, "source": 1, "normalized_at": 1, "metadata": 1, "fields": 1}
+        documents = (
+            doc
+            for chunk in _chunks(missing, page_size)
+            for doc in docs.find({"_id": {"$in": chunk}}, projection)
+            if doc.get("text")
+        )
+        _index_documents(documents, stats, EMBED_BATCH_SIZE, UPSERT_BATCH_SIZE, cache, collection)
+        result["reembedded"] = stats["upserted"]
+
+    logger.info(
+        f"Reconciled '{collection}': {result['points']} points, {result['orphans_deleted']} orphans deleted, "
+        f"{result['documents']} documents, {result['missing']} missing, {result['reembedded']} re-embedded"
+    )
+    return result
+
+
+# ---- blue/green rebuilds ---------------------------------------------------
+
+def validate_collection(collection: str, sample_size: int = 20, min_ratio: float = 0.99) -> Optional[str]:
+    """
+    Count and sample check before a collection goes live
+
+    Returns None when the collection holds at least min_ratio of the live
+    documents and every sampled document is present and finds itself by its
+    own vector; otherwise the reason it failed.
+    """
+    expected = docs.count_documents({**_live_query(), "text": {"$nin": [None, ""]}})
+    count = qdrant.count(collection_name=collection, exact=True).count
+    if count < expected * min_ratio:
+        return f"{count} points for {expected} documents (< {min_ratio:.0%})"
+
+    sample = [
+        doc["_id"]
+        for doc in docs.aggregate([
+            {"$match": {**_live_query(), "text": {"$nin": [None, ""]}}},
+            {"$sample": {"size": sample_size}},
+            {"$project": {"_id": 1}},
+        ])
+    ]
+    points = qdrant.retrieve(
+        collection_name=collection, ids=[_point_id(doc_id) for doc_id in sample], with_vectors=True,
+    )
+    if len(points) < len(sample):
+        return f"{len(sample) - len(points)} of {len(sample)} sampled documents have no point"
+    for point in points:
+        hits = qdrant.search(
+            collection_name=collection, query_vector=point.vector, limit=3,
+            search_params=collection_search_params(qdrant, collection),
+        )
+        # Identical texts share a vector, so a perfect-score neighbour also counts
+        if not any(str(hit.id) == str(point.id) or hit.score >= 0.999 for hit in hits):
+            return f"point {point.id} does not retrieve itself"
+    return None
+
+
+def rebuild(
+    profile: Optional[str] = None,
+    keep: int = 1,
+    sample_size: int = 20,
+    min_ratio: float = 0.99,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    upsert_batch_size: int = UPSERT_BATCH_SIZE,
+) -> Dict:
+    """
+    Zero-downtime rebuild: embed everything into a new versioned collection
+    while the current one keeps serving, validate it, switch the COLLECTION
+    alias atomically and garbage-collect old versions. `profile` picks the
+    storage layout of the new version (default QDRANT_PROFILE), so moving to
+    a quantized or on-disk layout is also just a rebuild.
+
+    A collection that fails validation is left in place for inspection (not
+    live; the next gc_collections() removes it).
+    """
+    previous = resolve_collection()
+    collection = _create_version(profile)
+    count = embed(
+        incremental=False,
+        embed_batch_size=embed_batch_size,
+        upsert_batch_size=upsert_batch_size,
+        collection=collection,
+    )
+    result = {"collection": collection, "previous": previous, "embedded": count, "switched": False, "dropped": []}
+
+    reason = validate_collection(collection, sample_size, min_ratio)
+    if reason:
+        logger.error(f"Rebuild '{collection}' failed validation, '{previous}' stays live: {reason}")
+        result["reason"] = reason
+        return result
+
+    switch_alias(collection)
+    result["switched"] = True
+    result["dropped"] = gc_collections(keep)
+    return result
 
 
 if __name__ == "__main__":
-    setup_collection()
-    embed()
+    parser = argparse.ArgumentParser(description="Embed normalized_items into Qdrant")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark (unchanged documents are still skipped)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="embed into a new collection version and switch the alias when it validates")
+    parser.add_argument("--profile", choices=list(STORAGE_PROFILES),
+                        help="storage profile for a new collection (default: QDRANT_PROFILE)")
+    parser.add_argument("--keep", type=int, default=1, help="previous versions kept after --rebuild / --gc")
+    parser.add_argument("--gc", action="store_true", help="delete old collection versions")
+    parser.add_argument("--reconcile", action="store_true", help="diff Mongo IDs against Qdrant points and repair")
+    parser.add_argument("--page-size", type=int, default=1000, help="reconcile page size")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        outcome = rebuild(profile=args.profile, keep=args.keep)
+        sys.exit(0 if outcome["switched"] else 1)
+    setup_collection(args.profile)
+    if args.gc:
+        gc_collections(args.keep)
+    elif args.reconcile:
+        reconcile(page_size=args.page_size)
+    else:
+        embed(incremental=not args.full)
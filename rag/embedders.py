@@ -0,0 +1,214 @@
+"""
+Embedding backends shared by indexing (rag/embed.py) and querying
+(rag/query.py, api/main.py), so documents and queries always go through
+the same model.
+
+    ollama   Ollama HTTP API (EMBED_MODEL), batched through /api/embed
+    onnx     in-process ONNX Runtime on CPU from a local model directory
+             (EMBED_MODEL_DIR with model.onnx + tokenizer.json), batched and
+             multi-threaded; no HTTP hop per query
+    hashing  deterministic feature hashing (EMBED_HASH_DIM), no model at all;
+             for tests and benchmarks
+
+EMBED_BACKEND selects the backend. Each embedder has a model_id that keys
+the embedding cache and embed watermarks, so switching backend or model
+never mixes vectors.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import ollama
+
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "ollama")
+EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text:latest")
+EMBED_MODEL_DIR = os.getenv("EMBED_MODEL_DIR", "models/embedding")
+EMBED_HASH_DIM = int(os.getenv("EMBED_HASH_DIM", "384"))
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))
+
+
+def _file_digest(*paths: Path, length: int = 12) -> str:
+    """sha256 over the contents of the given files (streamed, for large model files)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+class Embedder(ABC):
+    """Text -> vector interface"""
+
+    def __init__(self):
+        self._dim: Optional[int] = None
+
+    @property
+    @abstractmethod
+    def model_id(self) -> str:
+        """Identifies the exact model; keys caches, doc versions and watermarks"""
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """One vector per text, in order"""
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed([text])[0]
+
+    @property
+    def dim(self) -> int:
+        if self._dim is None:
+            self._dim = len(self.embed_query("임베딩 차원 확인"))
+        return self._dim
+
+
+class OllamaEmbedder(Embedder):
+    """Ollama /api/embed; the whole batch goes in one request"""
+
+    def __init__(self, model: str = EMBED_MODEL, host: Optional[str] = None):
+        super().__init__()
+        self.model = model
+        self.client = ollama.Client(host=host) if host else ollama
+
+    @property
+    def model_id(self) -> str:
+        # Plain model name, so caches and watermarks written before backends existed stay valid
+        return self.model
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.client.embed(model=self.model, input=texts)["embeddings"]
+
+
+class OnnxEmbedder(Embedder):
+    """
+    Sentence-transformer style ONNX model run in-process on CPU
+
+    model_dir holds model.onnx and a Hugging Face tokenizer.json. Token
+    embeddings are mean-pooled over the attention mask and L2-normalized;
+    models that already output a pooled 2-D embedding are used as is.
+    model_id includes a content hash of both files, so swapping the model
+    in place never reuses vectors, versions or watermarks of the old one.
+    """
+
+    def __init__(
+        self,
+        model_dir: str = EMBED_MODEL_DIR,
+        batch_size: int = 32,
+        threads: int = EMBED_THREADS,
+        max_length: int = 512,
+    ):
+        super().__init__()
+        try:
+            import numpy as np
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("EMBED_BACKEND=onnx requires: pip install onnxruntime tokenizers") from e
+
+        path = Path(model_dir)
+        if not (path / "model.onnx").exists() or not (path / "tokenizer.json").exists():
+            raise FileNotFoundError(f"{path} must contain model.onnx and tokenizer.json")
+
+        self.np = np
+        self.batch_size = batch_size
+        self._model_id = f"onnx:{path.resolve().name}:{_file_digest(path / 'model.onnx', path / 'tokenizer.json')}"
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or (os.cpu_count() or 1)
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(path / "model.onnx"), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(path / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        # tokenizers objects are not safe to share across threads mid-call
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return self._model_id
+
+    def _run(self, texts: List[str]):
+        np = self.np
+        with self._lock:
+            encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        output = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+        if output.ndim == 3:
+            mask = attention_mask[..., None].astype(output.dtype)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return output / np.clip(norms, 1e-12, None)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._run(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic signed feature hashing of words and character bigrams
+
+    Character bigrams keep Korean substrings (강남구 / 강남) close without a
+    tokenizer. Same text -> same vector on every machine.
+    """
+
+    _word = re.compile(r"\w+")
+
+    def __init__(self, dim: int = EMBED_HASH_DIM):
+        super().__init__()
+        self._dim = dim
+
+    @property
+    def model_id(self) -> str:
+        return f"hashing:{self._dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = self._word.findall(text.lower())
+        features = [f"w:{w}" for w in words]
+        for word in words:
+            features.extend(f"c:{word[i:i + 2]}" for i in range(len(word) - 1))
+        return features
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self._dim
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self._dim
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+BACKENDS = {"ollama": OllamaEmbedder, "onnx": OnnxEmbedder, "hashing": HashingEmbedder}
+
+_embedders: Dict[str, Embedder] = {}
+_lock = threading.Lock()
+
+
+def get_embedder(backend: Optional[str] = None) -> Embedder:
+    """Shared embedder for the configured backend (created once per process)"""
+    backend = backend or EMBED_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBED_BACKEND '{backend}' (choose from {', '.join(BACKENDS)})")
+    with _lock:
+        if backend not in _embedders:
+            _embedders[backend] = BACKENDS[backend]()
+        return _embedders[backend]
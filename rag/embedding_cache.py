@@ -0,0 +1,95 @@
+"""
+Persistent embedding cache keyed by (embed model, text hash)
+
+One document per vector in the embedding_cache collection:
+
+    {
+        "_id": "<model>:<sha256 of text>",
+        "model", "hash", "dim",
+        "vector": <float32 little-endian bytes>,
+        "created_at"
+    }
+
+Vectors are stored as packed float32 rather than BSON double arrays, which
+halves their size. Changing the embedding backend or model changes the key, so vectors from
+different models never mix.
+"""
+
+import hashlib
+import sys
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from bson.binary import Binary
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: List[float]) -> bytes:
+    packed = array("f", vector)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(data: bytes) -> List[float]:
+    packed = array("f")
+    packed.frombytes(data)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tolist()
+
+
+class EmbeddingCache:
+    """Mongo-backed (model, text hash) -> vector cache"""
+
+    def __init__(self, collection: Collection, model: str):
+        self.collection = collection
+        self.model = model
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    def _key(self, hash_: str) -> str:
+        return f"{self.model}:{hash_}"
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """hash -> vector for the hashes already cached"""
+        wanted = {self._key(h): h for h in hashes}
+        if not wanted:
+            return {}
+        found = {
+            wanted[doc["_id"]]: _unpack(doc["vector"])
+            for doc in self.collection.find({"_id": {"$in": list(wanted)}}, {"vector": 1})
+        }
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(wanted) - len(found)
+        return found
+
+    def put_many(self, vectors: Dict[str, List[float]]) -> int:
+        if not vectors:
+            return 0
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {"_id": self._key(hash_)},
+                {"$setOnInsert": {
+                    "model": self.model,
+                    "hash": hash_,
+                    "dim": len(vector),
+                    "vector": Binary(_pack(vector)),
+                    "created_at": now,
+                }},
+                upsert=True,
+            )
+            for hash_, vector in vectors.items()
+        ]
+        self.collection.bulk_write(ops, ordered=False)
+        self.stats["stored"] += len(ops)
+        return len(ops)
+
+    def count(self, model: Optional[str] = None) -> int:
+        return self.collection.count_documents({"model": model or self.model})
@@ -5,7 +5,7 @@ from typing import Optional
 
 from services.kamco_collector_service import KamcoCollectorService
 from normalize.kamco_normalizer import normalize
-from rag.embed import embed, setup_collection
+from rag.embed import embed, rebuild, setup_collection
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,7 +20,7 @@ class RAGManager:
         
     def collect_and_process(
         self,
-        max_pages: int = 5,
+        max_pages: Optional[int] = 5,
         auto_normalize: bool = True,
         auto_embed: bool = True,
         recreate_collection: bool = False
@@ -29,10 +29,10 @@ class RAGManager:
         Collect data from KAMCO API and process it through the RAG pipeline
         
         Args:
-            max_pages: Maximum number of pages to collect
+            max_pages: Maximum number of pages to collect (None: full sweep driven by totalCount)
             auto_normalize: Automatically normalize data after collection
             auto_embed: Automatically embed data after normalization
-            recreate_collection: Recreate Qdrant collection (warning: deletes existing data)
+            recreate_collection: Rebuild the Qdrant collection into a new version (zero downtime)
             
         Returns:
             dict: Statistics about the operation
@@ -46,14 +46,14 @@ class RAGManager:
         
         # Step 1: Collect data
         try:
-            logger.info(f"Starting data collection (max {max_pages} pages)...")
+            logger.info(f"Starting data collection (max {max_pages or 'all'} pages)...")
             self.collector = KamcoCollectorService(service_key=self.service_key)
             
             if not self.collector.connect_mongodb():
                 stats["errors"].append("Failed to connect to MongoDB")
                 return stats
             
-            collection_result = self.collector.collect_data(max_pages=max_pages)
+            collection_result = self.collector.run_full_sweep(max_pages=max_pages)
             stats["collection"] = collection_result
             logger.info(f"Collection completed: {collection_result}")
             
@@ -83,12 +83,14 @@ class RAGManager:
             try:
                 logger.info("Starting data embedding...")
                 
-                # Optionally recreate collection
+                # Optionally rebuild into a fresh collection (the live one keeps serving)
                 if recreate_collection:
-                    logger.warning("Recreating Qdrant collection (existing data will be deleted)")
+                    logger.warning("Rebuilding Qdrant collection into a new version")
+                    if not rebuild()["switched"]:
+                        raise RuntimeError("rebuilt collection failed validation")
+                else:
                     setup_collection()
-                
-                embed()
+                    embed()
                 stats["embedding"] = True
                 logger.info("Embedding completed")
             except Exception as e:
@@ -116,10 +118,12 @@ class RAGManager:
             logger.info("Embedding existing data...")
             
             if recreate_collection:
-                logger.warning("Recreating Qdrant collection")
+                logger.warning("Rebuilding Qdrant collection into a new version")
+                if not rebuild()["switched"]:
+                    raise RuntimeError("rebuilt collection failed validation")
+            else:
                 setup_collection()
-            
-            embed()
+                embed()
             logger.info("Embedding completed")
             return True
         except Exception as e:
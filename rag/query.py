@@ -8,16 +8,19 @@ from datetime import datetime
 import ollama
 from dotenv import load_dotenv
 from qdrant_client import QdrantClient
+from qdrant_client.http import models
 from pymongo import MongoClient, DESCENDING
 import string
 
+from rag.embedders import get_embedder
+from rag.storage_profiles import collection_search_params
+
 load_dotenv()
 
 # Configuration
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 COLLECTION = os.getenv("QDRANT_COLLECTION", "kamco")
-EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text:latest")
 LLM_MODEL = os.getenv("LLM_MODEL", "gemma3:12b")
 TOP_K = int(os.getenv("TOP_K", "5"))
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
@@ -43,7 +46,7 @@ if start_clients:
         logger.error(f"Failed to initialize MongoDB client: {e}")
 
 
-def get_latest_documents(limit: int = 5) -> List[Dict]:
+def get_latest_documents(limit: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
     """Fetch latest documents directly from MongoDB"""
     if db is None:
         logger.warning("MongoDB not connected, cannot fetch latest documents.")
@@ -51,7 +54,7 @@ def get_latest_documents(limit: int = 5) -> List[Dict]:
     
     docs = []
     try:
-        cursor = db.normalized_items.find().sort("normalized_at", DESCENDING).limit(limit)
+        cursor = db.normalized_items.find(build_mongo_filter(filters)).sort("normalized_at", DESCENDING).limit(limit)
         for doc in cursor:
             docs.append({
                 "id": str(doc["_id"]),
@@ -59,7 +62,7 @@ def get_latest_documents(limit: int = 5) -> List[Dict]:
                 "text": doc.get("text", "")
             })
             
-        if not docs:
+        if not docs and not filters:
              cursor = db.collected_items.find().sort("collected_at", DESCENDING).limit(limit)
              from normalize.kamco_normalizer import _build_text_from_collected
              for doc in cursor:
@@ -76,20 +79,76 @@ def get_latest_documents(limit: int = 5) -> List[Dict]:
     return docs
 
 
-def search_vector(query: str, limit: int = TOP_K) -> List[Dict]:
-    """Search Qdrant for similar documents"""
+def _filter_value(value) -> Union[str, int, float]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def build_qdrant_filter(filters: Optional[Dict]) -> Optional[models.Filter]:
+    """
+    Typed payload filter (see normalize.kamco_normalizer._extract_fields)
+
+    filters keys: sido, sigungu (equality); min_price, max_price (min_bid_price range);
+    closing_after, closing_before (bid_end_at range, datetime or ISO string)
+    """
+    if not filters:
+        return None
+    must = []
+    for key in ("sido", "sigungu"):
+        if filters.get(key):
+            must.append(models.FieldCondition(key=key, match=models.MatchValue(value=filters[key])))
+    if filters.get("min_price") is not None or filters.get("max_price") is not None:
+        must.append(models.FieldCondition(
+            key="min_bid_price",
+            range=models.Range(gte=filters.get("min_price"), lte=filters.get("max_price")),
+        ))
+    if filters.get("closing_after") or filters.get("closing_before"):
+        must.append(models.FieldCondition(
+            key="bid_end_at",
+            range=models.DatetimeRange(
+                gte=_filter_value(filters.get("closing_after")),
+                lte=_filter_value(filters.get("closing_before")),
+            ),
+        ))
+    return models.Filter(must=must) if must else None
+
+
+def build_mongo_filter(filters: Optional[Dict]) -> Dict:
+    """The same filters as a normalized_items query on the indexed fields.* paths"""
+    query: Dict = {}
+    if not filters:
+        return query
+    for key in ("sido", "sigungu"):
+        if filters.get(key):
+            query[f"fields.{key}"] = filters[key]
+    price = {op: filters[key] for op, key in (("$gte", "min_price"), ("$lte", "max_price")) if filters.get(key) is not None}
+    if price:
+        query["fields.min_bid_price"] = price
+    closing = {
+        op: datetime.fromisoformat(filters[key]) if isinstance(filters[key], str) else filters[key]
+        for op, key in (("$gte", "closing_after"), ("$lte", "closing_before"))
+        if filters.get(key)
+    }
+    if closing:
+        query["fields.bid_end_at"] = closing
+    return query
+
+
+def search_vector(query: str, limit: int = TOP_K, filters: Optional[Dict] = None) -> List[Dict]:
+    """Search Qdrant for similar documents (optionally filtered on typed payload fields)"""
     if not qdrant:
         logger.error("Qdrant client not ready")
         return []
         
     try:
-        # Generate embedding for query
-        emb = ollama.embeddings(model=EMBED_MODEL, prompt=query)["embedding"]
+        # Same backend and model as rag/embed.py used for the documents
+        emb = get_embedder().embed_query(query)
         
         # Search Qdrant
         results = qdrant.search(
             collection_name=COLLECTION,
             query_vector=emb,
+            query_filter=build_qdrant_filter(filters),
+            search_params=collection_search_params(qdrant, COLLECTION),
             limit=limit,
             with_payload=True
         )
@@ -106,7 +165,7 @@ def search_vector(query: str, limit: int = TOP_K) -> List[Dict]:
         logger.error(f"Vector search error: {e}")
         return []
 
-def keyword_search(query: str, limit: int = 5) -> List[Dict]:
+def keyword_search(query: str, limit: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
     """Search using MongoDB text/regex match (Exact/Partial Match)"""
     if db is None:
         return []
@@ -127,7 +186,8 @@ def keyword_search(query: str, limit: int = 5) -> List[Dict]:
     try:
         # Increase internal limit to gather candidates, then rank
         cursor = db.normalized_items.find({
-            "text": {"$regex": regex_pattern, "$options": "i"}
+            "text": {"$regex": regex_pattern, "$options": "i"},
+            **build_mongo_filter(filters),
         }).limit(50) 
         
         candidates = []
@@ -156,9 +216,12 @@ def keyword_search(query: str, limit: int = 5) -> List[Dict]:
     return docs
 
 
-def smart_search(query: str, limit: int = TOP_K) -> List[Dict]:
+def smart_search(query: str, limit: int = TOP_K, filters: Optional[Dict] = None) -> List[Dict]:
     """
     Intelligent search: Latest -> Keyword -> Vector
+
+    filters (sido, sigungu, min_price, max_price, closing_after, closing_before)
+    are applied inside MongoDB / Qdrant on the typed normalized fields.
     """
     query_lower = query.lower()
     
@@ -168,7 +231,7 @@ def smart_search(query: str, limit: int = TOP_K) -> List[Dict]:
     
     if any(k in query_lower for k in time_keywords) and not is_specific_year: 
         logger.info(f"Detected time-based query: '{query}'")
-        return get_latest_documents(limit)
+        return get_latest_documents(limit, filters)
     
     # 2. Keyword Search (for specific titles or short queries)
     keyword_results = []
@@ -179,10 +242,10 @@ def smart_search(query: str, limit: int = TOP_K) -> List[Dict]:
     
     if should_keyword_search:
         logger.info(f"Detected potential Title/Keyword query: '{query}'")
-        keyword_results = keyword_search(query, limit)
+        keyword_results = keyword_search(query, limit, filters)
     
     # 3. Vector Search (Semantic)
-    vector_results = search_vector(query, limit)
+    vector_results = search_vector(query, limit, filters)
     
     # 4. Combine (Deduplicate by ID)
     seen_ids = set()
@@ -0,0 +1,145 @@
+"""
+Qdrant storage profiles: how a collection trades RAM for recall and latency
+
+    memory  float32 vectors and HNSW graph in RAM (original layout)
+    int8    scalar int8 quantized copy in RAM, originals on disk, rescored
+    binary  1-bit quantized copy in RAM, originals on disk, oversampled + rescored
+    disk    everything on disk (vectors, payload, HNSW graph); smallest RAM
+
+QDRANT_PROFILE selects the profile for new collections (rebuild()).
+QDRANT_HNSW_M / QDRANT_HNSW_EF_CONSTRUCT override the HNSW parameters and
+QDRANT_OVERSAMPLING the search-time oversampling of quantized profiles.
+
+Searches use collection_search_params(), which reads the profile back from
+the live collection's config, so a query process whose QDRANT_PROFILE
+differs from the one the collection was built with still rescores right.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from qdrant_client.http import models
+
+STORAGE_PROFILES: Dict[str, Dict] = {
+    "memory": {"on_disk": False, "on_disk_payload": False, "quantization": None, "m": 16, "ef_construct": 100, "oversampling": 1.0},
+    "int8": {"on_disk": True, "on_disk_payload": True, "quantization": "int8", "m": 16, "ef_construct": 128, "oversampling": 1.5},
+    "binary": {"on_disk": True, "on_disk_payload": True, "quantization": "binary", "m": 16, "ef_construct": 128, "oversampling": 3.0},
+    "disk": {"on_disk": True, "on_disk_payload": True, "quantization": None, "m": 16, "ef_construct": 100, "oversampling": 1.0, "hnsw_on_disk": True},
+}
+
+DEFAULT_PROFILE = os.getenv("QDRANT_PROFILE", "memory")
+
+
+def get_profile(name: Optional[str] = None) -> Dict:
+    name = name or DEFAULT_PROFILE
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown Qdrant profile '{name}' (choose from {', '.join(STORAGE_PROFILES)})")
+    profile = dict(STORAGE_PROFILES[name], name=name)
+    if os.getenv("QDRANT_HNSW_M"):
+        profile["m"] = int(os.getenv("QDRANT_HNSW_M"))
+    if os.getenv("QDRANT_HNSW_EF_CONSTRUCT"):
+        profile["ef_construct"] = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT"))
+    if os.getenv("QDRANT_OVERSAMPLING"):
+        profile["oversampling"] = float(os.getenv("QDRANT_OVERSAMPLING"))
+    return profile
+
+
+def collection_kwargs(dim: int, profile_name: Optional[str] = None) -> Dict:
+    """create_collection keyword arguments for a profile"""
+    profile = get_profile(profile_name)
+    kwargs = {
+        "vectors_config": models.VectorParams(size=dim, distance=models.Distance.COSINE, on_disk=profile["on_disk"]),
+        "on_disk_payload": profile["on_disk_payload"],
+        "hnsw_config": models.HnswConfigDiff(
+            m=profile["m"], ef_construct=profile["ef_construct"], on_disk=profile.get("hnsw_on_disk", False),
+        ),
+    }
+    if profile["quantization"] == "int8":
+        kwargs["quantization_config"] = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif profile["quantization"] == "binary":
+        kwargs["quantization_config"] = models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return kwargs
+
+
+def search_params(profile_name: Optional[str] = None, exact: bool = False) -> models.SearchParams:
+    """
+    Search parameters matching a profile
+
+    Rescoring re-ranks the quantized candidates with the original vectors;
+    Qdrant ignores the quantization part for collections without quantization.
+    """
+    profile = get_profile(profile_name)
+    return models.SearchParams(
+        exact=exact,
+        quantization=models.QuantizationSearchParams(rescore=True, oversampling=profile["oversampling"]),
+    )
+
+
+def detect_profile(client, collection: str) -> str:
+    """
+    Storage profile a collection (or alias) was built with, read from its config
+
+    Quantization decides int8/binary; an on-disk HNSW graph or on-disk
+    vectors without quantization means disk; anything else is memory.
+    """
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == collection:
+            collection = alias.collection_name
+            break
+    config = client.get_collection(collection).config
+    quantization = config.quantization_config
+    if isinstance(quantization, models.ScalarQuantization):
+        return "int8"
+    if isinstance(quantization, models.BinaryQuantization):
+        return "binary"
+    vectors = config.params.vectors
+    if (config.hnsw_config and config.hnsw_config.on_disk) or getattr(vectors, "on_disk", False):
+        return "disk"
+    return "memory"
+
+
+# collection -> (expires_at, profile); re-read periodically so alias switches are picked up
+_detected: Dict[str, Tuple[float, str]] = {}
+_detected_lock = threading.Lock()
+
+
+def collection_search_params(client, collection: str, exact: bool = False, ttl: float = 60.0) -> models.SearchParams:
+    """search_params() for the profile the live collection was built with (falls back to QDRANT_PROFILE)"""
+    now = time.monotonic()
+    with _detected_lock:
+        cached = _detected.get(collection)
+    if cached and cached[0] > now:
+        profile = cached[1]
+    else:
+        try:
+            profile = detect_profile(client, collection)
+        except Exception:
+            profile = cached[1] if cached else get_profile()["name"]
+        with _detected_lock:
+            _detected[collection] = (now + ttl, profile)
+    return search_params(profile, exact)
+
+
+def estimate_ram_bytes(count: int, dim: int, profile_name: Optional[str] = None) -> int:
+    """
+    Rough resident memory for vectors + HNSW links (payload excluded)
+
+    float32 vectors: count * dim * 4; int8 copy: count * dim; binary copy:
+    count * dim / 8; HNSW links: count * m * 2 * 4 bytes. On-disk parts are
+    served from the page cache and not counted.
+    """
+    profile = get_profile(profile_name)
+    total = 0 if profile["on_disk"] else count * dim * 4
+    if profile["quantization"] == "int8":
+        total += count * dim
+    elif profile["quantization"] == "binary":
+        total += count * ((dim + 7) // 8)
+    if not profile.get("hnsw_on_disk"):
+        total += count * profile["m"] * 2 * 4
+    return total
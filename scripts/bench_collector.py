@@ -0,0 +1,149 @@
+"""수집기 처리량 벤치마크: KamcoCollectorService 를 로컬 onbid 대역 서버에 대해 실행
+
+실제 API, MongoDB 없이 전체 수집(run_full_sweep, save_to_db=False)을 돌리고
+items/sec 와 오퍼레이션별 호출 지연 p50/p99 를 출력한다. 호출 지연은
+transport.call 단위(재시도/백오프 포함)로 측정한다.
+
+Usage:
+  python scripts/bench_collector.py                                  # 내장 대역 서버
+  python scripts/bench_collector.py --total-count 2000 --latency-ms 80 --throttle-rate 0.02
+  python scripts/bench_collector.py --base-url http://127.0.0.1:8099/openapi/services
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.mock_onbid_server import start_mock_server
+from services.adaptive import AdaptiveLimiter, CircuitBreakers
+from services.kamco_collector_service import KamcoCollectorService
+from services.onbid_transport import OnbidTransport
+from services.rate_limiter import RateLimiter
+
+
+class TimedTransport(OnbidTransport):
+    """OnbidTransport that records wall-clock latency per operation"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self._latency_lock = threading.Lock()
+
+    def get(self, url, params=None, operation=None, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().get(url, params=params, operation=operation, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._latency_lock:
+                self.latencies[operation or url].append(elapsed)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="이미 실행 중인 대역 서버 (없으면 내장 서버 기동)")
+    parser.add_argument("--total-count", type=int, default=500, help="내장 서버 totalCount")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rows", type=int, default=100, help="페이지당 건수")
+    parser.add_argument("--max-pages", type=int)
+    parser.add_argument("--rps", type=float, default=0, help="초당 요청 제한 (0: 무제한)")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 상세 조회 공고 수")
+    parser.add_argument("--page-workers", type=int, default=2)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--backoff-base", type=float, default=0.1)
+    parser.add_argument("--adaptive", action="store_true", help="AIMD 동시 요청 한도 + 서킷 브레이커")
+    parser.add_argument("--max-inflight", type=int, default=32)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = start_mock_server(
+            total_count=args.total_count,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            seed=args.seed,
+        )
+        base_url = server.base_url
+
+    rate_limiter = RateLimiter(args.rps)
+    transport = TimedTransport(
+        base_url=base_url,
+        max_retries=args.max_retries,
+        backoff_base=args.backoff_base,
+        pool_size=max(10, (args.concurrency + args.page_workers) * 2),
+        rate_limiter=rate_limiter,
+        limiter=AdaptiveLimiter(initial=args.concurrency, max_limit=args.max_inflight) if args.adaptive else None,
+        breakers=CircuitBreakers(reset_timeout=5.0) if args.adaptive else None,
+    )
+    service = KamcoCollectorService(
+        service_key="bench",
+        requests_per_second=args.rps,
+        max_workers=args.concurrency,
+        page_workers=args.page_workers,
+        transport=transport,
+    )
+
+    t0 = time.perf_counter()
+    stats = service.run_full_sweep(
+        num_of_rows=args.rows,
+        save_to_db=False,
+        page_workers=args.page_workers,
+        concurrency=args.concurrency,
+        max_pages=args.max_pages,
+    )
+    elapsed = time.perf_counter() - t0
+    transport.close()
+
+    all_latencies = [v for values in transport.latencies.values() for v in values]
+    items = stats["processed_announces"]
+
+    print()
+    print("=" * 80)
+    print(f"Collector benchmark ({base_url})")
+    print("=" * 80)
+    print(f"elapsed: {elapsed:.2f}s, items: {items}, failed: {stats['failed_announces']}, "
+          f"failed pages: {stats['failed_pages']}")
+    print(f"items/sec: {items / elapsed if elapsed else 0:.1f}, calls/sec: {len(all_latencies) / elapsed if elapsed else 0:.1f}")
+    print()
+    print(f"{'operation':<38}{'calls':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    rows = sorted(transport.latencies.items()) + [("(all)", all_latencies)]
+    for operation, values in rows:
+        print(
+            f"{operation:<38}{len(values):>8}{percentile(values, 50) * 1000:>10.1f}"
+            f"{percentile(values, 99) * 1000:>10.1f}{max(values, default=0) * 1000:>10.1f}"
+        )
+    if args.adaptive:
+        print(f"adaptive: {transport.health()}")
+    if server is not None:
+        injected = server.mock.stats
+        print()
+        print(f"server: {sum(v for k, v in injected.items() if not k.startswith('_'))} requests, "
+              f"{injected['_injected_errors']} injected 500s, {injected['_injected_throttles']} injected throttles")
+        server.shutdown()
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
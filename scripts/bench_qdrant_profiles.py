@@ -0,0 +1,173 @@
+"""Qdrant 저장 프로필 벤치마크: 메모리 추정치, recall@k (정확 검색 대비), 검색 지연
+
+프로필마다 임시 컬렉션(<QDRANT_COLLECTION>_bench_<profile>)을 만들어 같은 벡터를
+적재한 뒤, 정확 검색(exact, 양자화 무시) 결과를 정답으로 ANN 검색의 recall@k 와
+p50/p99 지연을 잰다. 메모리는 벡터 + HNSW 링크 기준 추정치다 (페이로드 제외).
+
+Usage:
+  python scripts/bench_qdrant_profiles.py                          # 운영 컬렉션 벡터 (최대 --limit 건)
+  python scripts/bench_qdrant_profiles.py --synthetic 20000 --dim 768
+  python scripts/bench_qdrant_profiles.py --profiles memory int8 binary --k 10 --queries 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from rag.storage_profiles import STORAGE_PROFILES, collection_kwargs, estimate_ram_bytes, search_params
+
+load_dotenv()
+
+QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
+QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+COLLECTION = os.getenv("QDRANT_COLLECTION", "kamco")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def live_vectors(client: QdrantClient, limit: int) -> List[List[float]]:
+    vectors: List[List[float]] = []
+    offset = None
+    while len(vectors) < limit:
+        points, offset = client.scroll(
+            collection_name=COLLECTION, limit=min(1000, limit - len(vectors)), offset=offset,
+            with_payload=False, with_vectors=True,
+        )
+        vectors.extend(point.vector for point in points)
+        if offset is None:
+            break
+    return vectors
+
+
+def synthetic_vectors(count: int, dim: int, clusters: int = 50, seed: int = 42) -> List[List[float]]:
+    """Clustered gaussian vectors (closer to real embeddings than uniform noise)"""
+    rng = random.Random(seed)
+    centers = [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(clusters)]
+    return [
+        [c + rng.gauss(0, 0.35) for c in centers[rng.randrange(clusters)]]
+        for _ in range(count)
+    ]
+
+
+def make_queries(vectors: List[List[float]], count: int, seed: int = 7) -> List[List[float]]:
+    """Perturbed copies of stored vectors, so the answer is near but not identical"""
+    rng = random.Random(seed)
+    return [[v + rng.gauss(0, 0.05) for v in rng.choice(vectors)] for _ in range(count)]
+
+
+def wait_green(client: QdrantClient, name: str, timeout: float = 600.0) -> None:
+    deadline = time.monotonic() + timeout
+    while client.get_collection(name).status != models.CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{name} did not finish indexing within {timeout:.0f}s")
+        time.sleep(0.5)
+
+
+def bench_profile(
+    client: QdrantClient, profile: str, vectors: List[List[float]], queries: List[List[float]], k: int,
+) -> Dict:
+    name = f"{COLLECTION}_bench_{profile}"
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    dim = len(vectors[0])
+
+    t0 = time.perf_counter()
+    client.create_collection(collection_name=name, **collection_kwargs(dim, profile))
+    for start in range(0, len(vectors), 256):
+        chunk = vectors[start:start + 256]
+        client.upsert(
+            collection_name=name,
+            points=[models.PointStruct(id=start + i, vector=v) for i, v in enumerate(chunk)],
+            wait=True,
+        )
+    wait_green(client, name)
+    build_seconds = time.perf_counter() - t0
+
+    exact = models.SearchParams(exact=True, quantization=models.QuantizationSearchParams(ignore=True))
+    ann = search_params(profile)
+    latencies: List[float] = []
+    hits = 0
+    for query in queries:
+        truth = {p.id for p in client.search(collection_name=name, query_vector=query, limit=k, search_params=exact)}
+        t0 = time.perf_counter()
+        found = client.search(collection_name=name, query_vector=query, limit=k, search_params=ann)
+        latencies.append(time.perf_counter() - t0)
+        hits += len(truth & {p.id for p in found})
+
+    return {
+        "collection": name,
+        "ram_mb": estimate_ram_bytes(len(vectors), dim, profile) / 1024 / 1024,
+        "recall": hits / (k * len(queries)),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "build_s": build_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", choices=list(STORAGE_PROFILES), default=list(STORAGE_PROFILES))
+    parser.add_argument("--limit", type=int, default=20000, help="운영 컬렉션에서 읽을 최대 벡터 수")
+    parser.add_argument("--synthetic", type=int, help="합성 벡터 수 (지정 시 운영 컬렉션 대신 사용)")
+    parser.add_argument("--dim", type=int, default=768, help="합성 벡터 차원")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--keep-collections", action="store_true", help="벤치마크 컬렉션을 지우지 않음")
+    args = parser.parse_args()
+
+    client = QdrantClient(QDRANT_HOST, port=QDRANT_PORT)
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, args.dim)
+        source = f"synthetic {args.synthetic} x {args.dim}"
+    else:
+        vectors = live_vectors(client, args.limit)
+        source = f"'{COLLECTION}' ({len(vectors)} vectors)"
+    if not vectors:
+        print("벡터가 없습니다. --synthetic 으로 실행하거나 먼저 rag/embed.py 를 실행하세요.")
+        sys.exit(1)
+    queries = make_queries(vectors, args.queries)
+
+    results = {}
+    try:
+        for profile in args.profiles:
+            print(f"[{profile}] 적재 및 측정 중...")
+            results[profile] = bench_profile(client, profile, vectors, queries, args.k)
+    finally:
+        if not args.keep_collections:
+            for profile in args.profiles:
+                name = f"{COLLECTION}_bench_{profile}"
+                if client.collection_exists(name):
+                    client.delete_collection(name)
+
+    print()
+    print("=" * 80)
+    print(f"Qdrant storage profiles: {source}, {args.queries} queries, k={args.k}")
+    print("=" * 80)
+    print(f"{'profile':<10}{'est. RAM(MB)':>14}{f'recall@{args.k}':>12}{'p50(ms)':>10}{'p99(ms)':>10}{'build(s)':>10}")
+    for profile, r in results.items():
+        print(
+            f"{profile:<10}{r['ram_mb']:>14.1f}{r['recall']:>12.3f}{r['p50_ms']:>10.2f}"
+            f"{r['p99_ms']:>10.2f}{r['build_s']:>10.1f}"
+        )
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
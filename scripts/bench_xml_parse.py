@@ -0,0 +1,143 @@
+"""onbid XML 파싱 마이크로 벤치마크: xmltodict.parse vs OnbidXmlStream
+
+OnbidXmlStream 은 list() 로 모두 모으는 경우(수집기 fetch_* 경로)와 한 건씩
+소비하는 경우(lazy)를 따로 잰다. 최대 메모리 이득은 lazy 소비에서만 나온다.
+
+Usage:
+  python scripts/bench_xml_parse.py                      # 합성 페이지 (numOfRows=1000)
+  python scripts/bench_xml_parse.py --pages-dir ./pages  # 녹화된 응답 (*.xml)
+  python scripts/bench_xml_parse.py --cache-dir .cache/onbid  # --record 로 캐시된 목록 응답
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Union
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import xmltodict
+
+from services.onbid_xml import OnbidXmlStream
+from services.response_cache import ResponseCache
+
+ITEM_TEMPLATE = """<item>
+<RNUM>{n}</RNUM><PLNM_NO>{plnm}</PLNM_NO><PBCT_NO>{pbct}</PBCT_NO>
+<PLNM_NM>2025년도 제{n}회 수탁재산 공매공고</PLNM_NM><ORG_NM>한국자산관리공사</ORG_NM>
+<PRPT_DVSN_NM>금융권담보재산</PRPT_DVSN_NM><BID_MTD_NM>일반경쟁</BID_MTD_NM>
+<DPSL_MTD_NM>매각</DPSL_MTD_NM><PLNM_KIND_NM>일반</PLNM_KIND_NM>
+<PBCT_BEGN_DTM>20250101100000</PBCT_BEGN_DTM><PBCT_CLS_DTM>20250110170000</PBCT_CLS_DTM>
+<PLNM_DT>20241220</PLNM_DT><PLNM_TYPE_NM>부동산</PLNM_TYPE_NM>
+</item>"""
+
+
+def synthetic_page(rows: int = 1000) -> bytes:
+    items = "".join(
+        ITEM_TEMPLATE.format(n=i, plnm=202500000 + i, pbct=9000000 + i)
+        for i in range(1, rows + 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        "<response><header><resultCode>00</resultCode><resultMsg>NORMAL SERVICE.</resultMsg></header>"
+        f"<body><items>{items}</items><numOfRows>{rows}</numOfRows><pageNo>1</pageNo>"
+        f"<totalCount>{rows}</totalCount></body></response>"
+    ).encode("utf-8")
+
+
+def parse_xmltodict(xml: bytes) -> List[dict]:
+    """현재 수집기 경로 (services/kamco_collector_service.py 이전 구현)"""
+    payload = xmltodict.parse(xml)
+    header = (payload.get("response") or {}).get("header") or {}
+    body = (payload.get("response") or {}).get("body") or {}
+    str(header.get("resultCode"))
+    item_list = (body.get("items") or {}).get("item", [])
+    return item_list if isinstance(item_list, list) else [item_list]
+
+
+def parse_stream(xml: bytes) -> List[dict]:
+    stream = OnbidXmlStream(xml, item_tags=("item",))
+    stream.result_code
+    return list(stream)
+
+
+def parse_stream_lazy(xml: bytes) -> int:
+    """Items consumed one at a time and dropped (no list of all rows)"""
+    stream = OnbidXmlStream(xml, item_tags=("item",))
+    stream.result_code
+    return sum(1 for _ in stream)
+
+
+def measure(fn: Callable[[bytes], Union[List[dict], int]], pages: List[bytes], repeat: int) -> dict:
+    def count(result) -> int:
+        return result if isinstance(result, int) else len(result)
+
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = sum(count(fn(page)) for page in pages)
+        timings.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    for page in pages:
+        fn(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "rows": rows,
+        "best_sec": best,
+        "median_sec": statistics.median(timings),
+        "rows_per_sec": rows / best if best else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages-dir", type=Path, help="녹화된 XML 응답 디렉터리 (*.xml)")
+    parser.add_argument("--cache-dir", type=Path, help="응답 캐시 디렉터리 (getKamcoPlnmPbctList)")
+    parser.add_argument("--rows", type=int, default=1000, help="합성 페이지 행 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = [p.read_bytes() for p in sorted(args.pages_dir.glob("*.xml"))]
+        source = f"{len(pages)} recorded pages from {args.pages_dir}"
+    elif args.cache_dir:
+        cache = ResponseCache(cache_dir=str(args.cache_dir), mode="replay")
+        pages = [body for _, body in cache.iter_bodies("getKamcoPlnmPbctList")]
+        source = f"{len(pages)} cached pages from {args.cache_dir}"
+    else:
+        pages = [synthetic_page(args.rows)]
+        source = f"1 synthetic page, numOfRows={args.rows}"
+
+    if not pages:
+        print("❌ No pages to benchmark")
+        sys.exit(1)
+
+    print("=" * 80)
+    print(f"XML parse benchmark ({source}, {sum(map(len, pages)) / 1024:.0f} KiB)")
+    print("=" * 80)
+    results = {
+        "xmltodict.parse": measure(parse_xmltodict, pages, args.repeat),
+        "OnbidXmlStream": measure(parse_stream, pages, args.repeat),
+        "stream (lazy)": measure(parse_stream_lazy, pages, args.repeat),
+    }
+    print(f"{'parser':<18}{'rows':>8}{'best(ms)':>12}{'median(ms)':>12}{'rows/s':>12}{'peak KiB':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:<18}{r['rows']:>8}{r['best_sec'] * 1000:>12.1f}{r['median_sec'] * 1000:>12.1f}"
+            f"{r['rows_per_sec']:>12.0f}{r['peak_kib']:>12.0f}"
+        )
+    base, new, lazy = results["xmltodict.parse"], results["OnbidXmlStream"], results["stream (lazy)"]
+    print("=" * 80)
+    print(f"speedup: {base['best_sec'] / new['best_sec']:.2f}x, peak memory: {new['peak_kib'] / base['peak_kib']:.2f}x "
+          f"(list), {lazy['peak_kib'] / base['peak_kib']:.2f}x (lazy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""로컬 onbid OpenAPI 대역 서버 (오프라인 부하/처리량 테스트용)
+
+KamcoPblsalThingInquireSvc / ThingInfoInquireSvc 엔드포인트를 흉내 낸다.
+- 합성 XML 응답 (재현 가능한 데이터, pageNo/numOfRows/totalCount 페이지네이션)
+- 녹화된 응답: --cache-dir 에 ResponseCache(--record) 로 저장한 본문이 있으면 우선 사용
+- 지연 (--latency-ms ± --jitter-ms), HTTP 500 비율 (--error-rate),
+  resultCode 22 쓰로틀링 비율 (--throttle-rate)
+- GET /_stats: 오퍼레이션별 요청 수와 주입된 오류 수 (JSON)
+
+Usage:
+  python scripts/mock_onbid_server.py --port 8099 --total-count 5000 --latency-ms 80
+  KAMCO_API_BASE_URL=http://127.0.0.1:8099/openapi/services ...
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+from xml.sax.saxutils import escape
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.response_cache import CacheMissError, ResponseCache
+
+PATH_PREFIX = "/openapi/services"
+
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+
+# data.go.kr 공통 에러 응답 (22: LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR)
+THROTTLE_BODY = (
+    XML_HEAD
+    + "<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg>"
+    "<returnAuthMsg>LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR</returnAuthMsg>"
+    "<returnReasonCode>22</returnReasonCode></cmmMsgHeader></OpenAPI_ServiceResponse>"
+).encode("utf-8")
+
+# ThingInfoInquireSvc 상세 오퍼레이션별 결과 행 태그
+THING_DETAIL_TAGS = {
+    "getUnifyUsageCltrEstimationInfoDetail": "estimationInfo",
+    "getUnifyUsageCltrRentalInfoDetail": "rentalInfo",
+    "getUnifyUsageCltrRegisteredInfoDetail": "registered",
+    "getUnifyUsageCltrBidDateInfoDetail": "bidInfo",
+}
+
+# 마감임박 목록은 전체의 일부만 반환
+DEADLINE_FRACTION = 10
+
+
+def _xml_fields(fields: Dict[str, object]) -> str:
+    return "".join(f"<{k}>{escape(str(v))}</{k}>" for k, v in fields.items())
+
+
+def _response(items: List[Tuple[str, Dict[str, object]]], page_no: int = 1,
+              num_of_rows: int = 10, total_count: Optional[int] = None) -> bytes:
+    if not items:
+        header = "<resultCode>03</resultCode><resultMsg>NODATA_ERROR</resultMsg>"
+    else:
+        header = "<resultCode>00</resultCode><resultMsg>NORMAL SERVICE.</resultMsg>"
+    rows = "".join(f"<{tag}>{_xml_fields(fields)}</{tag}>" for tag, fields in items)
+    total = len(items) if total_count is None else total_count
+    return (
+        f"{XML_HEAD}<response><header>{header}</header><body><items>{rows}</items>"
+        f"<numOfRows>{num_of_rows}</numOfRows><pageNo>{page_no}</pageNo>"
+        f"<totalCount>{total}</totalCount></body></response>"
+    ).encode("utf-8")
+
+
+def _int(params: Dict[str, str], name: str, default: int) -> int:
+    try:
+        return max(1, int(params.get(name, default)))
+    except ValueError:
+        return default
+
+
+def announce_item(n: int) -> Dict[str, object]:
+    return {
+        "RNUM": n,
+        "PLNM_NO": 202500000 + n,
+        "PBCT_NO": 9000000 + n,
+        "PLNM_NM": f"2025년도 제{n}회 수탁재산 공매공고",
+        "ORG_NM": "한국자산관리공사",
+        "PRPT_DVSN_NM": "금융권담보재산",
+        "BID_MTD_NM": "일반경쟁",
+        "DPSL_MTD_NM": "매각",
+        "PLNM_KIND_NM": "일반",
+        "PBCT_BEGN_DTM": "20250101100000",
+        "PBCT_CLS_DTM": "20250110170000",
+        "PLNM_DT": "20241220",
+        "PLNM_TYPE_NM": "부동산",
+    }
+
+
+def thing_item(n: int) -> Dict[str, object]:
+    return {
+        "RNUM": n,
+        "PLNM_NO": 202500000 + n,
+        "PBCT_NO": 9000000 + n,
+        "CLTR_NO": 1000000 + n,
+        "CLTR_MNMT_NO": f"2025-{n:05d}-001",
+        "CLTR_NM": f"서울특별시 강남구 역삼동 {n}번지 아파트",
+        "LDNM_ADRS": f"서울특별시 강남구 역삼동 {n}",
+        "CTGR_FULL_NM": "부동산 / 주거용건물 / 아파트",
+        "APZ_AMT": 500000000 + n * 1000,
+        "MIN_BID_PRC": 350000000 + n * 1000,
+        "PBCT_BEGN_DTM": "20250101100000",
+        "PBCT_CLS_DTM": "20250110170000",
+        "PBCT_CLTR_STAT_NM": "입찰준비중",
+    }
+
+
+class MockOnbid:
+    """Response generator + fault injection, shared by all handler threads"""
+
+    def __init__(
+        self,
+        total_count: int = 1000,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 20.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        cache_dir: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.total_count = total_count
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.recorded = ResponseCache(cache_dir=cache_dir, mode="replay") if cache_dir else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def delay(self) -> float:
+        with self._lock:
+            ms = self._random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        return max(0.0, ms) / 1000
+
+    def fault(self) -> Optional[str]:
+        """'error' (HTTP 500), 'throttle' (resultCode 22) or None"""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.throttle_rate:
+            return "throttle"
+        return None
+
+    def _page(self, params: Dict[str, str], total: int) -> Tuple[int, int, range]:
+        page_no = _int(params, "pageNo", 1)
+        num_of_rows = _int(params, "numOfRows", 10)
+        start = (page_no - 1) * num_of_rows + 1
+        return page_no, num_of_rows, range(start, min(start + num_of_rows, total + 1))
+
+    def _index(self, params: Dict[str, str], field: str, base: int) -> int:
+        try:
+            return int(params.get(field, base + 1)) - base
+        except ValueError:
+            return 0
+
+    def kamco_body(self, operation: str, params: Dict[str, str]) -> Optional[bytes]:
+        if operation == "getKamcoPlnmPbctList":
+            if params.get("SEARCH_TYPE") == "PLNM_NO":
+                n = self._index({"PLNM_NO": params.get("SEARCH_KEYWORD", "")}, "PLNM_NO", 202500000)
+                items = [("item", announce_item(n))] if 1 <= n <= self.total_count else []
+                return _response(items)
+            page_no, num_of_rows, rows = self._page(params, self.total_count)
+            items = [("item", announce_item(n)) for n in rows]
+            return _response(items, page_no, num_of_rows, self.total_count)
+
+        n = self._index(params, "PLNM_NO", 202500000)
+        if not 1 <= n <= self.total_count:
+            return _response([])
+        key = {"PLNM_NO": 202500000 + n, "PBCT_NO": 9000000 + n}
+        if operation == "getKamcoPlnmPbctBasicInfoDetail":
+            item = {**announce_item(n), "RSBY_DEPT": "조세정리부", "PSCG_NM": "홍길동", "PSCG_TPNO": "1588-5321"}
+            item.pop("RNUM")
+            return _response([("item", item)])
+        if operation == "getKamcoPlnmPbctBidDateInfoDetail":
+            items = [
+                ("bidDateInfoItem", {**key, "PBCT_SEQ": seq, "PBCT_BEGN_DTM": f"202501{seq:02d}100000",
+                                     "PBCT_CLS_DTM": f"202501{seq + 2:02d}170000", "PBCT_EXCT_DTM": f"202501{seq + 3:02d}110000"})
+                for seq in (1, 8, 15)
+            ]
+            return _response(items)
+        if operation == "getKamcoPlnmPbctFileInfoDetail":
+            items = [
+                ("fileItem", {**key, "ATCH_FILE_PTCS_NO": f"{n}{i:02d}", "ATCH_FILE_NM": f"공고문_{n}_{i}.pdf"})
+                for i in (1, 2)
+            ]
+            return _response(items)
+        return None
+
+    def thing_body(self, operation: str, params: Dict[str, str]) -> Optional[bytes]:
+        if not operation.endswith("Detail"):
+            total = self.total_count
+            if operation == "getUnifyDeadlineCltrList":
+                total = max(1, total // DEADLINE_FRACTION)
+            page_no, num_of_rows, rows = self._page(params, total)
+            return _response([("item", thing_item(n)) for n in rows], page_no, num_of_rows, total)
+
+        n = self._index(params, "CLTR_NO", 1000000)
+        if not 1 <= n <= self.total_count:
+            return _response([])
+        key = {"CLTR_NO": 1000000 + n, "PBCT_NO": 9000000 + n}
+        tag = THING_DETAIL_TAGS.get(operation)
+        if tag is None:
+            return _response([("item", thing_item(n))])
+        if tag == "estimationInfo":
+            fields = {**key, "APZ_EVL_ORG_NM": "한국감정원", "APZ_AMT": 500000000 + n * 1000, "APZ_DT": "20241201"}
+        elif tag == "rentalInfo":
+            fields = {**key, "IRST_DVSN_NM": "임차인", "TDPS_AMT": 50000000, "MTHR_AMT": 0}
+        elif tag == "registered":
+            fields = {**key, "RGST_DVSN_NM": "근저당권", "RGST_NM": "○○은행", "RGST_AMT": 300000000}
+        else:
+            fields = {**key, "PBCT_SEQ": 1, "PBCT_BEGN_DTM": "20250101100000", "MIN_BID_PRC": 350000000 + n * 1000}
+        return _response([(tag, fields)])
+
+    def handle(self, svc_path: str, operation: str, params: Dict[str, str]) -> Tuple[int, bytes]:
+        self._count(operation)
+        time.sleep(self.delay())
+
+        fault = self.fault()
+        if fault == "error":
+            self._count("_injected_errors")
+            return 500, b"Internal Server Error"
+        if fault == "throttle":
+            self._count("_injected_throttles")
+            return 200, THROTTLE_BODY
+
+        if self.recorded is not None:
+            try:
+                return 200, self.recorded.get(operation, params)
+            except CacheMissError:
+                pass
+
+        if svc_path == "KamcoPblsalThingInquireSvc":
+            body = self.kamco_body(operation, params)
+        elif svc_path == "ThingInfoInquireSvc":
+            body = self.thing_body(operation, params)
+        else:
+            body = None
+        if body is None:
+            return 404, b"Unknown operation"
+        return 200, body
+
+
+class MockOnbidHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockOnbidServer"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            return self._send(200, json.dumps(dict(self.server.mock.stats)).encode("utf-8"), "application/json")
+
+        parts = url.path[len(PATH_PREFIX):].strip("/").split("/") if url.path.startswith(PATH_PREFIX) else []
+        if len(parts) != 2:
+            return self._send(404, b"Not Found")
+        params = dict(parse_qsl(url.query))
+        status, body = self.server.mock.handle(parts[0], parts[1], params)
+        self._send(status, body)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/xml;charset=UTF-8"):
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body, compresslevel=1)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockOnbidServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], mock: MockOnbid):
+        super().__init__(address, MockOnbidHandler)
+        self.mock = mock
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{PATH_PREFIX}"
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config) -> MockOnbidServer:
+    """Start a mock server on a background thread (port=0: pick a free port)"""
+    server = MockOnbidServer((host, port), MockOnbid(**config))
+    threading.Thread(target=server.serve_forever, name="mock-onbid", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--total-count", type=int, default=1000, help="목록 totalCount")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="평균 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="지연 편차 (균등 분포)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500 응답 비율")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="resultCode 22 응답 비율")
+    parser.add_argument("--cache-dir", help="녹화된 응답 (ResponseCache 디렉터리) 우선 사용")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = MockOnbidServer(
+        (args.host, args.port),
+        MockOnbid(
+            total_count=args.total_count,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            cache_dir=args.cache_dir,
+            seed=args.seed,
+        ),
+    )
+    print(f"Mock onbid server: {server.base_url} (totalCount={args.total_count}, latency={args.latency_ms}±{args.jitter_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
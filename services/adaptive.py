@@ -0,0 +1,215 @@
+"""
+Adaptive concurrency and per-endpoint circuit breakers for onbid calls
+
+AdaptiveLimiter caps the number of in-flight HTTP requests and adjusts the
+cap AIMD-style: every healthy response grows it by 1/limit (about +1 per
+round trip of the whole window), while an error, a throttling resultCode
+or a response much slower than the endpoint's baseline latency cuts it by
+`backoff_ratio`, at most once per `cooldown` so one burst of failures
+counts as a single congestion event.
+
+CircuitBreaker stops calling an endpoint after `failure_threshold`
+consecutive failures. Callers are paused (not failed) while it is open;
+after `reset_timeout` a single probe is let through, and its result
+either closes the circuit or opens it again. A caller that has waited
+longer than `max_wait` gets CircuitOpenError.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from exceptions import KamcoApiError
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(KamcoApiError):
+    """Raised when an endpoint's circuit stays open longer than max_wait."""
+    pass
+
+
+class AdaptiveLimiter:
+    """AIMD limit on concurrent in-flight requests"""
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 3.0,
+        cooldown: float = 1.0,
+    ):
+        """
+        Args:
+            initial: 시작 동시 요청 한도
+            min_limit / max_limit: 한도 범위
+            backoff_ratio: 혼잡 시 한도에 곱하는 비율
+            latency_tolerance: 기준 지연의 몇 배부터 혼잡으로 볼지
+            cooldown: 연속 감소 사이 최소 간격(초)
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+
+        self.inflight = 0
+        self._baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self.stats = {"increases": 0, "decreases": 0, "slow": 0}
+
+    def acquire(self) -> None:
+        """Block until an in-flight slot is free"""
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+
+    def _is_slow(self, key: str, latency: float) -> bool:
+        """Compare with the endpoint's baseline (a slowly rising running minimum)"""
+        baseline = self._baselines.get(key)
+        if baseline is None or latency < baseline:
+            self._baselines[key] = latency
+            return False
+        self._baselines[key] = baseline + (latency - baseline) * 0.01
+        return latency > baseline * self.latency_tolerance
+
+    def release(self, key: str, latency: Optional[float], ok: Optional[bool]) -> None:
+        """Free a slot and feed the outcome of the request back into the limit (ok=None: no signal)"""
+        with self._cond:
+            self.inflight -= 1
+            if ok is None:
+                self._cond.notify_all()
+                return
+            slow = ok and latency is not None and self._is_slow(key, latency)
+            if slow:
+                self.stats["slow"] += 1
+
+            if ok and not slow:
+                if self.limit < self.max_limit:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                    self.stats["increases"] += 1
+            else:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    previous = self.limit
+                    self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                    self.stats["decreases"] += 1
+                    log.info("%s: congestion (%s), in-flight limit %.1f -> %.1f",
+                             key, "slow" if ok else "failure", previous, self.limit)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_wait: Optional[float] = 120.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_wait = max_wait
+
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._cond = threading.Condition()
+        self.stats = {"opened": 0, "probes": 0}
+
+    def before_call(self) -> None:
+        """Return when a call may proceed; waits while the circuit is open"""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                if self.state == CLOSED:
+                    return
+                now = time.monotonic()
+                if self.state == OPEN and now >= self._opened_at + self.reset_timeout:
+                    self.state = HALF_OPEN
+                    self._probing = False
+                if self.state == HALF_OPEN and not self._probing:
+                    self._probing = True
+                    self.stats["probes"] += 1
+                    return
+
+                waited = now - start
+                if self.max_wait is not None and waited >= self.max_wait:
+                    raise CircuitOpenError(f"{self.name}: circuit open for {waited:.0f}s")
+                if self.state == OPEN:
+                    timeout = self._opened_at + self.reset_timeout - now
+                else:
+                    timeout = self.reset_timeout  # until the probe reports back
+                if self.max_wait is not None:
+                    timeout = min(timeout, self.max_wait - waited)
+                self._cond.wait(max(timeout, 0.01))
+
+    def cancel(self) -> None:
+        """Give up a half-open probe slot without a verdict"""
+        with self._cond:
+            self._probing = False
+            self._cond.notify_all()
+
+    def record_success(self) -> None:
+        with self._cond:
+            if self.state == OPEN:
+                return  # a call that started before the circuit opened
+            if self.state == HALF_OPEN:
+                log.info("%s: probe succeeded, circuit closed", self.name)
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+            self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        with self._cond:
+            if self.state == OPEN:
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self.stats["opened"] += 1
+                log.warning("%s: %s consecutive failures, circuit open for %.0fs",
+                            self.name, self.failures, self.reset_timeout)
+            self._cond.notify_all()
+
+
+class CircuitBreakers:
+    """Lazily created CircuitBreaker per endpoint, sharing one configuration"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, max_wait: Optional[float] = 120.0):
+        self._config = {
+            "failure_threshold": failure_threshold,
+            "reset_timeout": reset_timeout,
+            "max_wait": max_wait,
+        }
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self._config)
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            return {name: breaker.state for name, breaker in self._breakers.items()}
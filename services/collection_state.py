@@ -0,0 +1,153 @@
+"""
+Incremental collection state stored in MongoDB
+
+- collect_fingerprints: one document per (PLNM_NO, PBCT_NO) holding a sha256
+  of the announcement list item. Detail endpoints are only called when the
+  list item is new or its fingerprint changed.
+- collect_watermarks: one document per PRPT_DVSN_CD with the last completed
+  sweep time and, while a sweep is running, the checkpointed page so an
+  interrupted sweep resumes where it stopped.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+# List item fields that change without the announcement itself changing
+VOLATILE_FIELDS = ("RNUM",)
+
+
+def announce_key(item: Dict) -> str:
+    return f"{item.get('PLNM_NO')}:{item.get('PBCT_NO')}"
+
+
+def fingerprint(item: Dict) -> str:
+    """sha256 of the list item with volatile fields removed"""
+    stable = {k: v for k, v in item.items() if k not in VOLATILE_FIELDS}
+    raw = json.dumps(stable, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CollectionState:
+    """Fingerprints, watermarks and sweep checkpoints"""
+
+    def __init__(
+        self,
+        db: Database,
+        fingerprints_name: str = "collect_fingerprints",
+        watermarks_name: str = "collect_watermarks",
+    ):
+        self.fingerprints = db[fingerprints_name]
+        self.watermarks = db[watermarks_name]
+
+    # ---- change detection -------------------------------------------------
+
+    def filter_changed(self, items: List[Dict]) -> List[Dict]:
+        """Return only items that are new or whose fingerprint changed"""
+        if not items:
+            return []
+        keys = [announce_key(item) for item in items]
+        known = {
+            doc["_id"]: doc.get("fingerprint")
+            for doc in self.fingerprints.find({"_id": {"$in": keys}}, {"fingerprint": 1})
+        }
+        return [
+            item for key, item in zip(keys, items)
+            if known.get(key) != fingerprint(item)
+        ]
+
+    def mark_collected(self, items: Iterable[Dict], prpt_dvsn_cd: Optional[str] = None) -> int:
+        """Record fingerprints for items whose details were collected"""
+        now = datetime.now()
+        ops = [
+            UpdateOne(
+                {"_id": announce_key(item)},
+                {
+                    "$set": {
+                        "PLNM_NO": item.get("PLNM_NO"),
+                        "PBCT_NO": item.get("PBCT_NO"),
+                        "PRPT_DVSN_CD": prpt_dvsn_cd,
+                        "fingerprint": fingerprint(item),
+                        "collected_at": now,
+                    }
+                },
+                upsert=True,
+            )
+            for item in items
+        ]
+        if not ops:
+            return 0
+        self.fingerprints.bulk_write(ops, ordered=False)
+        return len(ops)
+
+    def forget(self, keys: Iterable[str]) -> int:
+        """Drop fingerprints so the next run re-fetches those details"""
+        result = self.fingerprints.delete_many({"_id": {"$in": list(keys)}})
+        return result.deleted_count
+
+    # ---- watermarks / checkpoints ----------------------------------------
+
+    def get_watermark(self, prpt_dvsn_cd: str) -> Optional[Dict]:
+        return self.watermarks.find_one({"_id": prpt_dvsn_cd})
+
+    def resume_page(self, prpt_dvsn_cd: str, num_of_rows: int) -> int:
+        """First page to fetch: after the checkpoint of an unfinished sweep, else 1"""
+        mark = self.get_watermark(prpt_dvsn_cd)
+        if not mark or mark.get("status") != "running":
+            return 1
+        if mark.get("num_of_rows") != num_of_rows:
+            # Page boundaries moved; a checkpoint for another page size is meaningless
+            return 1
+        return int(mark.get("checkpoint_page") or 0) + 1
+
+    def start_sweep(self, prpt_dvsn_cd: str, num_of_rows: int, start_page: int) -> None:
+        update = {
+            "status": "running",
+            "num_of_rows": num_of_rows,
+            "checkpoint_page": start_page - 1,
+            "updated_at": datetime.now(),
+        }
+        if start_page == 1:
+            update["started_at"] = datetime.now()
+        self.watermarks.update_one({"_id": prpt_dvsn_cd}, {"$set": update}, upsert=True)
+
+    def checkpoint(self, prpt_dvsn_cd: str, page_no: int) -> None:
+        """Store the highest page N such that pages 1..N are all done"""
+        self.watermarks.update_one(
+            {"_id": prpt_dvsn_cd},
+            {"$max": {"checkpoint_page": page_no}, "$set": {"updated_at": datetime.now()}},
+        )
+
+    def complete_sweep(self, prpt_dvsn_cd: str, stats: Optional[Dict] = None) -> None:
+        now = datetime.now()
+        update = {
+            "status": "completed",
+            "last_completed_at": now,
+            "checkpoint_page": 0,
+            "updated_at": now,
+        }
+        if stats:
+            update["last_stats"] = dict(stats)
+        self.watermarks.update_one({"_id": prpt_dvsn_cd}, {"$set": update}, upsert=True)
+
+
+class PageCheckpointer:
+    """Tracks out-of-order page completion and reports the contiguous high-water mark"""
+
+    def __init__(self, start_page: int = 1):
+        self.high_water = start_page - 1
+        self._done = set()
+
+    def done(self, page_no: int) -> Optional[int]:
+        """Mark a page as done; returns the new high-water mark if it advanced"""
+        self._done.add(page_no)
+        advanced = False
+        while self.high_water + 1 in self._done:
+            self.high_water += 1
+            self._done.discard(self.high_water)
+            advanced = True
+        return self.high_water if advanced else None
@@ -0,0 +1,122 @@
+"""
+Dead-letter queue for failed or partial announcement detail fetches
+
+One document per (PLNM_NO, PBCT_NO) in collect_dead_letters:
+
+    {
+        "_id": "PLNM_NO:PBCT_NO",
+        "PLNM_NO", "PBCT_NO", "PRPT_DVSN_CD",
+        "announce": <list item, enough to re-fetch details>,
+        "parts": {
+            "schedule_info": {"operation": "getKamco...", "error": "...",
+                              "attempts": 2, "last_failed_at": ...},
+        },
+        "attempts": 2,             # failed runs since the last resolve
+        "status": "pending" | "resolved",
+        "first_failed_at", "updated_at", "resolved_at"
+    }
+
+Only the parts listed under "parts" are missing, so a retry re-fetches
+just those endpoints instead of re-sweeping whole pages.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.database import Database
+
+from services.collection_state import announce_key
+
+PENDING = "pending"
+RESOLVED = "resolved"
+
+
+class DeadLetterQueue:
+    """Persistent record of detail parts that still need to be fetched"""
+
+    def __init__(self, db: Database, collection_name: str = "collect_dead_letters"):
+        self.collection = db[collection_name]
+        self.collection.create_index([("status", ASCENDING), ("attempts", ASCENDING)], name="status_attempts")
+
+    def record_many(self, entries: Iterable[Dict], prpt_dvsn_cd: Optional[str] = None) -> int:
+        """
+        Record failures; each entry is {"announce": item, "failures": {part: {"operation", "error"}}}
+        """
+        now = datetime.now()
+        ops = []
+        for entry in entries:
+            announce = entry["announce"]
+            failures = entry["failures"]
+            if not failures:
+                continue
+            update_set = {
+                "PLNM_NO": announce.get("PLNM_NO"),
+                "PBCT_NO": announce.get("PBCT_NO"),
+                "announce": announce,
+                "status": PENDING,
+                "updated_at": now,
+            }
+            if prpt_dvsn_cd:
+                update_set["PRPT_DVSN_CD"] = prpt_dvsn_cd
+            update_inc = {"attempts": 1}
+            for part, failure in failures.items():
+                update_set[f"parts.{part}.operation"] = failure.get("operation")
+                update_set[f"parts.{part}.error"] = failure.get("error")
+                update_set[f"parts.{part}.last_failed_at"] = now
+                update_inc[f"parts.{part}.attempts"] = 1
+            ops.append(
+                UpdateOne(
+                    {"_id": announce_key(announce)},
+                    {"$set": update_set, "$inc": update_inc, "$setOnInsert": {"first_failed_at": now}, "$unset": {"resolved_at": ""}},
+                    upsert=True,
+                )
+            )
+        if not ops:
+            return 0
+        self.collection.bulk_write(ops, ordered=False)
+        return len(ops)
+
+    def resolve_many(self, resolved: Dict[str, Iterable[str]]) -> int:
+        """
+        Drop repaired parts ({key: parts}); entries with no parts left become resolved
+        """
+        keys = [key for key, parts in resolved.items() if parts]
+        if not keys:
+            return 0
+        # Most successful fetches were never dead-lettered; one lookup keeps them cheap
+        pending_keys = {
+            doc["_id"] for doc in self.collection.find({"_id": {"$in": keys}, "status": PENDING}, {"_id": 1})
+        }
+        ops = [
+            UpdateOne(
+                {"_id": key, "status": PENDING},
+                {"$unset": {f"parts.{part}": "" for part in parts}},
+            )
+            for key, parts in resolved.items()
+            if key in pending_keys
+        ]
+        if not ops:
+            return 0
+        self.collection.bulk_write(ops, ordered=False)
+        result = self.collection.update_many(
+            {"_id": {"$in": list(pending_keys)}, "status": PENDING, "parts": {}},
+            {"$set": {"status": RESOLVED, "attempts": 0, "resolved_at": datetime.now()}},
+        )
+        return result.modified_count
+
+    def pending(self, limit: Optional[int] = None, max_attempts: Optional[int] = None) -> List[Dict]:
+        """Pending entries, fewest attempts first"""
+        query: Dict = {"status": PENDING}
+        if max_attempts is not None:
+            query["attempts"] = {"$lt": max_attempts}
+        cursor = self.collection.find(query).sort([("attempts", ASCENDING), ("updated_at", ASCENDING)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            status: self.collection.count_documents({"status": status})
+            for status in (PENDING, RESOLVED)
+        }
@@ -0,0 +1,279 @@
+"""
+Lazy ThingInfo enrichment for collected announcements
+
+The regular sweep only calls the four KamcoPblsalThingInquireSvc
+endpoints. The ThingInfoInquireSvc detail endpoints (appraisal, rental,
+registry, bid history, ...) are fetched here on demand, e.g. when a
+detail page or the MCP get_kamco_by_id tool asks for them, and cached in
+the thing_enrichments collection with per-endpoint TTLs:
+
+    {
+        "_id": "<CLTR_NO>:<PBCT_NO>:<section>",
+        "CLTR_NO", "PBCT_NO", "section", "operation",
+        "rows": [...], "result_code", "fetched_at", "expires_at"
+    }
+
+enrich_many() looks up every (item, section) pair with one query,
+fetches only the missing or expired ones concurrently, and stores them
+with one bulk upsert. If a refresh fails, the stale cached rows are
+returned with stale=True rather than nothing.
+
+ThingInfo endpoints are keyed by CLTR_NO + PBCT_NO. CLTR_NO is read from
+the stored document when present, otherwise looked up through
+getUnifyUsageCltr by CLTR_MNMT_NO and remembered in the cache: a match
+for CLTR_TTL, a well-formed response without a match for CLTR_MISS_TTL.
+Failed lookups (transport error, error resultCode) are not cached.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+
+from services.collection_state import announce_key
+from services.onbid_transport import OnbidTransport, get_transport, normalize_service_key
+from services.onbid_xml import OnbidXmlStream
+
+SVC_PATH = "ThingInfoInquireSvc"
+
+# section -> (operation, result row tags, TTL)
+SECTIONS: Dict[str, Tuple[str, Tuple[str, ...], timedelta]] = {
+    "thing_basic": ("getUnifyUsageCltrBasicInfoDetail", ("item",), timedelta(days=1)),
+    "estimation": ("getUnifyUsageCltrEstimationInfoDetail", ("estimationInfo", "item"), timedelta(days=30)),
+    "rental": ("getUnifyUsageCltrRentalInfoDetail", ("rentalInfo", "item"), timedelta(days=7)),
+    "registered": ("getUnifyUsageCltrRegisteredInfoDetail", ("registered", "item"), timedelta(days=7)),
+    "bid_date": ("getUnifyUsageCltrBidDateInfoDetail", ("bidInfo", "item"), timedelta(hours=12)),
+    "bid_history": ("getUnifyUsageCltrBidHistoryInfoDetail", ("bidHistoryInfo", "bidInfo", "item"), timedelta(days=1)),
+    "stockholder": ("getUnifyUsageCltrStockholderInfoDetail", ("stockholderInfo", "item"), timedelta(days=30)),
+    "corporate": ("getUnifyUsageCltrCorporatebodyInfoDetail", ("corporatebodyInfo", "item"), timedelta(days=30)),
+}
+
+# Sections shown by default (stock/corporate only apply to securities)
+DEFAULT_SECTIONS = ("estimation", "rental", "registered", "bid_history")
+
+# CLTR_NO lookups are cached under this pseudo-section
+CLTR_SECTION = "_cltr_no"
+CLTR_TTL = timedelta(days=90)
+# No match yet (e.g. the thing is not listed yet): retry after a few hours
+CLTR_MISS_TTL = timedelta(hours=6)
+
+
+def _first(item: Dict, field: str) -> Optional[str]:
+    for source in (item.get("basic_info") or {}, item.get("announce_list_item") or {}, item):
+        if isinstance(source, dict) and source.get(field):
+            return str(source[field])
+    return None
+
+
+class ThingEnricher:
+    """On-demand, Mongo-cached ThingInfoInquireSvc detail fetches"""
+
+    def __init__(
+        self,
+        db: Database,
+        transport: Optional[OnbidTransport] = None,
+        service_key: Optional[str] = None,
+        max_workers: int = 4,
+        ttls: Optional[Dict[str, timedelta]] = None,
+        collection_name: str = "thing_enrichments",
+    ):
+        self.collection = db[collection_name]
+        self.transport = transport or get_transport()
+        raw_key = service_key or os.getenv("KAMCO_SERVICE_KEY_ENCODED") or os.getenv("KAMCO_SERVICE_KEY_DECODED") or os.getenv("KAMCO_SERVICE_KEY")
+        self.service_key = normalize_service_key(raw_key)
+        self.max_workers = max_workers
+        self.ttls = {section: spec[2] for section, spec in SECTIONS.items()}
+        self.ttls.update(ttls or {})
+        self.stats = {"hits": 0, "fetched": 0, "failed": 0, "stale": 0}
+
+    @staticmethod
+    def _cache_id(cltr_no: str, pbct_no: str, section: str) -> str:
+        return f"{cltr_no}:{pbct_no}:{section}"
+
+    # ---- CLTR_NO ---------------------------------------------------------
+
+    def _lookup_cltr_no(self, item: Dict) -> Tuple[Optional[str], bool]:
+        """
+        Find CLTR_NO via getUnifyUsageCltr filtered by CLTR_MNMT_NO
+
+        Returns:
+            (CLTR_NO, answered) - answered is False when nothing was asked or
+            the call failed, so the result must not be cached
+        """
+        mnmt_no = _first(item, "CLTR_MNMT_NO")
+        if not mnmt_no:
+            return None, False
+        params = {"serviceKey": self.service_key, "numOfRows": 20, "pageNo": 1, "CLTR_MNMT_NO": mnmt_no}
+        pbct_no = _first(item, "PBCT_NO")
+        match = first = None
+        try:
+            res = self.transport.call(SVC_PATH, "getUnifyUsageCltr", params)
+            res.raise_for_status()
+            stream = OnbidXmlStream(res.content, item_tags=("item",))
+            if not stream.result_code.startswith("0"):
+                print(f"물건번호 조회 error (CLTR_MNMT_NO={mnmt_no}): resultCode={stream.result_code}, resultMsg={stream.result_msg}")
+                return None, False
+            for row in stream:
+                first = first or row
+                if str(row.get("PBCT_NO")) == pbct_no:
+                    match = row
+                    break
+        except Exception as e:
+            print(f"물건번호 조회 failed (CLTR_MNMT_NO={mnmt_no}): {e}")
+            return None, False
+        match = match or first
+        return (str(match["CLTR_NO"]) if match and match.get("CLTR_NO") else None), True
+
+    def resolve_cltr_nos(self, items: List[Dict]) -> Dict[str, Optional[str]]:
+        """announce_key -> CLTR_NO (stored field, cached lookup, or fresh lookup)"""
+        resolved: Dict[str, Optional[str]] = {}
+        missing = []
+        for item in items:
+            key = announce_key(item)
+            resolved[key] = _first(item, "CLTR_NO")
+            if resolved[key] is None:
+                missing.append(item)
+        if not missing:
+            return resolved
+
+        now = datetime.now()
+        cache_ids = {self._cache_id(announce_key(i), "", CLTR_SECTION): i for i in missing}
+        for doc in self.collection.find({"_id": {"$in": list(cache_ids)}, "expires_at": {"$gt": now}}):
+            resolved[announce_key(cache_ids.pop(doc["_id"]))] = doc.get("CLTR_NO")
+
+        ops = []
+        for cache_id, item in cache_ids.items():
+            cltr_no, answered = self._lookup_cltr_no(item)
+            resolved[announce_key(item)] = cltr_no
+            if not answered:
+                continue  # retried on the next request instead of caching the failure
+            ttl = CLTR_TTL if cltr_no else CLTR_MISS_TTL
+            ops.append(UpdateOne(
+                {"_id": cache_id},
+                {"$set": {"section": CLTR_SECTION, "CLTR_NO": cltr_no, "fetched_at": now, "expires_at": now + ttl}},
+                upsert=True,
+            ))
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+        return resolved
+
+    # ---- sections --------------------------------------------------------
+
+    def _fetch_section(self, cltr_no: str, pbct_no: str, section: str) -> Optional[Dict]:
+        operation, tags, _ = SECTIONS[section]
+        params = {"serviceKey": self.service_key, "CLTR_NO": cltr_no, "PBCT_NO": pbct_no, "numOfRows": 100, "pageNo": 1}
+        try:
+            res = self.transport.call(SVC_PATH, operation, params)
+            res.raise_for_status()
+            stream = OnbidXmlStream(res.content, item_tags=tags)
+            result_code = stream.result_code
+            if not result_code.startswith("0"):
+                print(f"{operation} error: resultCode={result_code}, resultMsg={stream.result_msg}")
+                return None
+            return {"rows": list(stream), "result_code": result_code}
+        except Exception as e:
+            print(f"{operation} failed (CLTR_NO={cltr_no}, PBCT_NO={pbct_no}): {e}")
+            return None
+
+    def enrich_many(
+        self,
+        items: Iterable[Dict],
+        sections: Optional[Iterable[str]] = None,
+        fetch: bool = True,
+        refresh: bool = False,
+    ) -> Dict[str, Dict[str, Dict]]:
+        """
+        Args:
+            items: collected_items 문서 (PLNM_NO/PBCT_NO, basic_info, announce_list_item)
+            sections: SECTIONS 키 (기본값: DEFAULT_SECTIONS)
+            fetch: False 이면 캐시된 값만 반환 (API 호출 없음)
+            refresh: True 이면 TTL 과 무관하게 다시 조회
+
+        Returns:
+            {announce_key: {section: {"rows", "fetched_at", "stale"}}}
+        """
+        items = list(items)
+        sections = [s for s in (sections or DEFAULT_SECTIONS) if s in SECTIONS]
+        out: Dict[str, Dict[str, Dict]] = {announce_key(item): {} for item in items}
+        if not items or not sections:
+            return out
+
+        if fetch:
+            cltr_nos = self.resolve_cltr_nos(items)
+        else:
+            cltr_nos = {announce_key(item): _first(item, "CLTR_NO") for item in items}
+            cached_ids = [self._cache_id(k, "", CLTR_SECTION) for k, v in cltr_nos.items() if v is None]
+            for doc in self.collection.find({"_id": {"$in": cached_ids}}):
+                cltr_nos[doc["_id"].rsplit(":", 2)[0]] = doc.get("CLTR_NO")
+
+        wanted: Dict[str, Tuple[str, str, str, str]] = {}
+        for item in items:
+            key = announce_key(item)
+            cltr_no, pbct_no = cltr_nos.get(key), _first(item, "PBCT_NO")
+            if not cltr_no or not pbct_no:
+                continue
+            for section in sections:
+                wanted[self._cache_id(cltr_no, pbct_no, section)] = (key, cltr_no, pbct_no, section)
+
+        now = datetime.now()
+        stale: Dict[str, Dict] = {}
+        for doc in self.collection.find({"_id": {"$in": list(wanted)}}):
+            key, _, _, section = wanted[doc["_id"]]
+            if doc.get("expires_at") and doc["expires_at"] > now and not refresh:
+                out[key][section] = {"rows": doc.get("rows", []), "fetched_at": doc.get("fetched_at"), "stale": False}
+                self.stats["hits"] += 1
+                del wanted[doc["_id"]]
+            else:
+                stale[doc["_id"]] = doc
+
+        if not fetch:
+            for cache_id, doc in stale.items():
+                key, _, _, section = wanted[cache_id]
+                out[key][section] = {"rows": doc.get("rows", []), "fetched_at": doc.get("fetched_at"), "stale": True}
+            return out
+        if not wanted:
+            return out
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = dict(zip(
+                wanted,
+                executor.map(lambda spec: self._fetch_section(spec[1], spec[2], spec[3]), wanted.values()),
+            ))
+
+        ops = []
+        fetched_at = datetime.now()
+        for cache_id, result in results.items():
+            key, cltr_no, pbct_no, section = wanted[cache_id]
+            if result is None:
+                self.stats["failed"] += 1
+                if cache_id in stale:
+                    self.stats["stale"] += 1
+                    doc = stale[cache_id]
+                    out[key][section] = {"rows": doc.get("rows", []), "fetched_at": doc.get("fetched_at"), "stale": True}
+                continue
+            self.stats["fetched"] += 1
+            out[key][section] = {"rows": result["rows"], "fetched_at": fetched_at, "stale": False}
+            ops.append(UpdateOne(
+                {"_id": cache_id},
+                {"$set": {
+                    "CLTR_NO": cltr_no,
+                    "PBCT_NO": pbct_no,
+                    "section": section,
+                    "operation": SECTIONS[section][0],
+                    "rows": result["rows"],
+                    "result_code": result["result_code"],
+                    "fetched_at": fetched_at,
+                    "expires_at": fetched_at + self.ttls[section],
+                }},
+                upsert=True,
+            ))
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+        return out
+
+    def enrich(self, item: Dict, sections: Optional[Iterable[str]] = None, **kwargs) -> Dict[str, Dict]:
+        """Enrichment for a single collected_items document"""
+        return self.enrich_many([item], sections, **kwargs).get(announce_key(item), {})
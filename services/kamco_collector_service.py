@@ -8,21 +8,49 @@ Logical Flow:
    - Fetch schedule details (getKamcoPlnmPbctBidDateInfoDetail)
    - Fetch file attachments (getKamcoPlnmPbctFileInfoDetail)
 3. Save to MongoDB
+4. Record failed/partial detail fetches in the dead-letter queue
+   (retry_dead_letters re-fetches only the missing parts)
 """
 
+import itertools
 import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
-from typing import Optional, Dict, List
-from urllib.parse import unquote
+from typing import Optional, Dict, Iterable, List, Iterator, Tuple
 
-import requests
-import xmltodict
 from dotenv import load_dotenv
 from pymongo import MongoClient
 
+from services.adaptive import AdaptiveLimiter, CircuitBreakers
+from services.collection_state import CollectionState, PageCheckpointer, announce_key
+from services.dead_letter import DeadLetterQueue
+from services.mongo_writer import BulkUpsertWriter
+from services.onbid_transport import OnbidTransport, normalize_service_key
+from services.onbid_xml import OnbidXmlStream
+from services.rate_limiter import RateLimiter
+from services.work_queue import DONE, LeaseKeeper, WorkQueue
+from services.response_cache import ResponseCache
+
 load_dotenv()
 
+# 재산구분코드 (PRPT_DVSN_CD)
+PRPT_DIVISIONS = {
+    "0001": "금융권담보재산",
+    "0002": "비금융권담보재산",
+    "0003": "압류재산",
+    "0004": "국유재산",
+    "0005": "기타일반재산",
+}
+
+# Detail part -> (fetch method, operation) used by collection and dead-letter retries
+DETAIL_PARTS = {
+    "basic_info": ("fetch_basic_info", "getKamcoPlnmPbctBasicInfoDetail"),
+    "schedule_info": ("fetch_schedule_info", "getKamcoPlnmPbctBidDateInfoDetail"),
+    "file_info": ("fetch_file_info", "getKamcoPlnmPbctFileInfoDetail"),
+}
+
 
 class KamcoCollectorService:
     """KAMCO Public Auction Data Collection Service"""
@@ -33,22 +61,52 @@ class KamcoCollectorService:
         mongo_uri: Optional[str] = None,
         db_name: str = "kamco",
         collection_name: str = "collected_items",
+        requests_per_second: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        page_workers: Optional[int] = None,
+        transport: Optional[OnbidTransport] = None,
+        cache: Optional[ResponseCache] = None,
     ):
+        # Raw response cache (KAMCO_CACHE_MODE=readwrite|record|replay)
+        cache = cache or ResponseCache.from_env()
+        
         # API key configuration
         raw_key = service_key or os.getenv("KAMCO_SERVICE_KEY_ENCODED") or os.getenv("KAMCO_SERVICE_KEY_DECODED") or os.getenv("KAMCO_SERVICE_KEY")
         self.service_key = self._normalize_service_key(raw_key)
         
-        if not self.service_key:
+        # Replay never reaches the API, and the cache key ignores serviceKey
+        if not self.service_key and not (cache and cache.replay):
             raise ValueError("KAMCO service key is required")
         
-        # API configuration
-        self.base_url = "http://openapi.onbid.co.kr/openapi/services"
+        # Throughput configuration: 모든 API 호출이 하나의 RPS 제한을 공유
+        rps = requests_per_second if requests_per_second is not None else float(os.getenv("KAMCO_REQUESTS_PER_SECOND", "5"))
+        self.rate_limiter = RateLimiter(rps)
+        self.max_workers = max_workers or int(os.getenv("KAMCO_MAX_WORKERS", "4"))
+        self.page_workers = page_workers or int(os.getenv("KAMCO_PAGE_WORKERS", "2"))
+        
+        # Adaptive in-flight limit + per-endpoint circuit breakers (KAMCO_ADAPTIVE=0 으로 끔)
+        limiter = breakers = None
+        if os.getenv("KAMCO_ADAPTIVE", "1") != "0":
+            max_inflight = int(os.getenv("KAMCO_MAX_INFLIGHT", "16"))
+            limiter = AdaptiveLimiter(
+                initial=self.max_workers,
+                max_limit=max(max_inflight, self.max_workers + self.page_workers),
+            )
+            breakers = CircuitBreakers(
+                failure_threshold=int(os.getenv("KAMCO_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("KAMCO_BREAKER_RESET_SECONDS", "30")),
+            )
+        
+        # API configuration (pooled, retrying transport; see services/onbid_transport.py)
+        self.transport = transport or OnbidTransport(
+            rate_limiter=self.rate_limiter,
+            pool_size=max(10, (self.max_workers + self.page_workers) * 2),
+            cache=cache,
+            limiter=limiter,
+            breakers=breakers,
+        )
+        self.base_url = self.transport.base_url
         self.service_path = "KamcoPblsalThingInquireSvc"
-        self.timeout = 30
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        }
         
         # MongoDB configuration
         self.mongo_uri = mongo_uri or os.getenv("MONGO_URI", "mongodb://localhost:27017")
@@ -56,6 +114,10 @@ class KamcoCollectorService:
         self.collection_name = collection_name
         self.client: Optional[MongoClient] = None
         self.collection = None
+        self.state: Optional[CollectionState] = None
+        self.dead_letters: Optional[DeadLetterQueue] = None
+        self.writer: Optional[BulkUpsertWriter] = None
+        self.write_batch_size = int(os.getenv("KAMCO_WRITE_BATCH_SIZE", "500"))
         
         # Statistics
         self.stats = {
@@ -63,18 +125,25 @@ class KamcoCollectorService:
             "processed_announces": 0,
             "failed_announces": 0,
             "saved_items": 0,
+            "inserted_items": 0,
+            "modified_items": 0,
+            "unchanged_items": 0,
+            "total_count": 0,
+            "total_pages": 0,
+            "fetched_pages": 0,
+            "failed_pages": 0,
+            "skipped_unchanged": 0,
+            "dead_lettered": 0,
+            "repaired_parts": 0,
         }
+        
+        # 워커 스레드별 마지막 API 오류 (dead-letter 기록용)
+        self._local = threading.local()
     
     @staticmethod
     def _normalize_service_key(raw: Optional[str]) -> Optional[str]:
         """Prevent double encoding of API key"""
-        if not raw:
-            return raw
-        val = raw
-        for _ in range(2):
-            if "%" in val:
-                val = unquote(val)
-        return val
+        return normalize_service_key(raw)
     
     def connect_mongodb(self) -> bool:
         """Connect to MongoDB"""
@@ -83,61 +152,172 @@ class KamcoCollectorService:
             self.client.admin.command('ping')
             db = self.client[self.db_name]
             self.collection = db[self.collection_name]
+            self.state = CollectionState(db)
+            self.dead_letters = DeadLetterQueue(db)
+            # 시작 시 (PLNM_NO, PBCT_NO) unique 인덱스 생성
+            self.writer = BulkUpsertWriter(self.collection, batch_size=self.write_batch_size)
             return True
         except Exception as e:
             print(f"Connect to MongoDB failed: {e}")
             return False
     
+    def _ensure_mongodb(self) -> bool:
+        """Connect to MongoDB unless already connected, with progress output"""
+        if self.collection is not None:
+            return True
+        print("→ Connect to MongoDB 중...")
+        if not self.connect_mongodb():
+            print("❌ Connect to MongoDB failed")
+            return False
+        print(f"✅ Connect to MongoDB 성공 ({self.db_name}.{self.collection_name})")
+        print()
+        return True
+    
     def close_mongodb(self):
         """Connect to MongoDB 종료"""
+        if self.writer is not None and self.writer.pending:
+            self.flush_writes()
         if self.client:
             self.client.close()
             self.client = None
             self.collection = None
+            self.state = None
+            self.dead_letters = None
+            self.writer = None
     
-    def fetch_announce_list(
+    def fetch_announce_page(
         self,
         page_no: int = 1,
         num_of_rows: int = 10,
-        prpt_dvsn_cd: str = "0001",
-    ) -> Optional[List[Dict]]:
-        """Fetch announcement list"""
-        url = f"{self.base_url}/{self.service_path}/getKamcoPlnmPbctList"
+        prpt_dvsn_cd: Optional[str] = "0001",
+        search: Optional[Dict[str, str]] = None,
+    ) -> Optional[Tuple[List[Dict], Optional[int]]]:
+        """
+        Fetch one announcement list page together with its totalCount
+        
+        search adds SEARCH_TYPE/SEARCH_KEYWORD; prpt_dvsn_cd=None queries every division.
+        """
+        operation = "getKamcoPlnmPbctList"
         params = {
             "serviceKey": self.service_key,
             "pageNo": page_no,
             "numOfRows": num_of_rows,
-            "PRPT_DVSN_CD": prpt_dvsn_cd,
         }
+        if prpt_dvsn_cd:
+            params["PRPT_DVSN_CD"] = prpt_dvsn_cd
+        if search:
+            params.update(search)
         
         try:
-            res = requests.get(url, params=params, headers=self.headers, timeout=self.timeout)
+            res = self.transport.call(self.service_path, operation, params)
             res.raise_for_status()
             
-            payload = xmltodict.parse(res.text)
-            header = (payload.get("response") or {}).get("header") or {}
-            body = (payload.get("response") or {}).get("body") or {}
-            
-            result_code = str(header.get("resultCode"))
+            stream = OnbidXmlStream(res.content, item_tags=("item",))
+            result_code = stream.result_code
             if not result_code.startswith("0"):
-                print(f"API error: resultCode={result_code}, resultMsg={header.get('resultMsg')}")
+                print(f"API error: resultCode={result_code}, resultMsg={stream.result_msg}")
                 return None
             
-            items = body.get("items", {})
-            item_list = items.get("item", [])
-            
-            if not item_list:
-                return []
-            
-            return item_list if isinstance(item_list, list) else [item_list]
+            items = list(stream)
+            return items, stream.total_count
             
         except Exception as e:
-            print(f"Failed to fetch announcement list: {e}")
+            print(f"Failed to fetch announcement list (page {page_no}): {e}")
             return None
     
+    def fetch_announce_list(
+        self,
+        page_no: int = 1,
+        num_of_rows: int = 10,
+        prpt_dvsn_cd: str = "0001",
+    ) -> Optional[List[Dict]]:
+        """Fetch announcement list"""
+        page = self.fetch_announce_page(page_no, num_of_rows, prpt_dvsn_cd)
+        return None if page is None else page[0]
+    
+    def fetch_announce_item(
+        self,
+        plnm_no: str,
+        pbct_no: str,
+        prpt_dvsn_cd: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """Current list row of one announcement (list search by PLNM_NO), None if not found"""
+        page = self.fetch_announce_page(
+            1, 100, prpt_dvsn_cd, search={"SEARCH_TYPE": "PLNM_NO", "SEARCH_KEYWORD": str(plnm_no)}
+        )
+        if page is None:
+            return None
+        return next((item for item in page[0] if str(item.get("PBCT_NO")) == str(pbct_no)), None)
+    
+    def iter_announce_pages(
+        self,
+        num_of_rows: int = 100,
+        prpt_dvsn_cd: str = "0001",
+        page_workers: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        start_page: int = 1,
+    ) -> Iterator[Tuple[int, Optional[List[Dict]]]]:
+        """
+        Full sweep: discover totalCount from the first page, then fan out
+        the remaining pages over a bounded worker pool, keeping at most
+        page_workers * 2 pages fetched-but-unconsumed or in flight
+        
+        Args:
+            num_of_rows: 페이지당 건수
+            prpt_dvsn_cd: 재산구분코드
+            page_workers: 동시 목록 조회 수 (기본값: KAMCO_PAGE_WORKERS)
+            max_pages: 최대 페이지 수 (None이면 totalCount 기준 전체)
+            start_page: 시작 페이지
+            
+        Yields:
+            (page_no, items) - 도착한 순서대로 반환, 조회 실패 시 items는 None
+        """
+        first = self.fetch_announce_page(start_page, num_of_rows, prpt_dvsn_cd)
+        if first is None:
+            yield start_page, None
+            return
+        
+        items, total_count = first
+        total_pages = -(-(total_count or 0) // num_of_rows) or 1
+        last_page = total_pages if max_pages is None else min(total_pages, start_page + max_pages - 1)
+        self.stats["total_count"] = total_count or len(items)
+        self.stats["total_pages"] = total_pages
+        print(f"✅ totalCount={total_count}, 페이지 {start_page}~{last_page} / 전체 {total_pages}")
+        yield start_page, items
+        
+        remaining = range(start_page + 1, last_page + 1)
+        if not remaining:
+            return
+        
+        # 최대 workers * 2 페이지만 조회 중/대기 상태로 둔다: 상세 수집이 느려도
+        # 조회된 페이지가 max_pages 만큼 메모리에 쌓이지 않는다
+        workers = page_workers or self.page_workers
+        window = workers * 2
+        pages = iter(remaining)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures: Dict = {}
+            
+            def submit_next(count: int) -> None:
+                for page_no in itertools.islice(pages, count):
+                    futures[executor.submit(self.fetch_announce_page, page_no, num_of_rows, prpt_dvsn_cd)] = page_no
+            
+            submit_next(window)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_no = futures.pop(future)
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        print(f"페이지 {page_no} 조회 오류: {e}")
+                        page = None
+                    # 소비자가 이 페이지를 처리하는 동안 빈 자리만큼 다음 페이지를 조회
+                    submit_next(window - len(futures))
+                    yield page_no, None if page is None else page[0]
+    
     def fetch_basic_info(self, plnm_no: str, pbct_no: str) -> Optional[Dict]:
         """Fetch announcement basic info details"""
-        url = f"{self.base_url}/{self.service_path}/getKamcoPlnmPbctBasicInfoDetail"
+        operation = "getKamcoPlnmPbctBasicInfoDetail"
         params = {
             "serviceKey": self.service_key,
             "PLNM_NO": plnm_no,
@@ -145,26 +325,27 @@ class KamcoCollectorService:
         }
         
         try:
-            res = requests.get(url, params=params, headers=self.headers, timeout=self.timeout)
+            res = self.transport.call(self.service_path, operation, params)
             res.raise_for_status()
             
-            payload = xmltodict.parse(res.text)
-            header = (payload.get("response") or {}).get("header") or {}
-            body = (payload.get("response") or {}).get("body") or {}
-            
-            result_code = str(header.get("resultCode"))
-            if not result_code.startswith("0"):
+            stream = OnbidXmlStream(res.content, item_tags=("item",))
+            if not stream.result_code.startswith("0"):
+                self._note_error(operation, f"resultCode={stream.result_code}, resultMsg={stream.result_msg}")
                 return None
             
-            return body.get("item")
+            item = next(iter(stream), None)
+            if item is None:
+                self._note_error(operation, "empty response")
+            return item
             
         except Exception as e:
             print(f"Fetch basic info failed (PLNM_NO={plnm_no}, PBCT_NO={pbct_no}): {e}")
+            self._note_error(operation, e)
             return None
     
     def fetch_schedule_info(self, plnm_no: str, pbct_no: str) -> Optional[List[Dict]]:
         """Fetch schedule details"""
-        url = f"{self.base_url}/{self.service_path}/getKamcoPlnmPbctBidDateInfoDetail"
+        operation = "getKamcoPlnmPbctBidDateInfoDetail"
         params = {
             "serviceKey": self.service_key,
             "numOfRows": 10,
@@ -174,32 +355,24 @@ class KamcoCollectorService:
         }
         
         try:
-            res = requests.get(url, params=params, headers=self.headers, timeout=self.timeout)
+            res = self.transport.call(self.service_path, operation, params)
             res.raise_for_status()
             
-            payload = xmltodict.parse(res.text)
-            header = (payload.get("response") or {}).get("header") or {}
-            body = (payload.get("response") or {}).get("body") or {}
-            
-            result_code = str(header.get("resultCode"))
-            if not result_code.startswith("0"):
+            stream = OnbidXmlStream(res.content, item_tags=("bidDateInfoItem",))
+            if not stream.result_code.startswith("0"):
+                self._note_error(operation, f"resultCode={stream.result_code}, resultMsg={stream.result_msg}")
                 return None
             
-            items = body.get("items", {})
-            bid_date_info = items.get("bidDateInfoItem", [])
-            
-            if not bid_date_info:
-                return []
-            
-            return bid_date_info if isinstance(bid_date_info, list) else [bid_date_info]
+            return list(stream)
             
         except Exception as e:
             print(f"Failed to fetch schedule info (PLNM_NO={plnm_no}, PBCT_NO={pbct_no}): {e}")
+            self._note_error(operation, e)
             return None
     
     def fetch_file_info(self, plnm_no: str, pbct_no: str) -> Optional[List[Dict]]:
         """Fetch file attachments"""
-        url = f"{self.base_url}/{self.service_path}/getKamcoPlnmPbctFileInfoDetail"
+        operation = "getKamcoPlnmPbctFileInfoDetail"
         params = {
             "serviceKey": self.service_key,
             "numOfRows": 10,
@@ -209,33 +382,18 @@ class KamcoCollectorService:
         }
         
         try:
-            res = requests.get(url, params=params, headers=self.headers, timeout=self.timeout)
+            res = self.transport.call(self.service_path, operation, params)
             res.raise_for_status()
             
-            payload = xmltodict.parse(res.text)
-            header = (payload.get("response") or {}).get("header") or {}
-            body = (payload.get("response") or {}).get("body") or {}
-            
-            result_code = str(header.get("resultCode"))
-            if not result_code.startswith("0"):
+            stream = OnbidXmlStream(res.content, item_tags=("fileItem",))
+            if not stream.result_code.startswith("0"):
+                self._note_error(operation, f"resultCode={stream.result_code}, resultMsg={stream.result_msg}")
                 return None
             
-            items = body.get("items")
-            if not items:
-                return []
-            
-            file_info = items.get("fileItem", [])
-            
-            if not file_info:
-                return []
-            
-            # Convert to list
-            file_list = file_info if isinstance(file_info, list) else [file_info]
-            
             # Remove duplicates (by file number)
             seen = set()
             unique_files = []
-            for file in file_list:
+            for file in stream:
                 file_id = file.get('ATCH_FILE_PTCS_NO')
                 if file_id and file_id not in seen:
                     seen.add(file_id)
@@ -245,6 +403,7 @@ class KamcoCollectorService:
             
         except Exception as e:
             print(f"Fetch file attachments failed (PLNM_NO={plnm_no}, PBCT_NO={pbct_no}): {e}")
+            self._note_error(operation, e)
             return None
     
     def collect_announce_details(self, announce: Dict) -> Optional[Dict]:
@@ -256,66 +415,284 @@ class KamcoCollectorService:
             print(f"Missing announcement number or auction number: {announce}")
             return None
         
-        # Fetch basic info
-        basic_info = self.fetch_basic_info(plnm_no, pbct_no)
-        time.sleep(0.2)  # API call interval
-        
-        # 일정 정보 조회
-        schedule_info = self.fetch_schedule_info(plnm_no, pbct_no)
-        time.sleep(0.2)
-        
-        # Fetch file attachments
-        file_info = self.fetch_file_info(plnm_no, pbct_no)
-        time.sleep(0.2)
+        # API call interval is enforced by self.rate_limiter
+        # 기본 정보 / 일정 정보 / 첨부파일 조회 (실패한 부분은 failures에 기록)
+        parts, failures = self.fetch_detail_parts(plnm_no, pbct_no, DETAIL_PARTS)
         
         # 데이터 통합
         collected_data = {
             "PLNM_NO": plnm_no,
             "PBCT_NO": pbct_no,
             "announce_list_item": announce,
-            "basic_info": basic_info,
-            "schedule_info": schedule_info or [],
-            "file_info": file_info or [],
+            "basic_info": parts.get("basic_info"),
+            "schedule_info": parts.get("schedule_info") or [],
+            "file_info": parts.get("file_info") or [],
             "collected_at": datetime.now(),
         }
+        if failures:
+            # 저장 전에 _process_announces 에서 분리됨
+            collected_data["_failures"] = failures
         
         return collected_data
     
+    def _note_error(self, operation: str, error) -> None:
+        self._local.error = {"operation": operation, "error": str(error)}
+    
+    def fetch_detail_parts(
+        self,
+        plnm_no: str,
+        pbct_no: str,
+        part_names: Iterable[str],
+    ) -> Tuple[Dict[str, object], Dict[str, Dict]]:
+        """
+        Fetch the given detail parts of one announcement
+        
+        Returns:
+            (parts, failures) - 성공한 부분 {part: value}, 실패한 부분 {part: {operation, error}}
+        """
+        parts: Dict[str, object] = {}
+        failures: Dict[str, Dict] = {}
+        for part in part_names:
+            method, operation = DETAIL_PARTS[part]
+            self._local.error = None
+            value = getattr(self, method)(plnm_no, pbct_no)
+            if value is None:
+                failures[part] = self._local.error or {"operation": operation, "error": "no data"}
+            else:
+                parts[part] = value
+        return parts, failures
+    
+    def iter_announce_details(
+        self,
+        announces: List[Dict],
+        concurrency: Optional[int] = None,
+    ) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+        """
+        Collect details for many announcements concurrently
+        
+        Args:
+            announces: 공고 목록 항목
+            concurrency: 동시 처리 공고 수 (기본값: self.max_workers, 1이면 순차 처리)
+            
+        Yields:
+            (announce, collected_data) - 완료된 순서대로 반환
+        """
+        workers = concurrency or self.max_workers
+        if workers <= 1:
+            for announce in announces:
+                yield announce, self.collect_announce_details(announce)
+            return
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.collect_announce_details, announce): announce
+                for announce in announces
+            }
+            for future in as_completed(futures):
+                announce = futures[future]
+                try:
+                    yield announce, future.result()
+                except Exception as e:
+                    print(f"상세 정보 수집 오류 (PLNM_NO={announce.get('PLNM_NO')}): {e}")
+                    yield announce, None
+    
     def save_to_mongodb(self, data: Dict) -> bool:
-        """Save data to MongoDB"""
-        if self.collection is None:
+        """
+        Queue data for a bulk upsert keyed on (PLNM_NO, PBCT_NO)
+        
+        Writes are buffered; call flush_writes() to force them out.
+        """
+        if self.writer is None:
             print("MongoDB 컬렉션이 초기화되지 않았습니다")
             return False
         
         try:
-            # 중복 체크: PLNM_NO와 PBCT_NO로 확인
-            existing = self.collection.find_one({
-                "PLNM_NO": data["PLNM_NO"],
-                "PBCT_NO": data["PBCT_NO"],
-            })
-            
-            if existing:
-                # 업데이트
-                result = self.collection.update_one(
-                    {"_id": existing["_id"]},
-                    {"$set": data}
-                )
-                return result.modified_count > 0
-            else:
-                # 신규 삽입
-                result = self.collection.insert_one(data)
-                return result.inserted_id is not None
-                
+            self.writer.add(data)
+            return True
         except Exception as e:
             print(f"MongoDB 저장 failed: {e}")
             return False
     
+    def flush_writes(self) -> bool:
+        """Flush buffered upserts and refresh inserted/modified/unchanged stats"""
+        if self.writer is None:
+            return False
+        
+        errors_before = self.writer.stats["errors"]
+        try:
+            counts = self.writer.flush()
+        except Exception as e:
+            print(f"MongoDB 저장 failed: {e}")
+            return False
+        
+        self.stats["inserted_items"] = counts["inserted"]
+        self.stats["modified_items"] = counts["modified"]
+        self.stats["unchanged_items"] = counts["unchanged"]
+        self.stats["saved_items"] = counts["inserted"] + counts["modified"]
+        return counts["errors"] == errors_before
+    
+    def _process_announces(
+        self,
+        announces: List[Dict],
+        save_to_db: bool,
+        concurrency: Optional[int] = None,
+        label: str = "",
+        prpt_dvsn_cd: Optional[str] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Detail stage: collect details for announcements and save them
+        
+        Returns:
+            상세 정보가 완전히 수집(및 저장)된 공고 목록 항목.
+            저장(flush)이 실패하면 None - 호출자는 이 배치를 완료로 기록하면 안 된다
+        """
+        completed = []
+        dead_letters = []
+        resolved = {}
+        details = self.iter_announce_details(announces, concurrency)
+        for idx, (announce, collected_data) in enumerate(details, 1):
+            plnm_no = announce.get("PLNM_NO", "N/A")
+            pbct_no = announce.get("PBCT_NO", "N/A")
+            print(f"  {label}[{idx}/{len(announces)}] PLNM_NO: {plnm_no}, PBCT_NO: {pbct_no}")
+            
+            if not collected_data:
+                print(f"    ❌ 수집 failed")
+                self.stats["failed_announces"] += 1
+                if announce.get("PLNM_NO") and announce.get("PBCT_NO"):
+                    error = {"operation": None, "error": "detail collection failed"}
+                    dead_letters.append({"announce": announce, "failures": {part: error for part in DETAIL_PARTS}})
+                continue
+            
+            failures = collected_data.pop("_failures", None) or {}
+            if failures:
+                print(f"    ⚠️  일부 실패: {', '.join(failures)}")
+                dead_letters.append({"announce": announce, "failures": failures})
+            
+            if prpt_dvsn_cd:
+                # 갱신 스케줄러가 같은 재산구분으로 다시 조회할 수 있도록 저장
+                collected_data["PRPT_DVSN_CD"] = prpt_dvsn_cd
+            
+            # Save to MongoDB (bulk upsert buffer)
+            queued = False
+            if save_to_db:
+                queued = self.save_to_mongodb(collected_data)
+                if queued:
+                    print(f"    ✅ 저장 대기")
+                else:
+                    print(f"    ⚠️  저장 failed")
+            else:
+                print(f"    ✅ Collection complete (저장 안함)")
+            
+            self.stats["processed_announces"] += 1
+            if queued or not save_to_db:
+                # Parts fetched in this run clear their dead-letter entries, even if others failed
+                resolved[announce_key(announce)] = [part for part in DETAIL_PARTS if part not in failures]
+            # Partial results are saved but not completed, so incremental runs backfill them
+            if not failures and collected_data.get("basic_info") is not None and (queued or not save_to_db):
+                completed.append(announce)
+        
+        # 실패 기록은 저장 결과와 무관하게 남기고, 저장이 확정된 공고만 완료/복구로 취급
+        if save_to_db and not self.flush_writes():
+            print(f"    ❌ {label}저장 failed - 이 배치는 완료로 기록하지 않음")
+            self._record_dead_letters(dead_letters, {}, prpt_dvsn_cd)
+            return None
+        
+        self._record_dead_letters(dead_letters, resolved, prpt_dvsn_cd)
+        return completed
+    
+    def refresh_announces(
+        self,
+        announces: List[Dict],
+        prpt_dvsn_cd: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        label: str = "refresh ",
+    ) -> Optional[List[Dict]]:
+        """
+        Re-collect stored announcements: the list row (status, dates) and every detail part
+        
+        Each list row is re-read by PLNM_NO; if that lookup fails the stored
+        row is kept and only the details are refreshed. Needs MongoDB.
+        
+        Args:
+            announces: 저장된 공고 목록 항목 (announce_list_item)
+            prpt_dvsn_cd: 재산구분코드 (None이면 전체 재산구분에서 검색)
+            concurrency: 동시 조회 공고 수 (기본값: KAMCO_MAX_WORKERS)
+            
+        Returns:
+            _process_announces 와 동일 (저장 실패 시 None)
+        """
+        def current(announce: Dict) -> Dict:
+            item = self.fetch_announce_item(announce.get("PLNM_NO"), announce.get("PBCT_NO"), prpt_dvsn_cd)
+            return item or announce
+        
+        workers = concurrency or self.max_workers
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            rows = list(executor.map(current, announces))
+        return self._process_announces(rows, True, concurrency, label=label, prpt_dvsn_cd=prpt_dvsn_cd)
+    
+    def _record_dead_letters(
+        self,
+        dead_letters: List[Dict],
+        resolved: Dict[str, List[str]],
+        prpt_dvsn_cd: Optional[str] = None,
+    ) -> None:
+        """Persist failed/partial fetches and clear entries that now succeeded"""
+        if self.dead_letters is None:
+            return
+        try:
+            if dead_letters:
+                self.dead_letters.record_many(dead_letters, prpt_dvsn_cd)
+                self.stats["dead_lettered"] += len(dead_letters)
+            if resolved:
+                self.dead_letters.resolve_many(resolved)
+        except Exception as e:
+            print(f"Dead-letter 기록 failed: {e}")
+    
+    def _filter_changed(self, announces: List[Dict]) -> List[Dict]:
+        """Incremental mode: keep only new or changed announcements"""
+        changed = self.state.filter_changed(announces)
+        skipped = len(announces) - len(changed)
+        if skipped:
+            print(f"  ↷ 변경 없음 {skipped}건 건너뜀")
+        self.stats["skipped_unchanged"] += skipped
+        return changed
+    
+    def _print_summary(self, save_to_db: bool) -> None:
+        print()
+        print("=" * 80)
+        print("Collection complete")
+        print("=" * 80)
+        if self.stats["total_pages"]:
+            print(f"페이지: {self.stats['fetched_pages']}/{self.stats['total_pages']} (failed {self.stats['failed_pages']})")
+        print(f"전체 공고: {self.stats['total_announces']}개")
+        print(f"처리 성공: {self.stats['processed_announces']}개")
+        print(f"처리 failed: {self.stats['failed_announces']}개")
+        if self.stats["skipped_unchanged"]:
+            print(f"변경 없음(건너뜀): {self.stats['skipped_unchanged']}개")
+        if self.stats["dead_lettered"]:
+            print(f"Dead-letter 기록: {self.stats['dead_lettered']}개 (재시도: --retry-failed)")
+        if save_to_db:
+            print(
+                f"DB 저장: {self.stats['saved_items']}개 "
+                f"(신규 {self.stats['inserted_items']}, 변경 {self.stats['modified_items']}, "
+                f"변경 없음 {self.stats['unchanged_items']})"
+            )
+        health = self.transport.health()
+        if health.get("inflight_limit") is not None:
+            print(f"동시 요청 한도: {health['inflight_limit']} (증가 {health['limiter']['increases']}, 감소 {health['limiter']['decreases']})")
+        open_circuits = [name for name, state in health.get("circuits", {}).items() if state != "closed"]
+        if open_circuits:
+            print(f"차단된 엔드포인트: {', '.join(open_circuits)}")
+        print("=" * 80)
+    
     def run(
         self,
         page_no: int = 1,
         num_of_rows: int = 10,
         prpt_dvsn_cd: str = "0001",
         save_to_db: bool = True,
+        concurrency: Optional[int] = None,
+        incremental: bool = False,
     ) -> Dict:
         """
         공매 데이터 수집 실행
@@ -325,6 +702,8 @@ class KamcoCollectorService:
             num_of_rows: 조회할 건수
             prpt_dvsn_cd: 재산구분코드 (0001: 금융권담보재산)
             save_to_db: MongoDB 저장 여부
+            concurrency: 동시 상세 조회 공고 수 (기본값: KAMCO_MAX_WORKERS)
+            incremental: 신규/변경 공고만 상세 조회 (fingerprint 비교)
             
         Returns:
             수집 결과 Statistics
@@ -333,16 +712,12 @@ class KamcoCollectorService:
         print("KAMCO 공매 데이터 수집 시작")
         print("=" * 80)
         print(f"페이지: {page_no}, 조회건수: {num_of_rows}, 재산구분: {prpt_dvsn_cd}")
+        print(f"동시 처리: {concurrency or self.max_workers}, 초당 요청: {self.rate_limiter.rate}")
         print()
         
-        # Connect to MongoDB (저장이 필요한 경우)
-        if save_to_db:
-            print("→ Connect to MongoDB 중...")
-            if not self.connect_mongodb():
-                print("❌ Connect to MongoDB failed")
-                return self.stats
-            print(f"✅ Connect to MongoDB 성공 ({self.db_name}.{self.collection_name})")
-            print()
+        # Connect to MongoDB (저장 또는 증분 수집 상태가 필요한 경우)
+        if (save_to_db or incremental) and not self._ensure_mongodb():
+            return self.stats
         
         # 1. 공고 목록 조회
         print("→ Fetch announcement list 중...")
@@ -364,44 +739,505 @@ class KamcoCollectorService:
         
         # 2. 각 공고의 상세 정보 수집
         print("→ 공고 상세 정보 수집 중...")
-        for idx, announce in enumerate(announces, 1):
-            plnm_no = announce.get("PLNM_NO", "N/A")
-            pbct_no = announce.get("PBCT_NO", "N/A")
-            print(f"  [{idx}/{len(announces)}] PLNM_NO: {plnm_no}, PBCT_NO: {pbct_no}")
+        if incremental:
+            announces = self._filter_changed(announces)
+        completed = self._process_announces(announces, save_to_db, concurrency, prpt_dvsn_cd=prpt_dvsn_cd)
+        if incremental and completed is not None:
+            self.state.mark_collected(completed, prpt_dvsn_cd)
+        
+        self._print_summary(save_to_db)
+        
+        # Connect to MongoDB 종료
+        self.close_mongodb()
+        
+        return self.stats
+    
+    def run_full_sweep(
+        self,
+        num_of_rows: int = 100,
+        prpt_dvsn_cd: str = "0001",
+        save_to_db: bool = True,
+        page_workers: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        incremental: bool = False,
+        restart: bool = False,
+    ) -> Dict:
+        """
+        전체 페이지 수집 실행 (totalCount 자동 탐색 + 병렬 페이지 조회)
+        
+        각 페이지는 도착하는 즉시 상세 정보 수집 단계로 넘어가며, 그동안
+        나머지 페이지는 백그라운드 워커가 계속 조회한다.
+        
+        증분 모드에서는 신규/변경 공고만 상세 조회하고, 연속으로 완료된
+        마지막 페이지를 재산구분별 체크포인트로 남긴다. 중단된 수집은 다음
+        실행 시 체크포인트 다음 페이지부터 이어서 진행한다.
+        
+        Args:
+            num_of_rows: 페이지당 건수
+            prpt_dvsn_cd: 재산구분코드 (0001: 금융권담보재산)
+            save_to_db: MongoDB 저장 여부
+            page_workers: 동시 목록 조회 수 (기본값: KAMCO_PAGE_WORKERS)
+            concurrency: 동시 상세 조회 공고 수 (기본값: KAMCO_MAX_WORKERS)
+            max_pages: 최대 페이지 수 (None이면 전체)
+            incremental: 신규/변경 공고만 상세 조회 + 체크포인트 재개
+            restart: 증분 모드에서 체크포인트를 무시하고 1페이지부터 수집
             
-            # 상세 정보 수집
-            collected_data = self.collect_announce_details(announce)
+        Returns:
+            수집 결과 Statistics
+        """
+        print("=" * 80)
+        print("KAMCO 공매 데이터 전체 수집 시작")
+        print("=" * 80)
+        print(f"조회건수: {num_of_rows}, 재산구분: {prpt_dvsn_cd}, 최대 페이지: {max_pages or '전체'}")
+        print(f"페이지 워커: {page_workers or self.page_workers}, 동시 처리: {concurrency or self.max_workers}, 초당 요청: {self.rate_limiter.rate}")
+        print()
+        
+        if (save_to_db or incremental) and not self._ensure_mongodb():
+            return self.stats
+        
+        start_page = 1
+        if incremental:
+            if not restart:
+                start_page = self.state.resume_page(prpt_dvsn_cd, num_of_rows)
+                if start_page > 1:
+                    print(f"↻ 체크포인트에서 재개: {start_page}페이지부터")
+            self.state.start_sweep(prpt_dvsn_cd, num_of_rows, start_page)
+        checkpointer = PageCheckpointer(start_page)
+        
+        print("→ Fetch announcement pages 중...")
+        pages = self.iter_announce_pages(num_of_rows, prpt_dvsn_cd, page_workers, max_pages, start_page)
+        for page_no, announces in pages:
+            if announces is None:
+                print(f"❌ 페이지 {page_no} 조회 failed")
+                self.stats["failed_pages"] += 1
+                continue
             
-            if not collected_data:
-                print(f"    ❌ 수집 failed")
-                self.stats["failed_announces"] += 1
+            self.stats["fetched_pages"] += 1
+            self.stats["total_announces"] += len(announces)
+            if incremental:
+                announces = self._filter_changed(announces)
+            print(f"→ 페이지 {page_no}: {len(announces)}건 상세 정보 수집 중...")
+            completed = self._process_announces(
+                announces, save_to_db, concurrency, label=f"p{page_no} ", prpt_dvsn_cd=prpt_dvsn_cd
+            )
+            if completed is None:
+                # 저장 실패: 체크포인트를 넘기지 않아 다음 실행에서 이 페이지부터 다시 수집
+                self.stats["failed_pages"] += 1
                 continue
             
-            # Save to MongoDB
-            if save_to_db:
-                if self.save_to_mongodb(collected_data):
-                    print(f"    ✅ 저장 완료")
-                    self.stats["saved_items"] += 1
+            if incremental:
+                self.state.mark_collected(completed, prpt_dvsn_cd)
+                high_water = checkpointer.done(page_no)
+                if high_water is not None:
+                    self.state.checkpoint(prpt_dvsn_cd, high_water)
+        
+        # 조회/저장에 실패한 페이지가 있으면 체크포인트를 남겨 다음 실행에서 재개
+        if incremental and not self.stats["failed_pages"] and max_pages is None:
+            self.state.complete_sweep(prpt_dvsn_cd, self.stats)
+        
+        self._print_summary(save_to_db)
+        
+        self.close_mongodb()
+        
+        return self.stats
+
+    
+    def retry_dead_letters(
+        self,
+        limit: Optional[int] = None,
+        max_attempts: int = 5,
+        concurrency: Optional[int] = None,
+    ) -> Dict:
+        """
+        Dead-letter 재시도: 누락된 상세 부분만 다시 조회해 기존 문서에 병합
+        
+        Args:
+            limit: 최대 재시도 공고 수 (None이면 전체)
+            max_attempts: 이 횟수 이상 실패한 항목은 건너뜀
+            concurrency: 동시 재조회 공고 수 (기본값: KAMCO_MAX_WORKERS)
+            
+        Returns:
+            수집 결과 Statistics
+        """
+        print("=" * 80)
+        print("KAMCO dead-letter 재시도")
+        print("=" * 80)
+        
+        if not self._ensure_mongodb():
+            return self.stats
+        
+        entries = self.dead_letters.pending(limit=limit, max_attempts=max_attempts)
+        calls = sum(len(entry.get("parts") or {}) for entry in entries)
+        print(f"대기 중: {len(entries)}개 공고, 재조회 {calls}회 예정")
+        if not entries:
+            self.close_mongodb()
+            return self.stats
+        self.stats["total_announces"] = len(entries)
+        
+        # 기존 문서를 한 번에 읽어 수리된 부분만 덮어쓴다 (content hash 유지)
+        existing = {}
+        for start in range(0, len(entries), 500):
+            batch = entries[start:start + 500]
+            query = {"$or": [{"PLNM_NO": e["PLNM_NO"], "PBCT_NO": e["PBCT_NO"]} for e in batch]}
+            for doc in self.collection.find(query, {"_id": 0, "_content_hash": 0}):
+                existing[(doc["PLNM_NO"], doc["PBCT_NO"])] = doc
+        
+        def refetch(entry: Dict) -> Tuple[Dict, Dict, Dict]:
+            parts, failures = self.fetch_detail_parts(entry["PLNM_NO"], entry["PBCT_NO"], entry.get("parts") or {})
+            return entry, parts, failures
+        
+        dead_letters = []
+        resolved = {}
+        workers = concurrency or self.max_workers
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(refetch, entry) for entry in entries]
+            for idx, future in enumerate(as_completed(futures), 1):
+                entry, parts, failures = future.result()
+                announce = entry.get("announce") or {"PLNM_NO": entry["PLNM_NO"], "PBCT_NO": entry["PBCT_NO"]}
+                print(f"  [{idx}/{len(entries)}] PLNM_NO: {entry['PLNM_NO']}, PBCT_NO: {entry['PBCT_NO']} "
+                      f"- 복구 {len(parts)}, 실패 {len(failures)}")
+                
+                if parts:
+                    doc = existing.get((entry["PLNM_NO"], entry["PBCT_NO"])) or {
+                        "PLNM_NO": entry["PLNM_NO"],
+                        "PBCT_NO": entry["PBCT_NO"],
+                        "announce_list_item": announce,
+                        "basic_info": None,
+                        "schedule_info": [],
+                        "file_info": [],
+                    }
+                    doc.update(parts)
+                    doc["collected_at"] = datetime.now()
+                    if self.save_to_mongodb(doc):
+                        resolved[entry["_id"]] = list(parts)
+                        self.stats["repaired_parts"] += len(parts)
+                if failures:
+                    dead_letters.append({"announce": announce, "failures": failures})
+                    self.stats["failed_announces"] += 1
                 else:
-                    print(f"    ⚠️  저장 failed")
-            else:
-                print(f"    ✅ Collection complete (저장 안함)")
+                    self.stats["processed_announces"] += 1
+        
+        # 복구된 부분은 저장이 확정된 경우에만 해제
+        self._record_dead_letters(dead_letters, resolved if self.flush_writes() else {})
+        
+        print()
+        print(f"복구된 부분: {self.stats['repaired_parts']}개, 여전히 실패: {len(dead_letters)}개 공고")
+        print(f"Dead-letter 상태: {self.dead_letters.counts()}")
+        self.close_mongodb()
+        return self.stats
+
+    
+    def run_all_divisions(
+        self,
+        divisions: Optional[List[str]] = None,
+        num_of_rows: int = 100,
+        save_to_db: bool = True,
+        page_workers: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        incremental: bool = False,
+        restart: bool = False,
+    ) -> Dict:
+        """
+        모든 재산구분코드를 동시에 전체 수집
+        
+        재산구분마다 별도 수집기(같은 transport/초당 요청 제한 공유)를 띄우고
+        동시 처리 수를 나눠 가진다. 체크포인트는 재산구분별로 저장된다.
+        
+        Args:
+            divisions: 수집할 재산구분코드 (기본값: PRPT_DIVISIONS 전체)
+            concurrency: 전체 동시 상세 조회 수 (재산구분별로 균등 분배)
+            page_workers: 전체 동시 목록 조회 수 (재산구분별로 균등 분배, 최소 1)
+            나머지 인자는 run_full_sweep 과 동일
             
-            self.stats["processed_announces"] += 1
+        Returns:
+            합산된 수집 결과 Statistics (재산구분별 결과는 "divisions")
+        """
+        divisions = list(divisions or PRPT_DIVISIONS)
+        total_workers = concurrency or self.max_workers
+        total_page_workers = page_workers or self.page_workers
+        worker_share = max(1, total_workers // len(divisions))
+        page_share = max(1, total_page_workers // len(divisions))
+        
+        print("=" * 80)
+        print(f"KAMCO 전체 재산구분 동시 수집: {', '.join(divisions)}")
+        print(f"재산구분별 동시 처리: {worker_share}, 페이지 워커: {page_share}, 초당 요청(공유): {self.rate_limiter.rate}")
+        print("=" * 80)
+        
+        def sweep(division: str) -> Dict:
+            collector = KamcoCollectorService(
+                service_key=self.service_key,
+                mongo_uri=self.mongo_uri,
+                db_name=self.db_name,
+                collection_name=self.collection_name,
+                requests_per_second=self.rate_limiter.rate,
+                max_workers=worker_share,
+                page_workers=page_share,
+                transport=self.transport,
+                cache=self.transport.cache,
+            )
+            return collector.run_full_sweep(
+                num_of_rows=num_of_rows,
+                prpt_dvsn_cd=division,
+                save_to_db=save_to_db,
+                page_workers=page_share,
+                concurrency=worker_share,
+                max_pages=max_pages,
+                incremental=incremental,
+                restart=restart,
+            )
+        
+        results: Dict[str, Dict] = {}
+        with ThreadPoolExecutor(max_workers=len(divisions)) as executor:
+            futures = {executor.submit(sweep, division): division for division in divisions}
+            for future in as_completed(futures):
+                division = futures[future]
+                try:
+                    results[division] = future.result()
+                except Exception as e:
+                    print(f"❌ 재산구분 {division} 수집 오류: {e}")
+                    results[division] = {"error": str(e)}
+        
+        for division_stats in results.values():
+            for key, value in division_stats.items():
+                if isinstance(value, (int, float)) and key in self.stats:
+                    self.stats[key] += value
         
         print()
         print("=" * 80)
-        print("Collection complete")
+        print("전체 재산구분 수집 결과")
         print("=" * 80)
-        print(f"전체 공고: {self.stats['total_announces']}개")
-        print(f"처리 성공: {self.stats['processed_announces']}개")
-        print(f"처리 failed: {self.stats['failed_announces']}개")
-        if save_to_db:
-            print(f"DB 저장: {self.stats['saved_items']}개")
+        print(f"{'구분':<6}{'이름':<12}{'페이지':>10}{'공고':>8}{'성공':>8}{'실패':>8}{'저장':>8}")
+        for division in divisions:
+            st = results.get(division, {})
+            if "error" in st:
+                print(f"{division:<6}{PRPT_DIVISIONS.get(division, ''):<12} 오류: {st['error']}")
+                continue
+            print(
+                f"{division:<6}{PRPT_DIVISIONS.get(division, ''):<12}"
+                f"{st.get('fetched_pages', 0):>6}/{st.get('total_pages', 0):<3}{st.get('total_announces', 0):>8}"
+                f"{st.get('processed_announces', 0):>8}{st.get('failed_announces', 0):>8}{st.get('saved_items', 0):>8}"
+            )
+        self._print_summary(save_to_db)
+        
+        merged = dict(self.stats)
+        merged["divisions"] = results
+        return merged
+    
+    def _seed_sweep(
+        self,
+        queue: WorkQueue,
+        sweep_id: str,
+        num_of_rows: int,
+        prpt_dvsn_cd: str,
+        max_pages: Optional[int],
+        incremental: bool,
+    ) -> bool:
+        """Enqueue page tasks from page 1's totalCount (idempotent; any worker may seed)"""
+        first = self.fetch_announce_page(1, num_of_rows, prpt_dvsn_cd)
+        if first is None:
+            print("❌ 1페이지 조회 failed, sweep을 생성할 수 없습니다")
+            return False
+        
+        items, total_count = first
+        total_pages = -(-(total_count or 0) // num_of_rows) or 1
+        last_page = total_pages if max_pages is None else min(total_pages, max_pages)
+        pages = [
+            {"page_no": page_no, "num_of_rows": num_of_rows, "prpt_dvsn_cd": prpt_dvsn_cd}
+            for page_no in range(1, last_page + 1)
+        ]
+        
+        # 1페이지는 이미 조회했으므로 완료 상태로 넣고 공고 작업만 추가
+        queue.enqueue_many(sweep_id, "page", pages[:1], key=lambda p: p["page_no"], status=DONE)
+        self._enqueue_announces(queue, sweep_id, items, incremental)
+        created = queue.enqueue_many(sweep_id, "page", pages[1:], key=lambda p: p["page_no"])
+        self.stats["total_count"] = total_count or len(items)
+        self.stats["total_pages"] = last_page
+        print(f"✅ sweep {sweep_id}: totalCount={total_count}, 페이지 작업 {created + 1}/{last_page}개 생성")
+        return True
+    
+    def _enqueue_announces(self, queue: WorkQueue, sweep_id: str, announces: List[Dict], incremental: bool) -> int:
+        if incremental:
+            announces = self._filter_changed(announces)
+        return queue.enqueue_many(sweep_id, "announce", announces, key=announce_key)
+    
+    def run_worker(
+        self,
+        sweep_id: Optional[str] = None,
+        num_of_rows: int = 100,
+        prpt_dvsn_cd: str = "0001",
+        concurrency: Optional[int] = None,
+        batch_size: int = 50,
+        max_pages: Optional[int] = None,
+        incremental: bool = False,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 5.0,
+    ) -> Dict:
+        """
+        공유 작업 큐(collect_tasks)에서 페이지/공고 작업을 가져와 처리하는 수집 워커
+        
+        여러 호스트에서 각자의 서비스 키와 초당 요청 제한으로 같은 sweep_id 를
+        실행하면 하나의 수집을 나눠 처리한다. 작업은 임대(lease)로 배타적으로
+        처리되며, 임대가 만료된 작업은 다른 워커가 가져간다.
+        
+        Args:
+            sweep_id: 공유 수집 ID (기본값: <재산구분>-<오늘 날짜>)
+            num_of_rows: 페이지당 건수
+            prpt_dvsn_cd: 재산구분코드
+            concurrency: 동시 상세 조회 공고 수 (기본값: KAMCO_MAX_WORKERS)
+            batch_size: 한 번에 임대할 공고 작업 수
+            max_pages: 최대 페이지 수 (sweep 생성 시에만 적용)
+            incremental: 신규/변경 공고만 작업으로 추가
+            lease_seconds: 임대 시간 (하트비트로 연장)
+            poll_interval: 다른 워커의 작업을 기다릴 때 폴링 간격(초)
+            
+        Returns:
+            이 워커의 수집 결과 Statistics
+        """
+        sweep_id = sweep_id or f"{prpt_dvsn_cd}-{datetime.now():%Y%m%d}"
+        print("=" * 80)
+        print(f"KAMCO 수집 워커 시작 (sweep: {sweep_id})")
         print("=" * 80)
         
-        # Connect to MongoDB 종료
-        if save_to_db:
-            self.close_mongodb()
+        if not self._ensure_mongodb():
+            return self.stats
+        
+        queue = WorkQueue(self.client[self.db_name], lease_seconds=lease_seconds)
+        print(f"워커: {queue.worker_id}, 초당 요청: {self.rate_limiter.rate}")
+        
+        if not queue.has_tasks(sweep_id):
+            if not self._seed_sweep(queue, sweep_id, num_of_rows, prpt_dvsn_cd, max_pages, incremental):
+                self.close_mongodb()
+                return self.stats
+        
+        with LeaseKeeper(queue) as keeper:
+            while True:
+                # 공고 작업을 우선 처리하고, 없으면 다음 페이지를 펼친다
+                tasks = queue.claim_many(sweep_id, "announce", batch_size)
+                if tasks:
+                    ids = [task["_id"] for task in tasks]
+                    keeper.hold(ids)
+                    announces = [task["payload"] for task in tasks]
+                    self.stats["total_announces"] += len(announces)
+                    completed = self._process_announces(
+                        announces, True, concurrency, label="w ", prpt_dvsn_cd=prpt_dvsn_cd
+                    )
+                    if completed is None:
+                        queue.fail_many(ids, "save failed")
+                        keeper.release(ids)
+                        continue
+                    if incremental:
+                        self.state.mark_collected(completed, prpt_dvsn_cd)
+                    done_ids = {queue.task_id(sweep_id, "announce", announce_key(a)) for a in completed}
+                    queue.complete_many(done_ids)
+                    queue.fail_many([i for i in ids if i not in done_ids], "detail collection failed")
+                    keeper.release(ids)
+                    continue
+                
+                page_task = queue.claim(sweep_id, "page")
+                if page_task:
+                    page = page_task["payload"]
+                    keeper.hold([page_task["_id"]])
+                    result = self.fetch_announce_page(page["page_no"], page["num_of_rows"], page["prpt_dvsn_cd"])
+                    if result is None:
+                        self.stats["failed_pages"] += 1
+                        queue.fail_many([page_task["_id"]], "page fetch failed")
+                    else:
+                        self.stats["fetched_pages"] += 1
+                        added = self._enqueue_announces(queue, sweep_id, result[0], incremental)
+                        queue.complete_many([page_task["_id"]])
+                        print(f"→ 페이지 {page['page_no']}: 공고 작업 {added}개 추가")
+                    keeper.release([page_task["_id"]])
+                    continue
+                
+                if queue.is_drained(sweep_id):
+                    break
+                # 남은 작업은 다른 워커가 임대 중 - 완료되거나 임대가 만료될 때까지 대기
+                time.sleep(poll_interval)
         
+        print(f"sweep {sweep_id} 진행 상황: {queue.counts(sweep_id)}")
+        self._print_summary(True)
+        self.close_mongodb()
         return self.stats
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="KAMCO 공매 데이터 수집")
+    parser.add_argument("--page", type=int, default=1, help="페이지 번호 (단일 페이지 수집)")
+    parser.add_argument("--rows", type=int, default=10, help="페이지당 건수")
+    parser.add_argument("--division", default="0001", help="재산구분코드 (PRPT_DVSN_CD, all: 전체 동시 수집)")
+    parser.add_argument("--full-sweep", action="store_true", help="totalCount 기준 전체 페이지 수집")
+    parser.add_argument("--max-pages", type=int, help="전체 수집 시 최대 페이지 수")
+    parser.add_argument("--page-workers", type=int, help="동시 목록 조회 수")
+    parser.add_argument("--concurrency", type=int, help="동시 상세 조회 공고 수")
+    parser.add_argument("--incremental", action="store_true", help="신규/변경 공고만 상세 조회 (체크포인트 재개)")
+    parser.add_argument("--restart", action="store_true", help="증분 수집 체크포인트 무시")
+    parser.add_argument("--no-save", action="store_true", help="MongoDB에 저장하지 않음")
+    parser.add_argument("--retry-failed", action="store_true", help="dead-letter 항목의 누락된 상세 정보만 재조회")
+    parser.add_argument("--max-attempts", type=int, default=5, help="--retry-failed: 이 횟수 이상 실패한 항목 제외")
+    parser.add_argument("--worker", action="store_true", help="공유 작업 큐(collect_tasks)에서 sweep 을 나눠 처리")
+    parser.add_argument("--sweep-id", help="--worker: 공유 수집 ID (기본값: <재산구분>-<날짜>)")
+    parser.add_argument("--service-key", help="이 워커가 사용할 서비스 키 (기본값: 환경 변수)")
+    parser.add_argument("--rps", type=float, help="이 워커의 초당 요청 제한 (기본값: KAMCO_REQUESTS_PER_SECOND)")
+    parser.add_argument("--cache", action="store_true", help="원본 응답 캐시 사용 (KAMCO_CACHE_DIR)")
+    parser.add_argument("--replay", action="store_true", help="캐시에서만 응답 (네트워크 호출 없음)")
+    args = parser.parse_args()
+    
+    cache = None
+    if args.replay:
+        cache = ResponseCache.from_env(mode="replay")
+    elif args.cache:
+        cache = ResponseCache.from_env(mode="readwrite")
+    
+    service = KamcoCollectorService(service_key=args.service_key, requests_per_second=args.rps, cache=cache)
+    if args.worker:
+        service.run_worker(
+            sweep_id=args.sweep_id,
+            num_of_rows=args.rows,
+            prpt_dvsn_cd=args.division,
+            concurrency=args.concurrency,
+            max_pages=args.max_pages,
+            incremental=args.incremental,
+        )
+    elif args.retry_failed:
+        service.retry_dead_letters(max_attempts=args.max_attempts, concurrency=args.concurrency)
+    elif args.division == "all":
+        service.run_all_divisions(
+            num_of_rows=args.rows,
+            save_to_db=not args.no_save,
+            page_workers=args.page_workers,
+            concurrency=args.concurrency,
+            max_pages=args.max_pages,
+            incremental=args.incremental,
+            restart=args.restart,
+        )
+    elif args.full_sweep:
+        service.run_full_sweep(
+            num_of_rows=args.rows,
+            prpt_dvsn_cd=args.division,
+            save_to_db=not args.no_save,
+            page_workers=args.page_workers,
+            concurrency=args.concurrency,
+            max_pages=args.max_pages,
+            incremental=args.incremental,
+            restart=args.restart,
+        )
+    else:
+        service.run(
+            page_no=args.page,
+            num_of_rows=args.rows,
+            prpt_dvsn_cd=args.division,
+            save_to_db=not args.no_save,
+            concurrency=args.concurrency,
+            incremental=args.incremental,
+        )
+    
+    if service.transport.cache is not None:
+        print(f"Cache ({service.transport.cache.mode}): {service.transport.cache.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Buffered bulk upsert writer for MongoDB
+
+Replaces per-document find_one + update_one/insert_one round trips with
+batched bulk_write(UpdateOne(..., upsert=True)) calls, flushed by size or
+age. Age is only checked when a document is added, so callers must call
+flush() (or close(), or use the writer as a context manager) once they stop
+adding; a trailing partial batch is never written by a timer. A unique compound index on the key fields is created on startup so
+concurrent writers cannot create duplicate rows.
+
+Counts are reported accurately:
+- inserted: documents created by an upsert
+- modified: existing documents whose content changed
+- unchanged: existing documents matched with identical content
+
+Volatile fields (e.g. collected_at) would make every update a
+modification, so they are only written when the content hash of the
+remaining fields changes (via an update pipeline), and otherwise left as is.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, OperationFailure
+
+log = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def content_hash(doc: Dict[str, Any], exclude: Iterable[str] = ()) -> str:
+    excluded = set(exclude) | {"_id"}
+    stable = {k: v for k, v in doc.items() if k not in excluded}
+    raw = json.dumps(stable, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class BulkUpsertWriter:
+    """
+    Buffered, thread-safe bulk upserter keyed on one or more fields
+
+    The buffer is swapped out under a lock and written outside it, so other
+    threads keep adding while a batch is in flight; batches are written one
+    at a time. If bulk_write fails outright (network, timeout), the batch is
+    put back in the buffer and the exception is raised from flush().
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        key_fields: Sequence[str] = ("PLNM_NO", "PBCT_NO"),
+        volatile_fields: Sequence[str] = ("collected_at",),
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        ensure_index: bool = True,
+    ):
+        self.collection = collection
+        self.key_fields = tuple(key_fields)
+        self.volatile_fields = tuple(volatile_fields)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._ops: List[UpdateOne] = []
+        self._lock = threading.Lock()
+        # Serializes bulk_write calls and the stats they update
+        self._write_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.stats = {"inserted": 0, "modified": 0, "unchanged": 0, "errors": 0, "batches": 0}
+
+        if ensure_index:
+            self.ensure_index()
+
+    def ensure_index(self) -> Optional[str]:
+        """Create the unique compound index on the key fields"""
+        if self.key_fields == ("_id",):
+            return None
+        name = "uniq_" + "_".join(self.key_fields)
+        try:
+            return self.collection.create_index(
+                [(field, ASCENDING) for field in self.key_fields],
+                unique=True,
+                name=name,
+            )
+        except OperationFailure as e:
+            # Existing duplicates block the unique index; upserts still work
+            log.warning("Could not create unique index %s on %s: %s", name, self.collection.name, e)
+            return None
+
+    def _build_op(self, doc: Dict[str, Any]) -> UpdateOne:
+        key = {field: doc[field] for field in self.key_fields}
+        fields = {k: v for k, v in doc.items() if k != "_id"}
+
+        if not self.volatile_fields:
+            return UpdateOne(key, {"$set": fields}, upsert=True)
+
+        digest = content_hash(doc, exclude=self.volatile_fields)
+        changed = {"$ne": ["$_content_hash", digest]}
+        stage: Dict[str, Any] = {k: {"$literal": v} for k, v in fields.items() if k not in self.volatile_fields}
+        for field in self.volatile_fields:
+            if field in fields:
+                stage[field] = {"$cond": [changed, {"$literal": fields[field]}, f"${field}"]}
+        stage["_content_hash"] = digest
+        return UpdateOne(key, [{"$set": stage}], upsert=True)
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        """Buffer one document; flushes when the batch is full or old enough"""
+        op = self._build_op(doc)
+        with self._lock:
+            self._ops.append(op)
+            due = (
+                len(self._ops) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> None:
+        for doc in docs:
+            self.add(doc)
+
+    def _execute(self, ops: List[UpdateOne], retry: bool = True) -> None:
+        try:
+            result = self.collection.bulk_write(ops, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            dup_ops = [ops[err["index"]] for err in details.get("writeErrors", []) if err.get("code") == DUPLICATE_KEY_ERROR]
+            other_errors = len(details.get("writeErrors", [])) - len(dup_ops)
+            if other_errors:
+                log.error("bulk_write on %s: %s write errors", self.collection.name, other_errors)
+                self.stats["errors"] += other_errors
+            if dup_ops:
+                if retry:
+                    # Lost an upsert race with another writer; the row exists now
+                    self._execute(dup_ops, retry=False)
+                else:
+                    self.stats["errors"] += len(dup_ops)
+
+        upserted = details.get("nUpserted", 0)
+        matched = details.get("nMatched", 0)
+        modified = details.get("nModified", 0)
+        self.stats["inserted"] += upserted
+        self.stats["modified"] += modified
+        self.stats["unchanged"] += matched - modified
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Write all buffered operations; returns cumulative stats
+
+        Raises whatever bulk_write raised (other than per-document write
+        errors, which are counted in stats["errors"]) after putting the
+        batch back in front of the buffer.
+        """
+        with self._write_lock:
+            with self._lock:
+                ops, self._ops = self._ops, []
+                self._last_flush = time.monotonic()
+            if not ops:
+                return dict(self.stats)
+            try:
+                self._execute(ops)
+            except Exception:
+                with self._lock:
+                    self._ops[:0] = ops
+                raise
+            self.stats["batches"] += 1
+            return dict(self.stats)
+
+    @property
+    def pending(self) -> int:
+        return len(self._ops)
+
+    def close(self) -> Dict[str, int]:
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,285 @@
+"""
+Shared HTTP transport for onbid / data.go.kr OpenAPI calls
+
+Every caller (KamcoCollectorService, collector/kamco_fetcher.py, app.py)
+goes through OnbidTransport so that:
+- one pooled keep-alive requests.Session is reused (no TCP/TLS setup per call)
+- 5xx, 429, transient request errors (connection, timeout, truncated or
+  undecodable bodies) and resultCode throttling errors are retried with
+  exponential backoff and full jitter
+- each operation gets its own (connect, read) timeout
+- responses are requested gzip-compressed
+- an optional ResponseCache (services/response_cache.py) serves and stores
+  raw bodies, so replay runs make no network calls at all
+- an optional AdaptiveLimiter and per-endpoint CircuitBreakers
+  (services/adaptive.py) bound in-flight requests by observed health
+"""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.adaptive import AdaptiveLimiter, CircuitBreakers
+from services.rate_limiter import RateLimiter
+from services.response_cache import ResponseCache
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://openapi.onbid.co.kr/openapi/services"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+# (connect, read) timeout per operation; list pages with numOfRows=1000 are slow
+DEFAULT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "getKamcoPlnmPbctList": (5, 60),
+    "getKamcoPlnmPbctBasicInfoDetail": (5, 20),
+    "getKamcoPlnmPbctBidDateInfoDetail": (5, 20),
+    "getKamcoPlnmPbctFileInfoDetail": (5, 20),
+}
+DEFAULT_TIMEOUT: Tuple[float, float] = (5, 30)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# data.go.kr 공통 에러코드: 04 HTTP_ERROR, 05 SERVICETIMEOUT_ERROR,
+# 22 LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR
+THROTTLE_RESULT_CODES = {"04", "05", "22"}
+
+# Only normal responses (00 NORMAL SERVICE, 03 NODATA) are worth caching
+CACHEABLE_RESULT_CODES = {None, "00", "03"}
+
+# Request errors that no retry can fix (bad URL/headers); everything else
+# under requests.RequestException is treated as transient
+NON_RETRYABLE_ERRORS = (
+    requests.exceptions.URLRequired,
+    requests.exceptions.MissingSchema,
+    requests.exceptions.InvalidSchema,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidHeader,
+)
+
+_RESULT_CODE_RE = re.compile(rb"<(?:resultCode|returnReasonCode)>\s*(\d+)\s*<")
+
+
+def extract_result_code(body: Union[bytes, str]) -> Optional[str]:
+    """Read resultCode/returnReasonCode from the head of an XML body"""
+    head = body[:2048]
+    if isinstance(head, str):
+        head = head.encode("utf-8", "replace")
+    match = _RESULT_CODE_RE.search(head)
+    return match.group(1).decode("ascii") if match else None
+
+
+def normalize_service_key(raw: Optional[str]) -> Optional[str]:
+    """Prevent double encoding of API key (keys are often pasted URL-encoded, sometimes twice)"""
+    if not raw:
+        return raw
+    val = raw
+    for _ in range(2):
+        if "%" in val:
+            val = unquote(val)
+    return val
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Transient request errors; 4xx HTTPErrors (except 429) and malformed requests are final"""
+    if not isinstance(error, requests.RequestException) or isinstance(error, NON_RETRYABLE_ERRORS):
+        return False
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status in RETRY_STATUS_CODES or not 400 <= status < 500
+    return True
+
+
+class OnbidTransport:
+    """Pooled, retrying HTTP client for onbid OpenAPI endpoints"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        pool_size: int = 16,
+        timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        headers: Optional[Dict[str, str]] = None,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        breakers: Optional[CircuitBreakers] = None,
+    ):
+        # KAMCO_API_BASE_URL points every caller at e.g. scripts/mock_onbid_server.py
+        self.base_url = (base_url or os.getenv("KAMCO_API_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.limiter = limiter
+        self.breakers = breakers
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url_for(self, svc_path: str, operation: str) -> str:
+        return f"{self.base_url}/{svc_path.strip('/')}/{operation}"
+
+    def timeout_for(self, operation: Optional[str]) -> Tuple[float, float]:
+        return self.timeouts.get(operation or "", DEFAULT_TIMEOUT)
+
+    @staticmethod
+    def _cached_response(url: str, body: bytes) -> requests.Response:
+        res = requests.Response()
+        res.status_code = 200
+        res._content = body
+        res.url = url
+        res.headers["X-Cache"] = "HIT"
+        return res
+
+    def _record(self, label: str, breaker, latency: Optional[float], ok: Optional[bool]) -> None:
+        """Report one HTTP attempt to the adaptive limiter and the endpoint's breaker (ok=None: no signal)"""
+        if self.limiter is not None:
+            self.limiter.release(label, latency, ok)
+        if breaker is not None:
+            if ok is None:
+                breaker.cancel()
+            elif ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+    def health(self) -> Dict[str, Any]:
+        """Current in-flight limit and circuit states (empty when not adaptive)"""
+        health: Dict[str, Any] = {}
+        if self.limiter is not None:
+            health["inflight_limit"] = round(self.limiter.limit, 1)
+            health["limiter"] = dict(self.limiter.stats)
+        if self.breakers is not None:
+            health["circuits"] = self.breakers.states()
+        return health
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        operation: Optional[str] = None,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        GET with retries.
+
+        Retries on transient request errors (connection errors, timeouts,
+        ChunkedEncodingError/ContentDecodingError on truncated gzip bodies),
+        retryable HTTP statuses and throttling resultCodes. After the last
+        attempt the final response is returned (callers keep using raise_for_status / resultCode checks),
+        or the last exception is re-raised if no response was received.
+        """
+        timeout = timeout or self.timeout_for(operation)
+        label = operation or url
+
+        if self.cache is not None and operation:
+            body = self.cache.get(operation, params)
+            if body is not None:
+                return self._cached_response(url, body)
+
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            breaker = self.breakers.get(label) if self.breakers is not None else None
+            if breaker is not None:
+                breaker.before_call()
+            if self.limiter is not None:
+                self.limiter.acquire()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            started = time.monotonic()
+            try:
+                res = self.session.get(url, params=params, headers=headers, timeout=timeout)
+            except requests.RequestException as e:
+                if not is_retryable_error(e):
+                    self._record(label, breaker, None, ok=None)
+                    raise
+                self._record(label, breaker, None, ok=False)
+                if last:
+                    raise
+                delay = self._backoff(attempt)
+                log.warning("%s: %s, retry %s/%s in %.2fs", label, type(e).__name__, attempt + 1, self.max_retries, delay)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self._record(label, breaker, None, ok=None)
+                raise
+
+            code = None
+            if res.status_code in RETRY_STATUS_CODES:
+                reason = f"HTTP {res.status_code}"
+            else:
+                code = extract_result_code(res.content) if res.ok else None
+                reason = f"resultCode {code}" if code in THROTTLE_RESULT_CODES else None
+            self._record(label, breaker, time.monotonic() - started, ok=reason is None)
+
+            if reason is None:
+                if self.cache is not None and operation and res.status_code == 200 and code in CACHEABLE_RESULT_CODES:
+                    self.cache.put(operation, params, res.content)
+                return res
+            if last:
+                return res
+
+            delay = self._backoff(attempt)
+            retry_after = res.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            log.warning("%s: %s, retry %s/%s in %.2fs", label, reason, attempt + 1, self.max_retries, delay)
+            time.sleep(delay)
+
+        return res
+
+    def call(
+        self,
+        svc_path: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """GET {base_url}/{svc_path}/{operation}"""
+        return self.get(self.url_for(svc_path, operation), params=params, operation=operation, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_transport: Optional[OnbidTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> OnbidTransport:
+    """Process-wide shared transport (lazily created)"""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = OnbidTransport()
+        return _default_transport
@@ -0,0 +1,170 @@
+"""
+Streaming parser for onbid OpenAPI XML responses
+
+xmltodict.parse builds the whole response as nested OrderedDicts before the
+caller can look at response/body/items/item. OnbidXmlStream instead feeds
+the body through an incremental XMLPullParser, reads the header as soon as
+it is closed, and yields one plain dict per item, clearing each element
+once it has been converted.
+
+The gain is parse speed (about 1.9x on a 1000-row page, see
+scripts/bench_xml_parse.py). Memory only stays flat when the caller
+consumes items one at a time; list(stream), as the collector's fetch_*
+methods do, holds every item dict and peaks in the same range as
+xmltodict.parse (0.9-1.3x depending on the page).
+
+Item dicts keep xmltodict's shape for the fields onbid uses: leaf elements
+become str (or None when empty), nested elements become dicts and repeated
+tags become lists.
+
+Usage:
+    stream = OnbidXmlStream(res.content, item_tags=("item",))
+    header = stream.read_header()
+    for item in stream:
+        ...
+    stream.meta["totalCount"]  # available once the body has been read
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+CHUNK_SIZE = 64 * 1024
+
+# Parent tags under which an item tag is treated as a result row
+ITEM_PARENTS = ("items", "body")
+
+META_FIELDS = ("pageNo", "numOfRows", "totalCount", "TotalCount")
+
+# Marker yielded by the event loop when </header> closes
+_HEADER_END = object()
+
+
+def element_to_dict(elem: ET.Element) -> Union[Dict[str, Any], Optional[str]]:
+    """Convert an element to an xmltodict-style value"""
+    children = list(elem)
+    if not children:
+        text = elem.text.strip() if elem.text else ""
+        return text or None
+
+    out: Dict[str, Any] = {}
+    for child in children:
+        value = element_to_dict(child)
+        if child.tag in out:
+            existing = out[child.tag]
+            if isinstance(existing, list):
+                existing.append(value)
+            else:
+                out[child.tag] = [existing, value]
+        else:
+            out[child.tag] = value
+    return out
+
+
+class OnbidXmlStream:
+    """Incremental reader for one onbid response body"""
+
+    def __init__(
+        self,
+        source: Union[bytes, str, Iterable[bytes]],
+        item_tags: Iterable[str] = ("item",),
+    ):
+        """
+        Args:
+            source: 응답 본문 (bytes/str) 또는 bytes 청크 iterator (예: res.iter_content())
+            item_tags: 결과 행으로 취급할 태그 (목록: item, 일정: bidDateInfoItem, 파일: fileItem)
+        """
+        self.item_tags = set(item_tags)
+        self.header: Dict[str, Optional[str]] = {}
+        self.meta: Dict[str, Optional[str]] = {}
+        self._header_done = False
+        self._exhausted = False
+        self._pending: List[Dict[str, Any]] = []
+        self._events = self._iter_events(source)
+
+    @staticmethod
+    def _chunks(source: Union[bytes, str, Iterable[bytes]]) -> Iterator[Union[bytes, str]]:
+        if isinstance(source, (bytes, str)):
+            for i in range(0, len(source), CHUNK_SIZE):
+                yield source[i:i + CHUNK_SIZE]
+        else:
+            yield from source
+
+    def _iter_events(self, source) -> Iterator[Any]:
+        """Yield item dicts (and _HEADER_END), filling header/meta along the way"""
+        parser = ET.XMLPullParser(events=("start", "end"))
+        stack: List[ET.Element] = []
+
+        for chunk in self._chunks(source):
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    stack.append(elem)
+                    continue
+
+                stack.pop()
+                parent = stack[-1] if stack else None
+                parent_tag = parent.tag if parent is not None else None
+
+                if elem.tag in self.item_tags and parent_tag in ITEM_PARENTS:
+                    item = element_to_dict(elem)
+                    parent.remove(elem)
+                    yield item if isinstance(item, dict) else {"value": item}
+                elif parent_tag in ("header", "cmmMsgHeader"):
+                    self.header[elem.tag] = elem.text.strip() if elem.text else None
+                elif elem.tag in ("header", "cmmMsgHeader"):
+                    self._header_done = True
+                    yield _HEADER_END
+                elif parent_tag == "body" and elem.tag in META_FIELDS:
+                    self.meta[elem.tag] = elem.text.strip() if elem.text else None
+
+        parser.close()
+        self._header_done = True
+
+    def read_header(self) -> Dict[str, Optional[str]]:
+        """Parse only as far as the end of <header> and return its fields"""
+        while not self._header_done and not self._exhausted:
+            try:
+                event = next(self._events)
+            except StopIteration:
+                self._exhausted = True
+                break
+            if event is not _HEADER_END:
+                self._pending.append(event)
+        return self.header
+
+    @property
+    def result_code(self) -> str:
+        """resultCode as str (same convention as str(header.get("resultCode")))"""
+        header = self.read_header()
+        return str(header.get("resultCode") or header.get("returnReasonCode"))
+
+    @property
+    def result_msg(self) -> Optional[str]:
+        header = self.read_header()
+        return header.get("resultMsg") or header.get("returnAuthMsg") or header.get("errMsg")
+
+    @property
+    def total_count(self) -> Optional[int]:
+        value = self.meta.get("totalCount") or self.meta.get("TotalCount")
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while self._pending:
+            yield self._pending.pop(0)
+        if self._exhausted:
+            return
+        for event in self._events:
+            if event is not _HEADER_END:
+                yield event
+        self._exhausted = True
+
+
+def parse_items(
+    source: Union[bytes, str],
+    item_tags: Iterable[str] = ("item",),
+) -> List[Dict[str, Any]]:
+    """Convenience: all items of a response as a list"""
+    return list(OnbidXmlStream(source, item_tags=item_tags))
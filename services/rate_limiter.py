@@ -0,0 +1,56 @@
+"""
+Requests-per-second limiter shared by onbid API callers
+
+A token bucket: tokens refill at `rate` per second up to `burst`, and every
+API call takes one token. Thread-safe, so a single limiter can be shared by
+all worker threads of a collector to keep the whole process inside the
+onbid quota.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: 초당 허용 요청 수 (0 이하이면 제한 없음)
+            burst: 한 번에 허용할 최대 요청 수 (기본값: max(1, rate))
+        """
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(1, int(self.rate))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until `tokens` are available and consume them.
+
+        Returns:
+            대기한 시간(초)
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
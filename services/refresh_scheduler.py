@@ -0,0 +1,418 @@
+"""
+Deadline-aware refresh scheduler for collected announcements
+
+Every collected_items document is kept in a priority queue ordered by
+its next refresh time. The refresh interval depends on how close the
+bidding deadline is:
+
+    closes within 48h  -> every 30 minutes
+    within 7 days      -> every 6 hours
+    within 30 days     -> every 24 hours
+    later              -> every 72 hours
+    already closed     -> dropped (never refreshed again)
+
+The interval counts from the last refresh attempt (collected_at only
+for the initial load), since an unchanged or failed refresh leaves
+collected_at as it was. Failed refreshes back off: the interval doubles
+per consecutive failure, up to far_interval.
+
+The deadline is the nearest future close time found in basic_info
+(PBANC_END_YMD / PBCT_CLS_DTM), schedule_info rows (BID_END_DT /
+PBCT_CLS_DTM) or the list item (PBCT_CLS_DTM). Items on the
+getUnifyDeadlineCltrList feed (ThingInfoInquireSvc, closing within 48h)
+are pulled forward to "due now" whenever that feed is polled.
+
+Refreshes go through KamcoCollectorService.refresh_announces, which
+re-reads each list row (status, dates) by PLNM_NO within the item's own
+division (PRPT_DVSN_CD) before its details, and shares the collector's
+rate limiter, bulk writer and dead-letter handling.
+
+Usage:
+    python -m services.refresh_scheduler            # daemon
+    python -m services.refresh_scheduler --once     # one pass over due items
+"""
+
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.collection_state import announce_key
+from services.onbid_xml import OnbidXmlStream
+
+# (deadline within, refresh every)
+DEFAULT_TIERS: Sequence[Tuple[timedelta, timedelta]] = (
+    (timedelta(hours=48), timedelta(minutes=30)),
+    (timedelta(days=7), timedelta(hours=6)),
+    (timedelta(days=30), timedelta(hours=24)),
+)
+DEFAULT_FAR_INTERVAL = timedelta(hours=72)
+# No parsable deadline: refresh like a far-off item
+UNKNOWN_INTERVAL = timedelta(hours=72)
+
+DEADLINE_FIELDS = ("PBANC_END_YMD", "BID_END_DT", "PBCT_CLS_DTM")
+
+_FORMATS = {
+    8: "%Y%m%d",
+    12: "%Y%m%d%H%M",
+    14: "%Y%m%d%H%M%S",
+}
+
+PROJECTION = {
+    "_id": 0,
+    "PLNM_NO": 1,
+    "PBCT_NO": 1,
+    "PRPT_DVSN_CD": 1,
+    "announce_list_item": 1,
+    "basic_info": 1,
+    "schedule_info": 1,
+    "collected_at": 1,
+}
+
+
+def parse_deadline(value) -> Optional[datetime]:
+    """Parse onbid date strings (YYYYMMDD[HHMM[SS]], with or without separators)"""
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    fmt = _FORMATS.get(len(digits))
+    if fmt is None:
+        return None
+    try:
+        parsed = datetime.strptime(digits, fmt)
+    except ValueError:
+        return None
+    # A date-only deadline closes at the end of that day
+    return parsed + timedelta(days=1) - timedelta(seconds=1) if len(digits) == 8 else parsed
+
+
+def _candidates(doc: Dict) -> Iterable[datetime]:
+    sources = [doc.get("basic_info") or {}, doc.get("announce_list_item") or {}]
+    sources.extend(row for row in doc.get("schedule_info") or [] if isinstance(row, dict))
+    for source in sources:
+        for field in DEADLINE_FIELDS:
+            parsed = parse_deadline(source.get(field))
+            if parsed is not None:
+                yield parsed
+
+
+def next_deadline(doc: Dict, now: Optional[datetime] = None) -> Tuple[Optional[datetime], bool]:
+    """
+    Returns:
+        (deadline, closed) - 가장 가까운 미래 마감 시각, 모든 마감이 지났으면 closed=True
+    """
+    now = now or datetime.now()
+    deadlines = list(_candidates(doc))
+    if not deadlines:
+        return None, False
+    upcoming = [d for d in deadlines if d >= now]
+    if upcoming:
+        return min(upcoming), False
+    return max(deadlines), True
+
+
+def refresh_interval(
+    deadline: Optional[datetime],
+    now: datetime,
+    tiers: Sequence[Tuple[timedelta, timedelta]] = DEFAULT_TIERS,
+    far_interval: timedelta = DEFAULT_FAR_INTERVAL,
+) -> timedelta:
+    if deadline is None:
+        return UNKNOWN_INTERVAL
+    remaining = deadline - now
+    for horizon, interval in tiers:
+        if remaining <= horizon:
+            return interval
+    return far_interval
+
+
+def backoff_interval(interval: timedelta, failures: int, cap: timedelta) -> timedelta:
+    """Interval after `failures` consecutive failed refreshes (doubles per failure, capped)"""
+    if failures <= 0:
+        return interval
+    return min(interval * (2 ** min(failures, 16)), max(cap, interval))
+
+
+class RefreshScheduler:
+    """Priority queue of collected announcements keyed by next refresh time"""
+
+    def __init__(
+        self,
+        service,
+        tiers: Sequence[Tuple[timedelta, timedelta]] = DEFAULT_TIERS,
+        far_interval: timedelta = DEFAULT_FAR_INTERVAL,
+        batch_size: int = 50,
+        deadline_poll_interval: timedelta = timedelta(minutes=30),
+        reload_interval: timedelta = timedelta(hours=6),
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            service: MongoDB 에 연결된 KamcoCollectorService
+            tiers: (마감까지 남은 시간, 갱신 주기) 목록, 가까운 순
+            far_interval: 모든 tier 보다 먼 항목의 갱신 주기
+            batch_size: 한 번에 갱신할 공고 수
+            deadline_poll_interval: getUnifyDeadlineCltrList 조회 주기
+            reload_interval: collected_items 전체 재적재 주기 (새로 수집된 항목 반영)
+            concurrency: 동시 상세 조회 공고 수
+        """
+        self.service = service
+        self.tiers = tiers
+        self.far_interval = far_interval
+        self.batch_size = batch_size
+        self.deadline_poll_interval = deadline_poll_interval
+        self.reload_interval = reload_interval
+        self.concurrency = concurrency
+
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._due: Dict[str, datetime] = {}
+        self._announces: Dict[str, Dict] = {}
+        self._divisions: Dict[str, Optional[str]] = {}
+        self._attempted: Dict[str, datetime] = {}
+        self._failures: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._last_poll: Optional[datetime] = None
+        self._last_reload: Optional[datetime] = None
+        self.stats = {"scheduled": 0, "refreshed": 0, "failed": 0, "dropped": 0, "boosted": 0, "deadline_calls": 0}
+
+    # ---- queue ------------------------------------------------------------
+
+    def _push(self, key: str, due: datetime) -> None:
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._seq), key))
+
+    def _drop(self, key: str) -> None:
+        self._due.pop(key, None)
+        self._announces.pop(key, None)
+        self._divisions.pop(key, None)
+        self._attempted.pop(key, None)
+        self._failures.pop(key, None)
+
+    def schedule(
+        self,
+        doc: Dict,
+        now: Optional[datetime] = None,
+        refreshed_at: Optional[datetime] = None,
+    ) -> Optional[datetime]:
+        """
+        (Re)schedule one collected_items document; closed items are dropped
+
+        Args:
+            refreshed_at: 마지막 갱신 시도 시각 (없으면 이전 시도 시각과 collected_at 중 늦은 쪽 기준)
+        """
+        now = now or datetime.now()
+        announce = doc.get("announce_list_item") or {"PLNM_NO": doc.get("PLNM_NO"), "PBCT_NO": doc.get("PBCT_NO")}
+        key = announce_key(announce)
+        deadline, closed = next_deadline(doc, now)
+        if closed:
+            if key in self._due or key in self._announces:
+                self.stats["dropped"] += 1
+            self._drop(key)
+            return None
+
+        if refreshed_at:
+            self._attempted[key] = refreshed_at
+        # Unchanged or failed refreshes leave collected_at as is; reloads must not make them due again
+        known = [t for t in (self._attempted.get(key), doc.get("collected_at")) if isinstance(t, datetime)]
+        base = refreshed_at or (max(known) if known else now)
+        interval = refresh_interval(deadline, now, self.tiers, self.far_interval)
+        due = base + backoff_interval(interval, self._failures.get(key, 0), self.far_interval)
+        self._announces[key] = announce
+        self._divisions[key] = doc.get("PRPT_DVSN_CD") or self._divisions.get(key)
+        self._push(key, due)
+        return due
+
+    def pop_due(self, now: datetime, limit: int) -> List[Dict]:
+        """Announcements whose refresh time has come, most overdue first"""
+        batch = []
+        while self._heap and len(batch) < limit:
+            due, _, key = self._heap[0]
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            if self._due.get(key) != due:
+                continue  # superseded by a later (re)schedule
+            del self._due[key]
+            batch.append(self._announces[key])
+        return batch
+
+    def next_due(self) -> Optional[datetime]:
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    # ---- sources ----------------------------------------------------------
+
+    def load(self, now: Optional[datetime] = None) -> int:
+        """
+        Schedule every document in collected_items
+
+        Failure counts and attempt times survive a reload, so refreshed items
+        are not due again at once and failing items stay backed off; entries
+        of items no longer stored are dropped.
+        """
+        now = now or datetime.now()
+        self._heap.clear()
+        self._due.clear()
+        self._announces.clear()
+        for doc in self.service.collection.find({}, PROJECTION):
+            self.schedule(doc, now)
+        self._failures = {key: n for key, n in self._failures.items() if key in self._announces}
+        self._divisions = {key: d for key, d in self._divisions.items() if key in self._announces}
+        self._attempted = {key: t for key, t in self._attempted.items() if key in self._announces}
+        self._last_reload = now
+        self.stats["scheduled"] = len(self)
+        return len(self)
+
+    def fetch_deadline_keys(self, num_of_rows: int = 100, max_pages: int = 20) -> List[str]:
+        """PLNM_NO:PBCT_NO of items on getUnifyDeadlineCltrList (closing within 48h)"""
+        keys = []
+        page_no = 1
+        while page_no <= max_pages:
+            params = {"serviceKey": self.service.service_key, "numOfRows": num_of_rows, "pageNo": page_no}
+            try:
+                res = self.service.transport.call("ThingInfoInquireSvc", "getUnifyDeadlineCltrList", params)
+                res.raise_for_status()
+            except Exception as e:
+                print(f"마감임박 목록 조회 failed (page {page_no}): {e}")
+                break
+            self.stats["deadline_calls"] += 1
+
+            stream = OnbidXmlStream(res.content, item_tags=("item",))
+            if not stream.result_code.startswith("0"):
+                print(f"API error: resultCode={stream.result_code}, resultMsg={stream.result_msg}")
+                break
+            rows = 0
+            for item in stream:
+                rows += 1
+                if item.get("PLNM_NO") and item.get("PBCT_NO"):
+                    keys.append(announce_key(item))
+            total_pages = -(-(stream.total_count or 0) // num_of_rows)
+            if not rows or page_no >= total_pages:
+                break
+            page_no += 1
+        return keys
+
+    def boost_deadline_items(self, now: Optional[datetime] = None) -> int:
+        """Make known items from the 48h deadline feed due immediately"""
+        now = now or datetime.now()
+        boosted = 0
+        for key in self.fetch_deadline_keys():
+            if key in self._announces and self._due.get(key, now) > now:
+                self._push(key, now)
+                boosted += 1
+        self._last_poll = now
+        self.stats["boosted"] += boosted
+        return boosted
+
+    # ---- refresh loop -----------------------------------------------------
+
+    def refresh_due(self, now: Optional[datetime] = None) -> int:
+        """
+        Refresh one batch of due items and reschedule them from the new data
+
+        Items are rescheduled from the attempt time, never from collected_at,
+        so every refreshed item is due strictly after `now`.
+        """
+        now = now or datetime.now()
+        batch = self.pop_due(now, self.batch_size)
+        if not batch:
+            return 0
+
+        by_division: Dict[Optional[str], List[Dict]] = {}
+        for announce in batch:
+            by_division.setdefault(self._divisions.get(announce_key(announce)), []).append(announce)
+        completed = []
+        for division, announces in by_division.items():
+            completed.extend(self.service.refresh_announces(announces, division, self.concurrency) or [])
+        attempted = now
+        succeeded = {announce_key(a) for a in completed}
+        for announce in batch:
+            key = announce_key(announce)
+            if key in succeeded:
+                self._failures.pop(key, None)
+            else:
+                self._failures[key] = self._failures.get(key, 0) + 1
+        self.stats["refreshed"] += len(succeeded)
+        self.stats["failed"] += len(batch) - len(succeeded)
+
+        query = {"$or": [{"PLNM_NO": a.get("PLNM_NO"), "PBCT_NO": a.get("PBCT_NO")} for a in batch]}
+        seen = set()
+        for doc in self.service.collection.find(query, PROJECTION):
+            self.schedule(doc, attempted, refreshed_at=attempted)
+            seen.add(announce_key(doc.get("announce_list_item") or doc))
+        # Never stored (first fetch failed): keep the list item and back off
+        for announce in batch:
+            if announce_key(announce) not in seen:
+                self.schedule({"announce_list_item": announce}, attempted, refreshed_at=attempted)
+        return len(batch)
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """Poll/reload when due, then refresh everything currently due"""
+        now = now or datetime.now()
+        if self._last_reload is None or now - self._last_reload >= self.reload_interval:
+            self.load(now)
+        if self._last_poll is None or now - self._last_poll >= self.deadline_poll_interval:
+            self.boost_deadline_items(now)
+        total = 0
+        while True:
+            refreshed = self.refresh_due(now)
+            if not refreshed:
+                return total
+            total += refreshed
+
+    def run_forever(self, stop: Optional[threading.Event] = None, max_sleep: float = 300.0) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            refreshed = self.run_once()
+            next_due = self.next_due()
+            upcoming = f"다음 갱신 {next_due:%m-%d %H:%M}" if next_due else "대기열 비어 있음"
+            print(f"[{datetime.now():%H:%M:%S}] 갱신 {refreshed}건, 대기열 {len(self)}건, {upcoming}")
+            wait = max_sleep if next_due is None else (next_due - datetime.now()).total_seconds()
+            stop.wait(min(max(wait, 1.0), max_sleep))
+
+
+def main():
+    import argparse
+
+    from services.kamco_collector_service import KamcoCollectorService
+
+    parser = argparse.ArgumentParser(description="마감일 기반 KAMCO 공고 갱신 스케줄러")
+    parser.add_argument("--once", action="store_true", help="현재 갱신 대상만 처리하고 종료")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, help="동시 상세 조회 공고 수")
+    parser.add_argument("--deadline-poll-minutes", type=float, default=30, help="마감임박 목록 조회 주기(분)")
+    parser.add_argument("--reload-hours", type=float, default=6, help="collected_items 재적재 주기(시간)")
+    args = parser.parse_args()
+
+    service = KamcoCollectorService()
+    if not service._ensure_mongodb():
+        return
+
+    scheduler = RefreshScheduler(
+        service,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        deadline_poll_interval=timedelta(minutes=args.deadline_poll_minutes),
+        reload_interval=timedelta(hours=args.reload_hours),
+    )
+    try:
+        if args.once:
+            scheduler.run_once()
+        else:
+            scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Scheduler stats: {scheduler.stats}")
+        service.close_mongodb()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Content-addressed on-disk cache of raw onbid responses
+
+Entries are keyed by operation plus the normalized request parameters
+(serviceKey stripped, values stringified, keys sorted) and stored as
+zstd-compressed bodies under <cache_dir>/<operation>/<key[:2]>/<key>.zst.
+The file mtime is the fetch time, so per-endpoint TTLs need no sidecar.
+
+Modes:
+- off:       no caching
+- readwrite: serve fresh entries, fetch and store misses (default when enabled)
+- record:    always fetch, store every successful response
+- replay:    serve any stored entry regardless of age; a miss raises
+             CacheMissError instead of touching the network
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from exceptions import KamcoApiError
+
+try:
+    import zstandard as zstd
+except ImportError:  # zlib fallback keeps the cache usable without zstandard
+    zstd = None
+
+MODES = ("off", "readwrite", "record", "replay")
+
+# seconds; list pages change during the day, attachments almost never
+DEFAULT_TTLS: Dict[str, int] = {
+    "getKamcoPlnmPbctList": 60 * 60,
+    "getKamcoPlnmPbctBasicInfoDetail": 6 * 60 * 60,
+    "getKamcoPlnmPbctBidDateInfoDetail": 6 * 60 * 60,
+    "getKamcoPlnmPbctFileInfoDetail": 7 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 24 * 60 * 60
+
+SECRET_PARAMS = {"servicekey"}
+
+
+class CacheMissError(KamcoApiError):
+    """Raised in replay mode when a response is not in the cache."""
+    pass
+
+
+def cache_key(operation: str, params: Optional[Dict[str, Any]]) -> str:
+    """sha256 of operation + normalized params (serviceKey removed)"""
+    normalized = {
+        str(k): str(v)
+        for k, v in (params or {}).items()
+        if str(k).lower() not in SECRET_PARAMS and v is not None
+    }
+    raw = json.dumps([operation, normalized], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk store for raw response bodies"""
+
+    def __init__(
+        self,
+        cache_dir: str = ".cache/onbid",
+        mode: str = "readwrite",
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = DEFAULT_TTL,
+        level: int = 3,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode: {mode} (expected one of {MODES})")
+        self.root = Path(cache_dir)
+        self.mode = mode
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.suffix = ".zst" if zstd else ".zz"
+        self._level = level
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    @classmethod
+    def from_env(cls, mode: Optional[str] = None) -> Optional["ResponseCache"]:
+        """Build from KAMCO_CACHE_MODE / KAMCO_CACHE_DIR; None when off"""
+        mode = mode or os.getenv("KAMCO_CACHE_MODE", "off")
+        if mode == "off":
+            return None
+        return cls(cache_dir=os.getenv("KAMCO_CACHE_DIR", ".cache/onbid"), mode=mode)
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, operation: str, key: str) -> Path:
+        return self.root / operation / key[:2] / f"{key}{self.suffix}"
+
+    def _compress(self, body: bytes) -> bytes:
+        if zstd:
+            return zstd.ZstdCompressor(level=self._level).compress(body)
+        return zlib.compress(body, self._level)
+
+    def _decompress(self, blob: bytes) -> bytes:
+        if zstd:
+            return zstd.ZstdDecompressor().decompress(blob)
+        return zlib.decompress(blob)
+
+    def ttl_for(self, operation: str) -> int:
+        return self.ttls.get(operation, self.default_ttl)
+
+    def get(self, operation: str, params: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        """Cached body, or None on a miss / expired entry (replay ignores TTL)"""
+        if self.mode == "record":
+            return None
+        key = cache_key(operation, params)
+        path = self._path(operation, key)
+        try:
+            stored_at = path.stat().st_mtime
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            if self.replay:
+                raise CacheMissError(f"Not in cache: {operation} ({key[:12]})")
+            return None
+
+        if not self.replay and time.time() - stored_at > self.ttl_for(operation):
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return self._decompress(path.read_bytes())
+
+    def put(self, operation: str, params: Optional[Dict[str, Any]], body: bytes) -> None:
+        """Store a body atomically (write to a temp file, then rename)"""
+        if self.replay:
+            return
+        path = self._path(operation, cache_key(operation, params))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._compress(body))
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.stats["stores"] += 1
+
+    def iter_bodies(self, operation: str) -> Iterator[Tuple[Path, bytes]]:
+        """All stored bodies for an operation (offline benchmarks / re-normalization)"""
+        for path in sorted((self.root / operation).glob(f"*/*{self.suffix}")):
+            yield path, self._decompress(path.read_bytes())
@@ -0,0 +1,287 @@
+"""
+Shared collection work queue with leases, stored in MongoDB
+
+Several collector workers (different hosts, API keys and rate budgets)
+drain one sweep together through collect_tasks:
+
+    {
+        "_id": "<sweep_id>:page:3" | "<sweep_id>:announce:<PLNM_NO>:<PBCT_NO>",
+        "sweep_id", "kind": "page" | "announce", "payload": {...},
+        "status": "queued" | "leased" | "done" | "failed",
+        "lease_owner", "lease_expires_at", "attempts", "error",
+        "created_at", "updated_at", "done_at"
+    }
+
+- enqueue is an idempotent upsert, so re-seeding a sweep never duplicates work
+- claim atomically leases queued tasks, and steals leased tasks whose lease
+  expired (the worker died or stalled); a task whose lease expired
+  max_attempts times (it keeps crashing its worker) is marked failed
+  instead of being retried forever
+- heartbeats extend leases of tasks still being worked on; complete/fail
+  only succeed for the current lease owner, so a worker whose task was
+  stolen cannot overwrite the new owner's result
+- lease expiry is computed and compared on the server ($$NOW in update
+  pipelines and $expr filters), so workers with skewed clocks or different
+  time zones never steal live leases or keep dead ones
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.database import Database
+
+log = logging.getLogger(__name__)
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# Server clock; only valid in $expr filters and update pipelines
+NOW = "$$NOW"
+LEASE_EXPIRED = {"$expr": {"$lt": ["$lease_expires_at", NOW]}}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class WorkQueue:
+    """Lease-based task queue shared by collector workers"""
+
+    def __init__(
+        self,
+        db: Database,
+        collection_name: str = "collect_tasks",
+        lease_seconds: float = 120.0,
+        max_attempts: int = 3,
+        worker_id: Optional[str] = None,
+    ):
+        self.collection = db[collection_name]
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or default_worker_id()
+        self.collection.create_index(
+            [("sweep_id", ASCENDING), ("kind", ASCENDING), ("status", ASCENDING), ("lease_expires_at", ASCENDING)],
+            name="sweep_kind_status_lease",
+        )
+
+    @staticmethod
+    def task_id(sweep_id: str, kind: str, key) -> str:
+        return f"{sweep_id}:{kind}:{key}"
+
+    def _lease_until(self) -> Dict:
+        """Server-side lease expiry: $$NOW + lease_seconds"""
+        return {"$add": [NOW, int(self.lease_seconds * 1000)]}
+
+    def _claimable(self, sweep_id: str, kind: str) -> Dict:
+        return {
+            "sweep_id": sweep_id,
+            "kind": kind,
+            "$or": [
+                {"status": QUEUED},
+                {"status": LEASED, "attempts": {"$lt": self.max_attempts}, **LEASE_EXPIRED},
+            ],
+        }
+
+    @staticmethod
+    def _release(status: str, **fields) -> List[Dict]:
+        """Update pipeline ending a lease with the given status"""
+        return [
+            {"$set": {"status": status, **fields, "updated_at": NOW}},
+            {"$unset": ["lease_expires_at", "claim"]},
+        ]
+
+    def _fail_abandoned(self, sweep_id: str, kind: str) -> int:
+        """Mark expired leases that already used every attempt as failed"""
+        result = self.collection.update_many(
+            {
+                "sweep_id": sweep_id,
+                "kind": kind,
+                "status": LEASED,
+                "attempts": {"$gte": self.max_attempts},
+                **LEASE_EXPIRED,
+            },
+            self._release(FAILED, error="lease expired"),
+        )
+        if result.modified_count:
+            log.warning("%s: %s %s tasks failed after %s expired leases", sweep_id, result.modified_count, kind, self.max_attempts)
+        return result.modified_count
+
+    # ---- producers --------------------------------------------------------
+
+    def enqueue_many(
+        self,
+        sweep_id: str,
+        kind: str,
+        payloads: Iterable[Dict],
+        key: Callable[[Dict], object],
+        status: str = QUEUED,
+    ) -> int:
+        """Add tasks unless they already exist; returns the number of new tasks"""
+        now = datetime.now(timezone.utc)
+        ops = [
+            UpdateOne(
+                {"_id": self.task_id(sweep_id, kind, key(payload))},
+                {
+                    "$setOnInsert": {
+                        "sweep_id": sweep_id,
+                        "kind": kind,
+                        "payload": payload,
+                        "status": status,
+                        "attempts": 0,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                },
+                upsert=True,
+            )
+            for payload in payloads
+        ]
+        if not ops:
+            return 0
+        result = self.collection.bulk_write(ops, ordered=False)
+        return result.upserted_count
+
+    # ---- consumers --------------------------------------------------------
+
+    def claim_many(self, sweep_id: str, kind: str, limit: int = 1) -> List[Dict]:
+        """
+        Lease up to `limit` tasks (queued, or leased with an expired lease and
+        attempts left)
+
+        Candidates are picked first, then leased with a filter that re-checks
+        claimability, so two workers racing for the same task cannot both win.
+        """
+        self._fail_abandoned(sweep_id, kind)
+        candidates = [
+            doc["_id"]
+            for doc in self.collection.find(self._claimable(sweep_id, kind), {"_id": 1}).limit(limit)
+        ]
+        if not candidates:
+            return []
+
+        claim = uuid.uuid4().hex
+        query = self._claimable(sweep_id, kind)
+        query["_id"] = {"$in": candidates}
+        self.collection.update_many(
+            query,
+            [
+                {
+                    "$set": {
+                        "status": LEASED,
+                        "lease_owner": self.worker_id,
+                        "lease_expires_at": self._lease_until(),
+                        "claim": claim,
+                        "attempts": {"$add": [{"$ifNull": ["$attempts", 0]}, 1]},
+                        "updated_at": NOW,
+                    }
+                }
+            ],
+        )
+        return list(self.collection.find({"_id": {"$in": candidates}, "claim": claim}))
+
+    def claim(self, sweep_id: str, kind: str) -> Optional[Dict]:
+        tasks = self.claim_many(sweep_id, kind, 1)
+        return tasks[0] if tasks else None
+
+    def heartbeat(self, task_ids: Iterable[str]) -> int:
+        """Extend leases this worker still holds; returns how many were extended"""
+        ids = list(task_ids)
+        if not ids:
+            return 0
+        result = self.collection.update_many(
+            {"_id": {"$in": ids}, "status": LEASED, "lease_owner": self.worker_id},
+            [{"$set": {"lease_expires_at": self._lease_until(), "updated_at": NOW}}],
+        )
+        if result.modified_count < len(ids):
+            log.warning("%s: lost %s of %s leases", self.worker_id, len(ids) - result.modified_count, len(ids))
+        return result.modified_count
+
+    def complete_many(self, task_ids: Iterable[str]) -> int:
+        ids = list(task_ids)
+        if not ids:
+            return 0
+        result = self.collection.update_many(
+            {"_id": {"$in": ids}, "status": LEASED, "lease_owner": self.worker_id},
+            self._release(DONE, done_at=NOW),
+        )
+        return result.modified_count
+
+    def fail_many(self, task_ids: Iterable[str], error: str) -> int:
+        """Release tasks for another attempt, or mark them failed after max_attempts"""
+        ids = list(task_ids)
+        if not ids:
+            return 0
+        owned = {"_id": {"$in": ids}, "status": LEASED, "lease_owner": self.worker_id}
+        self.collection.update_many(
+            {**owned, "attempts": {"$gte": self.max_attempts}},
+            self._release(FAILED, error={"$literal": error}),
+        )
+        result = self.collection.update_many(owned, self._release(QUEUED, error={"$literal": error}))
+        return result.modified_count
+
+    # ---- progress ---------------------------------------------------------
+
+    def counts(self, sweep_id: str) -> Dict[str, Dict[str, int]]:
+        """{kind: {status: n}}"""
+        out: Dict[str, Dict[str, int]] = {}
+        pipeline = [
+            {"$match": {"sweep_id": sweep_id}},
+            {"$group": {"_id": {"kind": "$kind", "status": "$status"}, "n": {"$sum": 1}}},
+        ]
+        for row in self.collection.aggregate(pipeline):
+            out.setdefault(row["_id"]["kind"], {})[row["_id"]["status"]] = row["n"]
+        return out
+
+    def has_tasks(self, sweep_id: str) -> bool:
+        return self.collection.find_one({"sweep_id": sweep_id}, {"_id": 1}) is not None
+
+    def is_drained(self, sweep_id: str) -> bool:
+        """True when nothing is queued or leased (done/failed only)"""
+        return self.collection.find_one(
+            {"sweep_id": sweep_id, "status": {"$in": [QUEUED, LEASED]}}, {"_id": 1}
+        ) is None
+
+
+class LeaseKeeper:
+    """Background thread that heartbeats the tasks a worker currently holds"""
+
+    def __init__(self, queue: WorkQueue, interval: Optional[float] = None):
+        self.queue = queue
+        self.interval = interval or max(1.0, queue.lease_seconds / 3)
+        self._held: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+
+    def hold(self, task_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._held.update(task_ids)
+
+    def release(self, task_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._held.difference_update(task_ids)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                held = list(self._held)
+            try:
+                self.queue.heartbeat(held)
+            except Exception as e:
+                log.warning("heartbeat failed: %s", e)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,226 @@
+"""
+Offline Collector Check
+Run KamcoCollectorService against scripts/mock_onbid_server.py (no API key,
+no MongoDB) and check the collection building blocks: token bucket, AIMD
+limiter, PageCheckpointer, BulkUpsertWriter, OnbidXmlStream and transport
+retries.
+"""
+import sys
+import os
+import threading
+import time
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from scripts.mock_onbid_server import start_mock_server
+from services.adaptive import AdaptiveLimiter
+from services.collection_state import PageCheckpointer
+from services.kamco_collector_service import KamcoCollectorService
+from services.mongo_writer import BulkUpsertWriter
+from services.onbid_transport import OnbidTransport, extract_result_code
+from services.onbid_xml import OnbidXmlStream
+from services.rate_limiter import RateLimiter
+
+
+class SlowCollection:
+    """bulk_write that takes `delay` seconds and raises ConnectionError while `down`"""
+
+    name = "fake"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.down = False
+        self.written = 0
+
+    def bulk_write(self, ops, ordered=False):
+        time.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("connection reset")
+        self.written += len(ops)
+        return type("Result", (), {"bulk_api_result": {"nUpserted": len(ops), "nMatched": 0, "nModified": 0}})()
+
+
+class FailingWriter:
+    """BulkUpsertWriter stand-in whose flush reports errors for the given flush calls"""
+
+    def __init__(self, failing_flushes=()):
+        self.failing_flushes = set(failing_flushes)
+        self.flushes = 0
+        self.pending = 0
+        self.docs = []
+        self.stats = {"inserted": 0, "modified": 0, "unchanged": 0, "errors": 0}
+
+    def add(self, doc):
+        self.docs.append(doc)
+        self.pending += 1
+
+    def flush(self):
+        self.flushes += 1
+        if self.flushes in self.failing_flushes:
+            self.stats["errors"] += 1
+        else:
+            self.stats["inserted"] += self.pending
+        self.pending = 0
+        return dict(self.stats)
+
+
+class MemoryState:
+    """CollectionState stand-in recording checkpoints and completion"""
+
+    def __init__(self):
+        self.checkpoints = []
+        self.completed = False
+
+    def resume_page(self, prpt_dvsn_cd, num_of_rows):
+        return 1
+
+    def start_sweep(self, prpt_dvsn_cd, num_of_rows, start_page):
+        pass
+
+    def filter_changed(self, items):
+        return items
+
+    def mark_collected(self, items, prpt_dvsn_cd=None):
+        return len(items)
+
+    def checkpoint(self, prpt_dvsn_cd, page_no):
+        self.checkpoints.append(page_no)
+
+    def complete_sweep(self, prpt_dvsn_cd, stats=None):
+        self.completed = True
+
+
+def check(condition, message):
+    if not condition:
+        print(f"❌ {message}")
+        sys.exit(1)
+    print(f"✅ {message}")
+
+
+def check_building_blocks():
+    print(">>> Checking rate limiter / AIMD limiter / checkpointer...")
+    limiter = RateLimiter(20, burst=5)
+    t0 = time.monotonic()
+    for _ in range(15):
+        limiter.acquire()
+    elapsed = time.monotonic() - t0
+    check(0.4 <= elapsed < 1.5, f"token bucket: 5 burst + 10 at 20/s took {elapsed:.2f}s")
+
+    aimd = AdaptiveLimiter(initial=4, max_limit=8, cooldown=0)
+    for _ in range(8):
+        aimd.acquire()
+        aimd.release("op", 0.01, ok=True)
+    check(aimd.limit > 4, f"AIMD grows on healthy responses ({aimd.limit:.2f})")
+    before = aimd.limit
+    aimd.acquire()
+    aimd.release("op", None, ok=False)
+    check(abs(aimd.limit - max(1, before * 0.5)) < 1e-9, f"AIMD halves on failure ({before:.2f} -> {aimd.limit:.2f})")
+
+    checkpointer = PageCheckpointer(start_page=1)
+    marks = [checkpointer.done(page) for page in (2, 3, 1, 5, 4)]
+    check(marks == [None, None, 3, None, 5], f"checkpointer high-water marks {marks}")
+
+    print(">>> Checking the bulk upsert writer...")
+    collection = SlowCollection(delay=0.3)
+    writer = BulkUpsertWriter(collection, batch_size=100, flush_interval=60, ensure_index=False)
+    writer.add({"PLNM_NO": "1", "PBCT_NO": "1"})
+    flusher = threading.Thread(target=writer.flush)
+    flusher.start()
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    writer.add({"PLNM_NO": "2", "PBCT_NO": "1"})
+    blocked = time.monotonic() - t0
+    flusher.join()
+    check(blocked < 0.1 and writer.pending == 1, f"add() does not wait for an in-flight bulk_write ({blocked:.3f}s)")
+
+    collection.delay, collection.down = 0, True
+    try:
+        writer.flush()
+        raised = False
+    except ConnectionError:
+        raised = True
+    check(raised and writer.pending == 1, "failed bulk_write is raised and its batch re-queued")
+    collection.down = False
+    stats = writer.flush()
+    check(writer.pending == 0 and collection.written == 2 and stats["inserted"] == 2, f"re-queued batch written on the next flush ({stats})")
+
+
+def check_against_mock():
+    print(">>> Starting mock onbid server...")
+    server = start_mock_server(total_count=45, latency_ms=2, jitter_ms=1, seed=7)
+    try:
+        transport = OnbidTransport(base_url=server.base_url, backoff_base=0.01)
+        res = transport.call("KamcoPblsalThingInquireSvc", "getKamcoPlnmPbctList", {"pageNo": 2, "numOfRows": 10})
+        stream = OnbidXmlStream(res.content, item_tags=("item",))
+        items = list(stream)
+        check(extract_result_code(res.content) == "00", "list page resultCode 00")
+        check(len(items) == 10 and stream.total_count == 45, f"OnbidXmlStream: {len(items)} items, totalCount {stream.total_count}")
+        check(items[0]["PLNM_NO"] == "202500011", f"page 2 starts at item 11 ({items[0]['PLNM_NO']})")
+
+        print(">>> Checking the page fetch window with a slow consumer...")
+        service = KamcoCollectorService(service_key="offline", requests_per_second=0, transport=transport)
+        fetched = []
+        fetch_page = service.fetch_announce_page
+
+        def record_fetch(page_no, *args, **kwargs):
+            page = fetch_page(page_no, *args, **kwargs)
+            fetched.append(page_no)
+            return page
+
+        service.fetch_announce_page = record_fetch
+        ahead = 0
+        for consumed, (page_no, page_items) in enumerate(service.iter_announce_pages(num_of_rows=3, page_workers=2), 1):
+            time.sleep(0.1)  # consumer much slower than a page fetch
+            ahead = max(ahead, len(fetched) - consumed)
+        check(consumed == 15 and ahead <= 2 * 2, f"15 pages consumed, at most {ahead} fetched ahead (window 4)")
+
+        print(">>> Running full sweep against the mock (save_to_db=False)...")
+        service = KamcoCollectorService(service_key="offline", requests_per_second=0, transport=transport)
+        stats = service.run_full_sweep(num_of_rows=10, save_to_db=False, concurrency=4, max_pages=3)
+        check(stats["processed_announces"] == 30 and stats["failed_announces"] == 0,
+              f"3 pages x 10 announces collected ({stats['processed_announces']} ok, {stats['failed_announces']} failed)")
+
+        print(">>> Running an incremental sweep whose second save fails...")
+        service = KamcoCollectorService(service_key="offline", requests_per_second=0, transport=transport)
+        service.collection, service.writer, service.state = object(), FailingWriter(failing_flushes={2}), MemoryState()
+        stats = service.run_full_sweep(num_of_rows=15, save_to_db=True, concurrency=4, page_workers=1, incremental=True)
+        check(stats["failed_pages"] == 1, f"unsaved page counted as failed ({stats['failed_pages']})")
+        check(service.state.checkpoints == [1], f"checkpoint stops before the unsaved page {service.state.checkpoints}")
+        check(not service.state.completed, "sweep with a save failure is not marked complete")
+
+        print(">>> Refreshing a stored announcement...")
+        stale = {"PLNM_NO": "202500007", "PBCT_NO": "9000007", "PBCT_CLS_DTM": "20240101000000"}
+        service = KamcoCollectorService(service_key="offline", requests_per_second=0, transport=transport)
+        service.collection, service.writer = object(), FailingWriter()
+        completed = service.refresh_announces([stale], prpt_dvsn_cd="0001")
+        saved = service.writer.docs[0] if service.writer.docs else {}
+        check(completed is not None and len(completed) == 1, "refresh_announces completes the announcement")
+        check(saved.get("announce_list_item", {}).get("PBCT_CLS_DTM") == "20250110170000",
+              f"list row re-read by PLNM_NO ({saved.get('announce_list_item', {}).get('PBCT_CLS_DTM')})")
+        check(saved.get("PRPT_DVSN_CD") == "0001", "division stored with the document")
+        transport.close()
+    finally:
+        server.shutdown()
+
+    print(">>> Running with injected 500s and throttling...")
+    server = start_mock_server(total_count=20, latency_ms=2, jitter_ms=1, error_rate=0.1, throttle_rate=0.1, seed=11)
+    try:
+        transport = OnbidTransport(base_url=server.base_url, max_retries=6, backoff_base=0.01, backoff_max=0.05)
+        service = KamcoCollectorService(service_key="offline", requests_per_second=0, transport=transport)
+        stats = service.run_full_sweep(num_of_rows=10, save_to_db=False, concurrency=4)
+        injected = server.mock.stats["_injected_errors"] + server.mock.stats["_injected_throttles"]
+        check(injected > 0, f"mock injected {injected} faults")
+        check(stats["processed_announces"] == 20, f"retries recovered every announce ({stats['processed_announces']}/20)")
+        transport.close()
+    finally:
+        server.shutdown()
+
+
+def run_check():
+    check_building_blocks()
+    check_against_mock()
+
+
+if __name__ == "__main__":
+    run_check()
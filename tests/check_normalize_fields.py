@@ -0,0 +1,58 @@
+"""
+Normalizer Field Check
+Typed field parsing of normalize/kamco_normalizer.py (prices, dates,
+addresses), without touching MongoDB.
+"""
+import sys
+import os
+from datetime import datetime
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from normalize.kamco_normalizer import parse_datetime, parse_price, split_address
+
+
+def check(condition, message):
+    if not condition:
+        print(f"❌ {message}")
+        sys.exit(1)
+    print(f"✅ {message}")
+
+
+def run_check():
+    print(">>> Checking price parsing...")
+    for value, expected in [
+        ("350,000,000", 350000000),
+        ("350000000원", 350000000),
+        (350000000.0, 350000000),
+        ("1,234.56", 1234),
+        ("", None),
+        (None, None),
+        (True, None),
+    ]:
+        check(parse_price(value) == expected, f"parse_price({value!r}) -> {expected!r}")
+
+    print(">>> Checking date parsing...")
+    for value, expected in [
+        ("20250110", datetime(2025, 1, 10)),
+        ("2025-01-10 17:00", datetime(2025, 1, 10, 17, 0)),
+        ("20250110170000", datetime(2025, 1, 10, 17, 0, 0)),
+        ("2025011", None),
+        ("20251340", None),
+    ]:
+        check(parse_datetime(value) == expected, f"parse_datetime({value!r}) -> {expected!r}")
+
+    print(">>> Checking address splitting...")
+    for value, expected in [
+        ("서울시 강남구 역삼동", ("서울특별시", "강남구")),
+        ("경기 성남시 분당구 정자동", ("경기도", "성남시 분당구")),
+        ("세종특별자치시 한솔동", ("세종특별자치시", None)),
+        ("강남구 역삼동", (None, None)),
+        (None, (None, None)),
+    ]:
+        check(split_address(value) == expected, f"split_address({value!r}) -> {expected!r}")
+
+
+if __name__ == "__main__":
+    run_check()
@@ -0,0 +1,107 @@
+"""
+Refresh Scheduler Check
+Deadline tiers, failure backoff, reloads and run_once termination of
+services/refresh_scheduler.py, without MongoDB or the onbid API.
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from services.refresh_scheduler import RefreshScheduler, backoff_interval, next_deadline, refresh_interval
+
+NOW = datetime(2026, 3, 2, 9, 0)
+
+
+class FakeCollection:
+    """find() over in-memory collected_items documents ($or of PLNM_NO/PBCT_NO only)"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query=None, projection=None):
+        wanted = [(q["PLNM_NO"], q["PBCT_NO"]) for q in (query or {}).get("$or", [])]
+        return [d for d in self.docs if not wanted or (d["PLNM_NO"], d["PBCT_NO"]) in wanted]
+
+
+class FakeService:
+    """Refreshes leave collected_at unchanged, like an unchanged bulk upsert"""
+
+    def __init__(self, docs, failing=()):
+        self.collection = FakeCollection(docs)
+        self.failing = set(failing)
+        self.calls = {}
+        self.divisions = {}
+
+    def refresh_announces(self, announces, prpt_dvsn_cd=None, concurrency=None, label="refresh "):
+        for a in announces:
+            self.calls[a["PLNM_NO"]] = self.calls.get(a["PLNM_NO"], 0) + 1
+            self.divisions[a["PLNM_NO"]] = prpt_dvsn_cd
+        return [a for a in announces if a["PLNM_NO"] not in self.failing]
+
+
+def make_doc(plnm_no, closes_in, collected_ago=timedelta(days=10), division="0001"):
+    item = {"PLNM_NO": plnm_no, "PBCT_NO": "1", "PBCT_CLS_DTM": f"{NOW + closes_in:%Y%m%d%H%M}"}
+    return {
+        "PLNM_NO": plnm_no,
+        "PBCT_NO": "1",
+        "PRPT_DVSN_CD": division,
+        "announce_list_item": item,
+        "collected_at": NOW - collected_ago,
+    }
+
+
+def check(condition, message):
+    if not condition:
+        print(f"❌ {message}")
+        sys.exit(1)
+    print(f"✅ {message}")
+
+
+def run_check():
+    print(">>> Checking refresh tiers...")
+    check(refresh_interval(NOW + timedelta(hours=12), NOW) == timedelta(minutes=30), "closes within 48h -> 30 min")
+    check(refresh_interval(NOW + timedelta(days=3), NOW) == timedelta(hours=6), "closes within 7 days -> 6 h")
+    check(refresh_interval(NOW + timedelta(days=20), NOW) == timedelta(hours=24), "closes within 30 days -> 24 h")
+    check(refresh_interval(NOW + timedelta(days=90), NOW) == timedelta(hours=72), "later -> 72 h")
+    check(next_deadline(make_doc("A", -timedelta(days=1)), NOW)[1], "past deadline is closed")
+    check(
+        [backoff_interval(timedelta(minutes=30), n, timedelta(hours=72)) for n in range(4)]
+        == [timedelta(minutes=30), timedelta(hours=1), timedelta(hours=2), timedelta(hours=4)],
+        "failure backoff doubles per failure",
+    )
+    check(backoff_interval(timedelta(hours=6), 10, timedelta(hours=72)) == timedelta(hours=72), "backoff is capped")
+
+    print(">>> Checking run_once termination...")
+    docs = [
+        make_doc("NEAR", timedelta(hours=12)),
+        make_doc("FAR", timedelta(days=90), division="0002"),
+        make_doc("FAIL", timedelta(hours=6)),
+    ]
+    service = FakeService(docs, failing={"FAIL"})
+    scheduler = RefreshScheduler(service, batch_size=2, deadline_poll_interval=timedelta(days=365))
+    scheduler.load(NOW)
+    scheduler._last_poll = NOW  # no deadline feed without the API
+
+    scheduler.run_once(NOW)
+    check(all(n == 1 for n in service.calls.values()) and len(service.calls) == 3, f"each due item refreshed once: {service.calls}")
+    check(scheduler.next_due() > NOW, "nothing is due again right after run_once")
+    check(scheduler._due["NEAR:1"] >= NOW + timedelta(minutes=30), "refreshed item rescheduled from the attempt time")
+    check(scheduler._due["FAIL:1"] >= NOW + timedelta(hours=1), "failed item backs off")
+
+    scheduler.run_once(NOW + timedelta(hours=1))
+    check(service.calls == {"NEAR": 2, "FAR": 1, "FAIL": 2}, f"second pass refreshes only due items: {service.calls}")
+    check(scheduler._failures.get("FAIL:1") == 2, "consecutive failures are counted")
+    check(service.divisions == {"NEAR": "0001", "FAR": "0002", "FAIL": "0001"}, f"refreshed in each item's division: {service.divisions}")
+
+    print(">>> Checking reload...")
+    scheduler.load(NOW + timedelta(hours=2))
+    check(scheduler._failures.get("FAIL:1") == 2, "reload keeps failure counts")
+    check(scheduler._due["FAIL:1"] > NOW + timedelta(hours=2), "failed item stays backed off after reload")
+    check(scheduler._due["NEAR:1"] > NOW + timedelta(hours=1), "refreshed item is not due again after reload")
+
+
+if __name__ == "__main__":
+    run_check()
@@ -47,8 +47,9 @@ def run_step2():
     # Run Full Normalization on DB
     try:
         print(">>> Running full DB normalization...")
-        count = normalize()
-        print(f"✅ Normalized {count} items in total.")
+        counts = normalize(incremental=False)
+        print(f"✅ Normalized {counts['scanned']} items in total "
+              f"({counts['inserted']} inserted, {counts['updated']} updated, {counts['skipped']} unchanged).")
     except Exception as e:
         print(f"❌ Full Normalization Failed: {e}")
         sys.exit(1)
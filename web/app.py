@@ -9,12 +9,17 @@ Environment Variables (.env):
   MONGO_URI - MongoDB connection URI (default: mongodb://localhost:27017)
   FLASK_SECRET_KEY - Flask secret key
   FLASK_PORT - Flask port (default: 5000)
+  COLLECT_LATEST_MAX_PAGES - page bound of the 'latest' collect mode (default: 5)
+  COLLECT_JOB_TTL_HOURS - how long finished collect jobs stay queryable (default: 24)
+  COLLECT_JOBS_MAX - finished collect jobs kept at most (default: 20)
 """
 
 import os
 import sys
+import threading
+import uuid
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import Flask, render_template, request, jsonify, redirect, url_for
 from dotenv import load_dotenv
 from pymongo import MongoClient, DESCENDING
@@ -24,6 +29,7 @@ from bson.objectid import ObjectId
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from services.enrichment import DEFAULT_SECTIONS, SECTIONS, ThingEnricher
 from services.kamco_collector_service import KamcoCollectorService
 from rag.query import smart_search, generate_answer
 
@@ -36,21 +42,32 @@ app.secret_key = os.getenv('FLASK_SECRET_KEY', os.urandom(24).hex())
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "kamco")
 MONGO_COLLECTION_NAME = os.getenv("MONGO_COLLECTION_NAME", "collected_items")
+# 'latest' 수집은 요청 안에서 동기 실행되므로 페이지 수를 제한한다
+COLLECT_LATEST_MAX_PAGES = int(os.getenv("COLLECT_LATEST_MAX_PAGES", "5"))
+# 끝난 백그라운드 수집 작업은 TTL 이 지나거나 개수를 넘으면 오래된 것부터 삭제
+COLLECT_JOB_TTL = timedelta(hours=float(os.getenv("COLLECT_JOB_TTL_HOURS", "24")))
+COLLECT_JOBS_MAX = int(os.getenv("COLLECT_JOBS_MAX", "20"))
 
 # MongoDB 클라이언트
 mongo_client = None
 db = None
 collection = None
+enricher = None
+
+# 백그라운드 수집 작업 (전체 재산구분): job_id -> {status, stats, message, started_at, finished_at}
+collect_jobs = {}
+collect_jobs_lock = threading.Lock()
 
 
 def init_mongodb():
     """MongoDB 연결 초기화"""
-    global mongo_client, db, collection
+    global mongo_client, db, collection, enricher
     try:
         mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
         mongo_client.admin.command('ping')
         db = mongo_client[MONGO_DB_NAME]
         collection = db[MONGO_COLLECTION_NAME]
+        enricher = ThingEnricher(db)
         return True
     except Exception as e:
         print(f"MongoDB 연결 실패: {e}")
@@ -90,75 +107,160 @@ def collect_page():
     return render_template('collect.html')
 
 
+def _new_collect_service():
+    return KamcoCollectorService(
+        db_name=MONGO_DB_NAME,
+        collection_name=MONGO_COLLECTION_NAME
+    )
+
+
+def _post_process(stats):
+    """Auto normalize & embed if data saved"""
+    if stats.get("saved_items", 0) > 0:
+        try:
+            from normalize.kamco_normalizer import normalize
+            from rag.embed import embed
+            
+            stats['normalized_count'] = normalize()
+            
+            try:
+                stats['embedded_count'] = embed()
+                stats['rag_ready'] = True
+            except Exception as e:
+                stats['rag_ready'] = False
+                stats['embed_error'] = str(e)
+        except Exception as e:
+            stats['process_error'] = str(e)
+    
+    msg = f'{stats.get("saved_items", 0)}개 수집 완료.'
+    if stats.get('rag_ready'):
+        msg += f' (임베딩 완료)'
+    return msg
+
+
+def _run_collect_job(job_id, num_of_rows, max_pages):
+    """전체 재산구분 수집 (백그라운드 스레드)"""
+    job = collect_jobs[job_id]
+    service = _new_collect_service()
+    try:
+        if not service.connect_mongodb():
+            raise RuntimeError('MongoDB 연결 실패')
+        stats = service.run_all_divisions(
+            num_of_rows=num_of_rows,
+            save_to_db=True,
+            max_pages=max_pages,
+            incremental=True,
+        ) or {"saved_items": 0}
+        job['message'] = _post_process(stats)
+        job['stats'] = stats
+        job['status'] = 'done'
+    except Exception as e:
+        job['message'] = f'수집 실패: {str(e)}'
+        job['status'] = 'failed'
+    finally:
+        service.close_mongodb()
+        job['finished_at'] = datetime.now().isoformat()
+
+
+def _prune_collect_jobs(now):
+    """Drop finished jobs past COLLECT_JOB_TTL, then the oldest beyond COLLECT_JOBS_MAX (caller holds the lock)"""
+    finished = sorted(
+        (job['finished_at'], job_id) for job_id, job in collect_jobs.items() if job['finished_at']
+    )
+    expired = [job_id for finished_at, job_id in finished if now - datetime.fromisoformat(finished_at) > COLLECT_JOB_TTL]
+    overflow = [job_id for _, job_id in finished[:max(0, len(finished) - COLLECT_JOBS_MAX)]]
+    for job_id in set(expired) | set(overflow):
+        del collect_jobs[job_id]
+
+
+def _start_collect_job(num_of_rows, max_pages):
+    """Start the all-divisions job unless one is already running; returns (job_id, started)"""
+    with collect_jobs_lock:
+        _prune_collect_jobs(datetime.now())
+        for job_id, job in collect_jobs.items():
+            if job['status'] == 'running':
+                return job_id, False
+        job_id = uuid.uuid4().hex[:12]
+        collect_jobs[job_id] = {
+            'status': 'running',
+            'stats': None,
+            'message': '전체 재산구분 수집 중',
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None,
+        }
+    thread = threading.Thread(
+        target=_run_collect_job,
+        args=(job_id, num_of_rows, max_pages),
+        name=f'collect-{job_id}',
+        daemon=True,
+    )
+    thread.start()
+    return job_id, True
+
+
 @app.route('/api/collect', methods=['POST'])
 def api_collect():
-    """데이터 수집 API"""
+    """데이터 수집 API ('all' 은 백그라운드 작업으로 실행, /api/collect/<job_id> 로 상태 조회)"""
+    service = None
     try:
         collect_mode = request.form.get('collect_mode', 'list')
+        prpt_dvsn_cd = request.form.get('prpt_dvsn_cd', '0001')
+        num_of_rows = int(request.form.get('num_of_rows', 50 if collect_mode == 'latest' else 10))
+        max_pages = int(request.form.get('max_pages', COLLECT_LATEST_MAX_PAGES))
         
-        service = KamcoCollectorService(
-            db_name=MONGO_DB_NAME,
-            collection_name=MONGO_COLLECTION_NAME
-        )
+        if prpt_dvsn_cd == 'all':
+            # 모든 재산구분 동시 수집 (재산구분별 체크포인트, 증분) - 요청 밖에서 실행
+            # 체크포인트로 이어서 진행하므로 페이지 제한 없이 전체를 돈다
+            job_id, started = _start_collect_job(num_of_rows, None)
+            message = '전체 재산구분 수집을 시작했습니다.' if started else '이미 진행 중인 전체 수집이 있습니다.'
+            return jsonify({'success': True, 'job_id': job_id, 'message': message}), 202
         
+        service = _new_collect_service()
         if not service.connect_mongodb():
             return jsonify({'success': False, 'message': 'MongoDB 연결 실패'}), 500
         
-        stats = {}
-        
         if collect_mode == 'latest':
-            days = int(request.form.get('days', 30))
-            num_of_rows = int(request.form.get('num_of_rows', 50))
-            prpt_dvsn_cd = request.form.get('prpt_dvsn_cd', '0001')
-            
-            stats = service.run(
+            # 최신 공고: 1페이지부터 max_pages 까지 신규/변경 공고만 상세 조회
+            stats = service.run_full_sweep(
                 num_of_rows=num_of_rows,
                 prpt_dvsn_cd=prpt_dvsn_cd,
                 save_to_db=True,
-                use_latest=True,
-                days=days
+                max_pages=max_pages,
+                incremental=True,
+                restart=True,
             )
         else:
             page_no = int(request.form.get('page_no', 1))
-            num_of_rows = int(request.form.get('num_of_rows', 10))
-            prpt_dvsn_cd = request.form.get('prpt_dvsn_cd', '0001')
             
             stats = service.run(
                 page_no=page_no,
                 num_of_rows=num_of_rows,
                 prpt_dvsn_cd=prpt_dvsn_cd,
                 save_to_db=True,
-                use_latest=False
             )
         
         if stats is None:
              stats = {"saved_items": 0}
-
-        # Auto Normalize & Embed if data saved
-        if stats.get("saved_items", 0) > 0:
-            try:
-                from normalize.kamco_normalizer import normalize
-                from rag.embed import embed
-                
-                stats['normalized_count'] = normalize()
-                
-                try:
-                    stats['embedded_count'] = embed()
-                    stats['rag_ready'] = True
-                except Exception as e:
-                    stats['rag_ready'] = False
-                    stats['embed_error'] = str(e)
-            except Exception as e:
-                stats['process_error'] = str(e)
         
-        msg = f'{stats.get("saved_items", 0)}개 수집 완료.'
-        if stats.get('rag_ready'):
-            msg += f' (임베딩 완료)'
-            
+        msg = _post_process(stats)
         return jsonify({'success': True, 'stats': stats, 'message': msg})
         
     except Exception as e:
         return jsonify({'success': False, 'message': f'수집 실패: {str(e)}'}), 500
+    finally:
+        if service is not None:
+            service.close_mongodb()
+
+
+@app.route('/api/collect/<job_id>')
+def api_collect_status(job_id):
+    """백그라운드 수집 작업 상태"""
+    with collect_jobs_lock:
+        _prune_collect_jobs(datetime.now())
+        job = collect_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify({'success': job['status'] != 'failed', 'job_id': job_id, **job})
 
 
 @app.route('/list')
@@ -230,22 +332,47 @@ def detail_page(item_id):
                     unique_files.append(file)
             item['file_info'] = unique_files
         
-        return render_template('detail.html', item=item)
+        # ThingInfo 부가 정보: 기본은 캐시만 표시, ?enrich=1 이면 누락/만료분 조회
+        enrichment = {}
+        if enricher is not None:
+            try:
+                enrichment = enricher.enrich(item, fetch=request.args.get('enrich') == '1')
+            except Exception as e:
+                print(f"부가 정보 조회 실패: {e}")
+        
+        return render_template(
+            'detail.html',
+            item=item,
+            enrichment=enrichment,
+            enrichment_sections=DEFAULT_SECTIONS,
+        )
         
     except Exception as e:
         return render_template('error.html', message=f"데이터 조회 실패: {e}")
 
 
+@app.route('/api/enrich/<item_id>')
+def api_enrich(item_id):
+    """ThingInfo 부가 정보 (감정평가, 임대차, 등기, 입찰이력 등) 조회"""
+    if collection is None or enricher is None:
+        return jsonify({'success': False, 'message': 'DB Disconnected'}), 500
+    try:
+        item = collection.find_one({"_id": ObjectId(item_id)})
+        if not item:
+            return jsonify({'success': False, 'message': 'Not found'}), 404
+        sections = [s for s in request.args.get('sections', '').split(',') if s in SECTIONS] or None
+        enrichment = enricher.enrich(item, sections, refresh=request.args.get('refresh') == '1')
+        return jsonify({'success': True, 'enrichment': enrichment})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
 @app.route('/api/index', methods=['POST'])
 def api_index():
     """데이터 정규화 및 인덱싱 API"""
     try:
         from normalize.kamco_normalizer import normalize
         from rag.embed import embed, setup_collection
-        from qdrant_client import QdrantClient
-        
-        QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
-        QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
         
         result = {'normalized': 0, 'embedded': 0, 'errors': []}
         
@@ -256,11 +383,8 @@ def api_index():
             return jsonify({'success': False, 'message': '정규화 실패', 'result': result}), 500
         
         try:
-            qclient = QdrantClient(QDRANT_HOST, port=QDRANT_PORT)
-            cols = qclient.get_collections()
-            exists = any(c.name == os.getenv("QDRANT_COLLECTION", "kamco") for c in cols.collections)
-            if not exists:
-                setup_collection()
+            # Creates the aliased collection on first use; no-op afterwards
+            setup_collection()
         except Exception as e:
              # Just log, embed() will fail if critical
              result['errors'].append(f"Qdrant Check Failed: {e}")
@@ -284,6 +408,12 @@ def api_delete(item_id):
     try:
         r = collection.delete_one({"_id": ObjectId(item_id)})
         if r.deleted_count > 0:
+            # Keep the search index in sync (normalized text + Qdrant point)
+            try:
+                from rag.embed import remove_documents
+                remove_documents([ObjectId(item_id)])
+            except Exception as e:
+                print(f"인덱스 삭제 실패 ({item_id}): {e}")
             return jsonify({'success': True})
         return jsonify({'success': False, 'message': 'Not found'}), 404
     except Exception as e: